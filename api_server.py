@@ -0,0 +1,482 @@
+"""Headless transcription API (ASGI, Starlette) next to the Streamlit UI.
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8000
+    python api_server.py --port 8000
+
+Endpoints:
+    POST /transcribe      raw audio body, or multipart with a "file" field;
+                          ?engine=deepgram|google|bangla&language=en-US&model=nova-3&model_size=base
+                          (model_size=auto picks the size per clip from its length and the current load)
+    WS   /stream          send a JSON config ({"engine", "language", "model"}), then binary
+                          audio chunks, then {"type": "end"}; partial/final results come back as JSON
+    POST /voice-chat      audio → transcript → AI reply → speech, streamed as NDJSON events;
+                          ?history=<JSON messages>&conversation=<id> (an id keeps a running summary
+                          of turns that no longer fit the context budget between requests)
+    GET  /tts/<key>.mp3   synthesized reply sentences referenced by /voice-chat
+    GET  /health          warm-up state, in-flight requests and engine capabilities
+    GET  /metrics         Prometheus metrics (stage latencies, cache hit rates, queue depth, RTF)
+
+Every response carries a Server-Timing header with per-stage durations.
+Nothing here imports Streamlit; models, API clients and the transcript/TTS
+caches are the same ones the UI uses.
+"""
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+import metrics
+import settings
+from bangla_text import clean_bangla_text
+from bangla_workers import PoolSaturated
+from engines import EngineUnavailable, available_engines, create_engine
+from model_manager import ModelUnavailable
+from remote_engines import RemoteEngineError
+
+# Conversations (running summaries) kept for the most recently used ids
+MAX_CONVERSATIONS = 1024
+
+class Timings:
+    """Per-request stage durations, reported in the Server-Timing header and recorded as metrics"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            with metrics.span(name):
+                yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**{name: round(ms, 2) for name, ms in self.stages.items()},
+                "total": round((time.perf_counter() - self.started) * 1000, 2)}
+
+    def headers(self) -> Dict[str, str]:
+        timings = self.as_dict()
+        return {
+            "Server-Timing": ", ".join(f"{name};dur={ms}" for name, ms in timings.items()),
+            "X-Process-Time-Ms": str(timings["total"]),
+        }
+
+class Services:
+    """Models, clients and caches shared by every request in this process"""
+
+    def __init__(self):
+        from bangla_workers import create_bangla_worker_pool
+        from conversation import ResponseCache
+        from micro_batching import create_bangla_batcher
+        from model_manager import create_bangla_model_manager
+        from transcript_cache import TranscriptCache
+        from tts_cache import TTSCache
+
+        self.bangla_models = create_bangla_model_manager()
+        self._create_batcher = create_bangla_batcher
+        self._batchers = {}
+        self.worker_pool = create_bangla_worker_pool()
+        self.transcript_cache = TranscriptCache(
+            settings.TRANSCRIPT_CACHE_PATH,
+            max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024,
+        )
+        self.tts_cache = TTSCache(settings.TTS_CACHE_DIR, max_bytes=settings.TTS_CACHE_MAX_MB * 1024 * 1024)
+        self.response_cache = ResponseCache(settings.LLM_RESPONSE_CACHE_ENTRIES)
+        self._conversations: "OrderedDict[str, object]" = OrderedDict()
+        self._engines = {}
+        self._lock = threading.Lock()
+        self.limiter: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    def bangla_batcher(self, model_size: str):
+        with self._lock:
+            if model_size not in self._batchers:
+                self._batchers[model_size] = self._create_batcher(self.bangla_models, model_size)
+            return self._batchers[model_size]
+
+    def engine(self, name: str):
+        with self._lock:
+            engine = self._engines.get(name)
+        if engine is None:
+            if name == "bangla":
+                engine = create_engine(name, models=self.bangla_models, worker_pool=self.worker_pool,
+                                       get_batcher=self.bangla_batcher)
+            else:
+                engine = create_engine(name)  # remote engines share one pooled client layer
+            with self._lock:
+                engine = self._engines.setdefault(name, engine)
+        return engine
+
+    @functools.cached_property
+    def deepgram_client(self):
+        from clients import create_deepgram_client
+        return create_deepgram_client()
+
+    @functools.cached_property
+    def groq_client(self):
+        from clients import create_groq_client
+        return create_groq_client()
+
+    def conversation(self, conversation_id: Optional[str] = None):
+        """The conversation for this id (kept for the most recent ids), or a stateless one without an id"""
+        from conversation import create_conversation
+
+        if not conversation_id:
+            return create_conversation(self.groq_client, self.response_cache, summarize=False)
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                conversation = create_conversation(self.groq_client, self.response_cache)
+                self._conversations[conversation_id] = conversation
+            self._conversations.move_to_end(conversation_id)
+            while len(self._conversations) > MAX_CONVERSATIONS:
+                self._conversations.popitem(last=False)
+        return conversation
+
+    def start_warm_up(self):
+        from warmup import Readiness, start_background_warm_up
+
+        if not settings.WARMUP_ENABLED:
+            self.readiness = Readiness()
+            return
+        factories = {"deepgram": lambda: self.deepgram_client, "groq": lambda: self.groq_client}
+        self.readiness = start_background_warm_up(
+            load_model=self.bangla_models.get,
+            model_sizes=settings.BANGLA_PRELOAD_SIZES,
+            client_factories={name: factories[name] for name in settings.WARMUP_CLIENTS if name in factories},
+            worker_pool=self.worker_pool,
+        )
+
+services: Optional[Services] = None
+
+@asynccontextmanager
+async def request_slot():
+    """Hold one of API_MAX_CONCURRENCY slots; answer 503 if none frees up within API_QUEUE_TIMEOUT_S"""
+    try:
+        await asyncio.wait_for(services.limiter.acquire(), timeout=settings.API_QUEUE_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        services.rejected += 1
+        raise HTTPException(503, "Server busy, retry shortly", headers={"Retry-After": "1"})
+    services.in_flight += 1
+    try:
+        yield
+    finally:
+        services.in_flight -= 1
+        services.limiter.release()
+
+# -- request parsing -------------------------------------------------------------------
+
+async def read_request(request: Request):
+    """Audio bytes plus parameters from the query string (and form fields for multipart)"""
+    max_bytes = settings.API_MAX_UPLOAD_MB * 1024 * 1024
+    if int(request.headers.get("content-length") or 0) > max_bytes:
+        raise HTTPException(413, f"Audio larger than {settings.API_MAX_UPLOAD_MB} MB")
+
+    params = dict(request.query_params)
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        # Only max_files/max_fields exist on Starlette 0.37; the upload size is checked below
+        form = await request.form(max_files=1)
+        upload = form.get("file") or form.get("audio")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(400, 'Multipart requests need the audio in a "file" field')
+        data = await upload.read()
+        params.update({key: value for key, value in form.items() if isinstance(value, str)})
+    else:
+        data = await request.body()
+
+    if not data:
+        raise HTTPException(400, "No audio in the request")
+    if len(data) > max_bytes:
+        raise HTTPException(413, f"Audio larger than {settings.API_MAX_UPLOAD_MB} MB")
+    return data, params
+
+def engine_request(params: dict):
+    """(engine name, engine, language, engine options) for the request parameters"""
+    name = params.get("engine", settings.API_DEFAULT_ENGINE)
+    if name not in available_engines():
+        raise HTTPException(400, f"Unknown engine {name!r}; available: {', '.join(available_engines())}")
+    engine = services.engine(name)
+    language = params.get("language") or ("bn-BD" if name == "bangla" else "en-US")
+    if not engine.capabilities.supports(language):
+        raise HTTPException(400, f"Engine {name!r} does not support language {language!r}")
+    options = {}
+    if params.get("model"):
+        options["model"] = params["model"]
+    if params.get("model_size"):
+        options["model_size"] = params["model_size"]
+    return name, engine, language, options
+
+def prepare_audio(data: bytes, name: str, label: str):
+    """Preprocess once and encode for the engine; the original clip is used if preprocessing fails.
+
+    Returns (audio, duration in seconds or None when the clip was not decoded).
+    """
+    from audio_preprocess import preprocess
+    from audio_source import AudioSource
+
+    if not settings.PREPROCESS_ENABLED:
+        return AudioSource(data), None
+    try:
+        prepared = preprocess(data, threshold_db=settings.PREPROCESS_TRIM_DB)
+    except Exception:
+        return AudioSource(data), None
+    if prepared.duration < 0.1:
+        return AudioSource(data), None
+    encoding = settings.REMOTE_AUDIO_ENCODING if name == "deepgram" else None
+    return prepared.for_engine(label, encoding), prepared.duration
+
+async def run_transcription(data: bytes, params: dict, timings: Timings) -> dict:
+    name, engine, language, options = engine_request(params)
+    # Same cache keys as the Streamlit UI, so either side can reuse the other's transcripts
+    audio_hash = hashlib.md5(data).hexdigest()
+    cache_model = options.get("model") or options.get("model_size") or {
+        "deepgram": getattr(engine, "model", name), "bangla": getattr(engine, "model_size", name)
+    }.get(name, name)
+
+    async with timings.stage("cache"):
+        text = services.transcript_cache.get(audio_hash, engine.label, cache_model, language)
+    cached = text is not None
+    if not cached:
+        async with timings.stage("preprocess"):
+            audio, duration = await run_in_threadpool(prepare_audio, data, name, engine.label)
+        started = time.perf_counter()
+        async with timings.stage("stt"):
+            text = await engine.transcribe_async(audio, language, **options)
+        if duration:
+            metrics.record_audio(name, duration, time.perf_counter() - started)
+        if text and language == "bn-BD":
+            text = clean_bangla_text(text)
+        if text:
+            services.transcript_cache.put(audio_hash, engine.label, cache_model, language, text)
+    return {"text": text, "engine": name, "language": language, "cached": cached}
+
+# -- endpoints ---------------------------------------------------------------------------
+
+async def transcribe(request: Request):
+    timings = Timings()
+    data, params = await read_request(request)
+    async with request_slot():
+        result = await run_transcription(data, params, timings)
+    return JSONResponse({**result, "timings_ms": timings.as_dict()}, headers=timings.headers())
+
+async def stream(websocket: WebSocket):
+    await websocket.accept()
+    timings = Timings()
+    try:
+        config = await websocket.receive_json()
+        name, engine, language, options = engine_request(config)
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "error": e.detail})
+        await websocket.close(code=1008)
+        return
+    except (WebSocketDisconnect, ValueError):
+        return
+
+    try:
+        async with request_slot():
+            if name == "deepgram" and engine.capabilities.streaming:
+                text = await _stream_deepgram(websocket, language, options.get("model", engine.model), timings)
+            else:
+                # Engines without a live API transcribe the buffered audio once the client is done
+                chunks = await _receive_audio(websocket)
+                text = (await run_transcription(b"".join(chunks), config, timings))["text"] if chunks else None
+            await websocket.send_json({"type": "final", "text": text or "", "done": True,
+                                       "timings_ms": timings.as_dict()})
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "error": e.detail})
+        await websocket.close(code=1013)
+    except Exception as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close(code=1011)
+
+async def _receive_audio(websocket: WebSocket, on_chunk=None) -> list:
+    chunks = []
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("bytes"):
+            chunks.append(message["bytes"])
+            if on_chunk is not None:
+                await on_chunk(message["bytes"])
+        elif message.get("text"):
+            if json.loads(message["text"]).get("type") == "end":
+                return chunks
+
+async def _stream_deepgram(websocket: WebSocket, language: str, model: str, timings: Timings) -> str:
+    from deepgram_stream import DeepgramStream
+
+    client = services.deepgram_client
+    if client is None:
+        raise EngineUnavailable("Deepgram: no API key configured")
+
+    loop = asyncio.get_running_loop()
+    updates = asyncio.Queue()
+    live = DeepgramStream(client, language, model, on_update=lambda update: loop.call_soon_threadsafe(updates.put_nowait, update))
+    async with timings.stage("connect"):
+        await run_in_threadpool(live.start)
+
+    async def forward():
+        while True:
+            update = await updates.get()
+            if update is None:
+                return
+            await websocket.send_json({"type": "final" if update.is_final else "partial", "text": update.text, "done": False})
+
+    forwarder = asyncio.create_task(forward())
+    try:
+        await _receive_audio(websocket, on_chunk=lambda chunk: run_in_threadpool(live.send, chunk))
+        async with timings.stage("flush"):
+            text = await run_in_threadpool(live.finish)
+        # Results queued by the listener thread come before this sentinel; send them all first
+        loop.call_soon_threadsafe(updates.put_nowait, None)
+        await forwarder
+    finally:
+        forwarder.cancel()
+        await run_in_threadpool(live.close)
+    return text
+
+async def voice_chat(request: Request):
+    from tts_cache import TTSCache
+    from voice_reply import VoiceReplyPipeline, tts_voice
+
+    timings = Timings()
+    data, params = await read_request(request)
+    async with request_slot():
+        result = await run_transcription(data, params, timings)
+    transcript = result["text"]
+    if not transcript:
+        return JSONResponse({**result, "error": "Could not transcribe audio"}, status_code=422, headers=timings.headers())
+    if services.groq_client is None:
+        raise HTTPException(503, "GROQ_API_KEY is not configured")
+
+    try:
+        history = json.loads(params.get("history") or "[]")
+    except ValueError:
+        raise HTTPException(400, "history must be a JSON list of {role, content} messages")
+    messages = [*history, {"role": "user", "content": transcript}]
+    lang, tld = tts_voice(result["language"])
+    tts_cache = services.tts_cache
+    conversation = services.conversation(params.get("conversation"))
+    pipeline = VoiceReplyPipeline(conversation.stream(messages), lambda text: tts_cache.read(text, lang, tld))
+
+    def events():
+        yield json.dumps({"type": "transcript", **result, "timings_ms": timings.as_dict()}, ensure_ascii=False) + "\n"
+        for event in pipeline.events():
+            if event.kind == "token":
+                record = {"type": "token", "text": event.text}
+            elif event.kind == "audio":
+                record = {"type": "audio", "index": event.index, "text": event.text,
+                          "url": f"/tts/{TTSCache.key(event.text, lang, tld)}.mp3"}
+            elif event.kind == "error":
+                record = {"type": "error", "error": event.text}
+            else:
+                record = {"type": "done", "reply": event.text,
+                          "first_token_ms": round((pipeline.first_token_at or 0) * 1000, 1),
+                          "first_audio_ms": round((pipeline.first_audio_at or 0) * 1000, 1)}
+            record["elapsed_ms"] = round(event.elapsed * 1000, 1)
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=timings.headers())
+
+async def tts_audio(request: Request):
+    key = request.path_params["key"]
+    if not re.fullmatch(r"[0-9a-f]{64}", key):
+        raise HTTPException(404)
+    path = services.tts_cache.path(key)
+    if not os.path.isfile(path):
+        raise HTTPException(404)
+    return FileResponse(path, media_type="audio/mpeg", headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+async def prometheus_metrics(request: Request):
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+async def health(request: Request):
+    return JSONResponse({
+        "ready": services.readiness.ready,
+        "components": services.readiness.snapshot(),
+        "in_flight": services.in_flight,
+        "rejected": services.rejected,
+        "max_concurrency": settings.API_MAX_CONCURRENCY,
+        "engines": {name: services.engine(name).capabilities._asdict() for name in available_engines()},
+        "bangla_workers": services.worker_pool.metrics() if services.worker_pool else None,
+        "bangla_models": services.bangla_models.stats(),
+        "bangla_router": services.engine("bangla").router.stats(),
+    })
+
+# -- errors and app --------------------------------------------------------------------
+
+async def engine_error(request: Request, exc: Exception):
+    if isinstance(exc, PoolSaturated):
+        return JSONResponse({"error": "BanglaSpeech2Text is busy"}, status_code=503, headers={"Retry-After": "1"})
+    if isinstance(exc, (EngineUnavailable, ModelUnavailable)):
+        return JSONResponse({"error": str(exc)}, status_code=503)
+    return JSONResponse({"error": str(exc), "status": getattr(exc, "status", None)}, status_code=502)
+
+async def http_error(request: Request, exc: HTTPException):
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+@asynccontextmanager
+async def lifespan(app):
+    global services
+    services = Services()
+    services.limiter = asyncio.Semaphore(settings.API_MAX_CONCURRENCY)
+    metrics.watch_queue("api", lambda: {"api_in_flight": services.in_flight})
+    services.start_warm_up()
+    yield
+    if services.worker_pool is not None:
+        services.worker_pool.shutdown(wait=False)
+
+app = Starlette(
+    routes=[
+        Route("/transcribe", transcribe, methods=["POST"]),
+        WebSocketRoute("/stream", stream),
+        Route("/voice-chat", voice_chat, methods=["POST"]),
+        Route("/tts/{key}.mp3", tts_audio, methods=["GET"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", prometheus_metrics, methods=["GET"]),
+    ],
+    exception_handlers={
+        HTTPException: http_error,
+        PoolSaturated: engine_error,
+        EngineUnavailable: engine_error,
+        ModelUnavailable: engine_error,
+        RemoteEngineError: engine_error,
+    },
+    lifespan=lifespan,
+)
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import io
+import time
+import wave
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import metrics
+from audio_source import MODEL_SAMPLE_RATE, AudioSource, pcm_to_float
+
+# Native input rate and preferred upload encoding per engine ("samples" = decoded in-process)
+ENGINE_PROFILES = {
+    "Deepgram": {"sample_rate": 16000, "encoding": "flac"},
+    "Python SpeechRecognition": {"sample_rate": 16000, "encoding": "wav"},  # FLAC-encoded by the Google client
+    "BanglaSpeech2Text": {"sample_rate": MODEL_SAMPLE_RATE, "encoding": "samples"},
+}
+
+CONTENT_TYPES = {"wav": "audio/wav", "flac": "audio/flac", "opus": "audio/ogg"}
+
+class StageReport(NamedTuple):
+    stage: str
+    bytes_in: int
+    bytes_out: int
+    ms: float
+
+def detect_format(data: bytes) -> str:
+    """Identify the container from its magic bytes"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if data[4:8] == b"ftyp":
+        return "mp4"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return "unknown"
+
+def frame_energy_db(frames: np.ndarray) -> np.ndarray:
+    """RMS level in dBFS for each row of a (n_frames, frame_length) array"""
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_db: float = -45.0,
+    frame_ms: int = 20,
+    pad_s: float = 0.15,
+) -> np.ndarray:
+    """Cut leading and trailing frames below the energy gate, keeping pad_s of context"""
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    n_frames = len(samples) // frame_length
+    if n_frames == 0:
+        return samples
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+    voiced = np.flatnonzero(frame_energy_db(frames) > threshold_db)
+    if len(voiced) == 0:
+        return samples[:0]
+    pad = int(pad_s * sample_rate)
+    start = max(0, voiced[0] * frame_length - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame_length + pad)
+    return samples[start:end]
+
+def resample_fft(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Band-limited resample by zero-padding / truncating the spectrum"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    target_length = int(round(len(samples) * target_rate / float(source_rate)))
+    spectrum = np.fft.rfft(samples)
+    resized = np.zeros(target_length // 2 + 1, dtype=spectrum.dtype)
+    keep = min(len(spectrum), len(resized))
+    resized[:keep] = spectrum[:keep]
+    return (np.fft.irfft(resized, n=target_length) * (target_length / float(len(samples)))).astype(np.float32)
+
+def decode(data: bytes) -> Tuple[np.ndarray, int, int]:
+    """Decode any supported input to (float32 samples, sample rate, channels), without downmixing"""
+    if detect_format(data) == "wav":
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+        # pcm_to_float downmixes itself, so keep the channels apart here and downmix as its own stage
+        interleaved = pcm_to_float(frames, width, 1)
+        return interleaved.reshape(-1, channels) if channels > 1 else interleaved, rate, channels
+
+    import av
+
+    chunks = []
+    resampler = None
+    with av.open(io.BytesIO(data), mode="r", metadata_errors="ignore") as container:
+        stream = container.streams.audio[0]
+        rate = stream.codec_context.sample_rate
+        for frame in container.decode(stream):
+            if resampler is None:
+                # Planar float at the source rate and layout: every sample format (packed or planar,
+                # s16, s32, flt, ...) comes out as (channels, samples) in [-1, 1]
+                rate = frame.sample_rate or rate
+                resampler = av.AudioResampler(format="fltp", layout=frame.layout.name, rate=rate)
+            frame.pts = None
+            chunks.extend(resampled.to_ndarray() for resampled in resampler.resample(frame))
+        if resampler is not None:
+            chunks.extend(resampled.to_ndarray() for resampled in resampler.resample(None))
+    if not chunks:
+        return np.zeros(0, dtype=np.float32), rate or MODEL_SAMPLE_RATE, 1
+    audio = np.concatenate(chunks, axis=1).astype(np.float32, copy=False)
+    channels = audio.shape[0]
+    return (audio.T if channels > 1 else audio[0]), rate, channels
+
+def encode(samples: np.ndarray, sample_rate: int, encoding: str = "wav") -> bytes:
+    """Encode mono float32 samples as 16-bit WAV, FLAC or Ogg/Opus"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    if encoding == "wav":
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm.tobytes())
+        return buffer.getvalue()
+
+    import av
+
+    codec, container_format = {"flac": ("flac", "flac"), "opus": ("libopus", "ogg")}[encoding]
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format=container_format) as container:
+        stream = container.add_stream(codec, rate=sample_rate, layout="mono")
+        frame = av.AudioFrame.from_ndarray(pcm.reshape(1, -1), format="s16", layout="mono")
+        frame.sample_rate = sample_rate
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+class PreprocessedAudio:
+    """Decoded, downmixed, resampled and trimmed clip, encoded on demand per engine"""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int, source_format: str, report: List[StageReport]):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.source_format = source_format
+        self.report = report
+        self.original_bytes = report[0].bytes_in if report else 0
+        self.original_seconds = 0.0
+        self._encoded: Dict[str, AudioSource] = {}
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
+
+    def for_engine(self, engine: str, encoding: Optional[str] = None) -> AudioSource:
+        """AudioSource in the engine's native rate and preferred upload encoding"""
+        profile = ENGINE_PROFILES.get(engine, {"sample_rate": self.sample_rate, "encoding": "wav"})
+        encoding = encoding or profile["encoding"]
+        rate = profile["sample_rate"]
+        key = f"{encoding}@{rate}"
+        if key not in self._encoded:
+            started = time.perf_counter()
+            samples = resample_fft(self.samples, self.sample_rate, rate)
+            try:
+                data = encode(samples, rate, "wav" if encoding == "samples" else encoding)
+            except Exception:
+                # Codec unavailable (e.g. PyAV built without libopus): fall back to WAV
+                encoding, data = "wav", encode(samples, rate, "wav")
+            source = AudioSource(data)
+            source.prime_samples(samples, rate)
+            self._encoded[key] = source
+            if encoding != "samples":
+                self.report.append(StageReport(f"encode:{encoding}", samples.nbytes, len(data),
+                                               (time.perf_counter() - started) * 1000))
+                metrics.observe("stage_seconds", time.perf_counter() - started, stage="encode", encoding=encoding)
+        return self._encoded[key]
+
+    def summary(self) -> str:
+        stages = " · ".join(f"{r.stage} {r.ms:.1f} ms" for r in self.report)
+        uploads = [r.bytes_out for r in self.report if r.stage.startswith("encode:")]
+        saved = ""
+        if uploads and self.original_bytes:
+            smallest = min(uploads)
+            saved = f" | upload {smallest / 1024:.0f} KB vs {self.original_bytes / 1024:.0f} KB ({100 - 100 * smallest / self.original_bytes:.0f}% saved)"
+        trimmed = f" | trimmed {self.original_seconds - self.duration:.1f}s of silence" if self.original_seconds else ""
+        return f"🎛️ {stages}{saved}{trimmed}"
+
+def preprocess(
+    data: bytes,
+    target_rate: int = MODEL_SAMPLE_RATE,
+    trim: bool = True,
+    threshold_db: float = -45.0,
+) -> PreprocessedAudio:
+    """Run the shared stages once per clip: decode → downmix → resample → trim silence"""
+    report = []
+
+    started = time.perf_counter()
+    source_format = detect_format(data)
+    samples, rate, channels = decode(data)
+    report.append(StageReport(f"decode:{source_format}", len(data), samples.nbytes, (time.perf_counter() - started) * 1000))
+
+    if channels > 1:
+        started = time.perf_counter()
+        mono = samples.mean(axis=1).astype(np.float32)
+        report.append(StageReport("downmix", samples.nbytes, mono.nbytes, (time.perf_counter() - started) * 1000))
+        samples = mono
+
+    if rate != target_rate:
+        started = time.perf_counter()
+        resampled = resample_fft(samples, rate, target_rate)
+        report.append(StageReport("resample", samples.nbytes, resampled.nbytes, (time.perf_counter() - started) * 1000))
+        samples, rate = resampled, target_rate
+
+    original_seconds = len(samples) / float(rate)
+    if trim:
+        started = time.perf_counter()
+        trimmed = trim_silence(samples, rate, threshold_db)
+        report.append(StageReport("trim", samples.nbytes, trimmed.nbytes, (time.perf_counter() - started) * 1000))
+        samples = trimmed
+
+    for stage in report:
+        metrics.observe("stage_seconds", stage.ms / 1000, stage="preprocess_step", step=stage.stage.split(":")[0])
+    result = PreprocessedAudio(np.ascontiguousarray(samples, dtype=np.float32), rate, source_format, report)
+    result.original_seconds = original_seconds
+    return result
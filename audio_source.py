@@ -0,0 +1,138 @@
+import io
+import os
+import tempfile
+import wave
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+# Sample rate expected by Whisper-family models (BanglaSpeech2Text)
+MODEL_SAMPLE_RATE = 16000
+
+class AudioSource:
+    """A recorded clip held in memory and handed to every engine without shared temp files.
+
+    Engines pick the view they need: the raw bytes for an HTTP payload, a
+    file-like stream for SpeechRecognition, decoded samples for local models,
+    or (only as a last resort) a private temporary file path.
+
+    bytes are held as given; a bytearray or memoryview is copied once into
+    bytes, so the clip can be hashed, pickled to worker processes and shared
+    between threads while the caller reuses its buffer.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data if isinstance(data, bytes) else bytes(data)
+        self._samples = {}
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def view(self) -> memoryview:
+        """Zero-copy view over the encoded audio"""
+        return memoryview(self.data)
+
+    def stream(self) -> io.BytesIO:
+        """Fresh file-like reader over the encoded audio (shares the underlying buffer)"""
+        return io.BytesIO(self.data)
+
+    @property
+    def is_wav(self) -> bool:
+        return self.data[:4] == b"RIFF" and self.data[8:12] == b"WAVE"
+
+    @property
+    def content_type(self) -> str:
+        """MIME type for an HTTP upload of the encoded audio"""
+        if self.is_wav:
+            return "audio/wav"
+        if self.data[:4] == b"fLaC":
+            return "audio/flac"
+        if self.data[:4] == b"OggS":
+            return "audio/ogg"
+        return "application/octet-stream"
+
+    def prime_samples(self, samples: np.ndarray, sample_rate: int = MODEL_SAMPLE_RATE):
+        """Seed the decode cache with samples the caller already holds"""
+        self._samples[sample_rate] = samples
+
+    def samples(self, sample_rate: int = MODEL_SAMPLE_RATE) -> np.ndarray:
+        """Decode to mono float32 samples in [-1, 1] at the requested rate (cached per rate)"""
+        if sample_rate not in self._samples:
+            if self.is_wav:
+                audio, source_rate = decode_wav(self.data)
+                audio = resample(audio, source_rate, sample_rate)
+            else:
+                # Compressed formats go through PyAV, which faster-whisper already depends on
+                from faster_whisper import decode_audio
+                audio = decode_audio(self.stream(), sampling_rate=sample_rate)
+            self._samples[sample_rate] = audio
+        return self._samples[sample_rate]
+
+    @property
+    def duration(self) -> float:
+        """Clip length in seconds"""
+        if self.is_wav:
+            with wave.open(self.stream(), "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate() or 1)
+        return len(self.samples()) / float(MODEL_SAMPLE_RATE)
+
+    @property
+    def known_duration(self) -> Optional[float]:
+        """Clip length if it is known without decoding (WAV header or decoded samples), else None"""
+        if self.is_wav:
+            return self.duration
+        if MODEL_SAMPLE_RATE in self._samples:
+            return len(self._samples[MODEL_SAMPLE_RATE]) / float(MODEL_SAMPLE_RATE)
+        return None
+
+    @contextmanager
+    def as_path(self, suffix: str = ".wav") -> Iterator[str]:
+        """Per-request temporary file for engines that can only read from a path"""
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix="stt_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.data)
+            yield path
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def decode_wav(data: bytes) -> tuple:
+    """Decode PCM WAV bytes to (mono float32 samples, sample rate)"""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    return pcm_to_float(frames, width, channels), rate
+
+def pcm_to_float(frames: bytes, width: int, channels: int = 1) -> np.ndarray:
+    """Convert interleaved little-endian PCM frames to mono float32 samples in [-1, 1]"""
+    if width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        audio = ints.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return audio.astype(np.float32, copy=False)
+
+def resample(audio: np.ndarray, source_rate: int, target_rate: Optional[int]) -> np.ndarray:
+    """Linear-interpolation resample (recorder output is already 16 kHz, so this is rarely hit)"""
+    if not target_rate or source_rate == target_rate or len(audio) == 0:
+        return audio
+    target_length = int(round(len(audio) * target_rate / float(source_rate)))
+    positions = np.linspace(0, len(audio) - 1, num=target_length, dtype=np.float64)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
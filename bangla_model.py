@@ -0,0 +1,39 @@
+import os
+# Force CPU usage to avoid CUDA/GPU errors (also applies inside worker processes)
+os.environ["CUDA_VISIBLE_DEVICES"] = ""
+os.environ["CT2_FORCE_CPU"] = "1"
+
+# Available sizes: tiny (~39MB), base (~74MB), small (~244MB), medium (~769MB), large (~1550MB)
+BANGLA_MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+BANGLA_COMPUTE_TYPE = "int8"  # Use int8 for better CPU performance
+
+# Approximate resident memory of a loaded int8 model (weights plus CTranslate2 buffers), in MB;
+# the model manager uses it to make room before a load and measures the real size afterwards
+BANGLA_MODEL_MEMORY_MB = {"tiny": 100, "base": 200, "small": 550, "medium": 1500, "large": 3000}
+# Bytes per weight relative to int8
+_COMPUTE_TYPE_SCALE = {"int8": 1, "int8_float32": 1, "int8_float16": 1, "int8_bfloat16": 1,
+                       "int16": 2, "float16": 2, "bfloat16": 2, "float32": 4}
+
+def estimate_model_bytes(model_size: str, compute_type: str = BANGLA_COMPUTE_TYPE) -> int:
+    megabytes = BANGLA_MODEL_MEMORY_MB.get(model_size, BANGLA_MODEL_MEMORY_MB["large"])
+    return int(megabytes * _COMPUTE_TYPE_SCALE.get(compute_type, 4) * 1024 * 1024)
+
+def create_bangla_model(model_size: str = "base", cpu_threads: int = 0, num_workers: int = 1,
+                        compute_type: str = BANGLA_COMPUTE_TYPE):
+    """Build a CPU-only BanglaSpeech2Text model (no Streamlit involved, safe in any process)
+
+    cpu_threads is the CTranslate2 intra-op thread count (0 = library default) and
+    num_workers the number of concurrent decodes one model instance accepts.
+    """
+    import metrics
+    from banglaspeech2text import Speech2Text
+
+    metrics.count("model_loads_total", size=model_size, compute_type=compute_type)
+    with metrics.span("model_load", size=model_size, compute_type=compute_type):
+        return Speech2Text(
+            model_size_or_path=model_size,
+            device="cpu",  # Force CPU usage to avoid CUDA/GPU errors
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
+        )
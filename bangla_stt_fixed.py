@@ -1,50 +1,83 @@
-import os
-# Force CPU usage to avoid CUDA/GPU errors
-os.environ["CUDA_VISIBLE_DEVICES"] = ""
-os.environ["CT2_FORCE_CPU"] = "1"
-
 import streamlit as st
-from banglaspeech2text import Speech2Text
-from typing import Optional
+import time
+import metrics
+import bangla_model  # also forces CPU-only CTranslate2
+from model_manager import ModelUnavailable, create_bangla_model_manager
+from bangla_workers import create_bangla_worker_pool
+from micro_batching import create_bangla_batcher
+from bangla_text import clean_bangla_text, is_bangla_text
+from typing import Iterator
+from long_audio import TranscribedSegment, transcribe_segments
+from engines import BanglaEngine
+from size_router import AUTO
 
-# Cache the Speech2Text model for better performance
 @st.cache_resource
+def get_bangla_models():
+    """Loaded model sizes shared by every session, kept within BANGLA_MODEL_BUDGET_MB"""
+    return create_bangla_model_manager()
+
 def load_bangla_model(model_size="base"):
-    """Load BanglaSpeech2Text model with specified size (CPU-only)"""
+    """Load BanglaSpeech2Text model with specified size (CPU-only)
+
+    Loaded sizes are kept by the model manager; switching sizes evicts the
+    least recently used idle model once the memory budget is reached.
+    """
     try:
         # Initialize the BanglaSpeech2Text model with CPU-only mode to avoid CUDA issues
         # Available sizes: tiny (~39MB), base (~74MB), small (~244MB), medium (~769MB), large (~1550MB)
-        stt = Speech2Text(
-            model_size_or_path=model_size,
-            device="cpu",  # Force CPU usage to avoid CUDA/GPU errors
-            compute_type="int8"  # Use int8 for better CPU performance
-        )
-        return stt
-    except Exception as e:
+        return get_bangla_models().get(model_size)
+    except ModelUnavailable as e:
         st.error(f"Error loading BanglaSpeech2Text model: {e}")
         return None
 
-def bangla_speech_to_text(audio_file_path: str, model_size: str = "base") -> Optional[str]:
-    """Convert Bengali speech to text using BanglaSpeech2Text package"""
+@st.cache_resource
+def get_bangla_worker_pool():
+    """Shared inference worker pool, or None to run models in this process"""
+    return create_bangla_worker_pool()
+
+@st.cache_resource
+def get_bangla_batcher(model_size="base"):
+    """Batching scheduler shared by every session using this model size, or None if disabled"""
+    return create_bangla_batcher(get_bangla_models(), model_size)
+
+@st.cache_resource
+def get_bangla_engine():
+    """BanglaSpeech2Text registry engine using the shared models, worker pool and batchers"""
+    return BanglaEngine(
+        models=get_bangla_models(),
+        worker_pool=get_bangla_worker_pool(),
+        get_batcher=get_bangla_batcher,
+    )
+
+def bangla_long_speech_to_text(audio, model_size: str = "base", **segment_options) -> Iterator[TranscribedSegment]:
+    """Transcribe a long Bengali recording segment by segment.
+
+    Audio is decoded incrementally and split on pauses, so memory stays bounded
+    and each segment's text (with start/end times) is yielded as soon as it is ready.
+    """
+    if model_size == AUTO:
+        # Segments are at most max_segment_s long; route as if each one were that long
+        model_size = get_bangla_engine().router.choose(segment_options.get("max_segment_s", 25.0)).size
+    models = get_bangla_models()
     try:
-        # Load the model with specified size
-        stt = load_bangla_model(model_size)
-        if stt is None:
-            return None
-        
-        # Perform speech-to-text conversion
-        transcription = stt(audio_file_path)
-        
-        # Clean up the transcription
-        if transcription:
-            transcription = transcription.strip()
-            return transcription if transcription else None
-        
-        return None
-        
-    except Exception as e:
-        st.error(f"Error in BanglaSpeech2Text transcription: {e}")
-        return None
+        # Held for the whole recording so the model is not evicted between segments
+        stt = models.acquire(model_size)
+    except ModelUnavailable as e:
+        st.error(f"Error loading BanglaSpeech2Text model: {e}")
+        return
+    try:
+        started = time.perf_counter()
+        for segment in transcribe_segments(stt, audio, **segment_options):
+            # Decode and inference time of this segment against its length
+            metrics.record_audio(f"bangla-{model_size}-longform", segment.end - segment.start, time.perf_counter() - started)
+            yield segment
+            started = time.perf_counter()
+    finally:
+        models.release(model_size)
+
+def stitch_segments(segments) -> str:
+    """Join per-segment transcripts into one cleaned Bengali transcript"""
+    return clean_bangla_text(" ".join(segment.text for segment in segments))
 
 # Test function for the model
 def test_bangla_model(model_size: str = "base"):
@@ -72,26 +105,3 @@ def test_bangla_model(model_size: str = "base"):
     except Exception as e:
         st.error(f"❌ Error testing BanglaSpeech2Text model: {e}")
         return False
-
-# Additional utility functions for Bangla text processing
-def clean_bangla_text(text: str) -> str:
-    """Clean and format Bengali text"""
-    if not text:
-        return ""
-    
-    # Remove extra spaces and clean up
-    text = ' '.join(text.split())
-    
-    # Add any specific Bengali text cleaning rules here
-    return text
-
-def is_bangla_text(text: str) -> bool:
-    """Check if text contains Bengali characters"""
-    if not text:
-        return False
-    
-    # Bengali Unicode range: U+0980–U+09FF
-    for char in text:
-        if '\u0980' <= char <= '\u09FF':
-            return True
-    return False
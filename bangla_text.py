@@ -0,0 +1,135 @@
+# Additional utility functions for Bangla text processing
+#
+# Everything here runs on whole strings with C-level primitives (unicodedata,
+# str.translate, compiled regexes, bytes.count) rather than Python loops over
+# characters, so multi-megabyte transcript batches are cheap to clean and tag.
+import re
+import unicodedata
+from typing import List, NamedTuple
+
+BANGLA_RANGE = "\u0980-\u09FF"
+DARI = "\u0964"  # । (shared with Devanagari)
+DOUBLE_DARI = "\u0965"  # ॥
+
+BANGLA_DIGITS = "০১২৩৪৫৬৭৮৯"
+TO_ASCII_DIGITS = str.maketrans(BANGLA_DIGITS, "0123456789")
+TO_BANGLA_DIGITS = str.maketrans("0123456789", BANGLA_DIGITS)
+
+NUKTA = "\u09BC"
+ZWNJ, ZWJ = "\u200C", "\u200D"
+
+# Invisible characters that only break matching (zero width space, byte order mark, soft hyphen),
+# and ৷ (Bengali currency numerator four), widely typed as a dari
+_INVISIBLE_RE = re.compile("[\u200B\uFEFF\u00AD]")
+FAKE_DARI = "\u09F7"
+# NFC leaves ড়, ঢ়, য় decomposed (they are composition exclusions); use the single code points
+_NUKTA_MAP = {"\u09A1" + NUKTA: "\u09DC", "\u09A2" + NUKTA: "\u09DD", "\u09AF" + NUKTA: "\u09DF"}
+_KHANDA_TA_RE = re.compile("\u09A4\u09CD" + ZWJ)  # ta + hasanta + ZWJ is the old spelling of ৎ
+# A pipe right after Bengali text is a dari typed with the nearest key (a full stop is left alone: ডা. = Dr.)
+_DARI_RE = re.compile(rf"(?<=[{BANGLA_RANGE}])\s*\|")
+_PUNCTUATION = (",", ";", ":", "!", "?", DARI, DOUBLE_DARI)
+_SPACE_AFTER_DARI_RE = re.compile(rf"([{DARI}{DOUBLE_DARI}])(?=[^\s{DARI}{DOUBLE_DARI}])")
+_BANGLA_CHAR_RE = re.compile(f"[{BANGLA_RANGE}]")
+
+def normalize_bangla(text: str) -> str:
+    """NFC with precomposed nukta letters and khanda ta, without invisible characters"""
+    if text.isascii():
+        return text
+    # Each step first checks (at memchr speed) whether it has anything to do
+    text = unicodedata.normalize("NFC", text)
+    if NUKTA in text:
+        for decomposed, composed in _NUKTA_MAP.items():
+            text = text.replace(decomposed, composed)
+    if ZWJ in text:
+        text = _KHANDA_TA_RE.sub("\u09CE", text)
+    if _INVISIBLE_RE.search(text):
+        text = _INVISIBLE_RE.sub("", text)
+    if FAKE_DARI in text:
+        text = text.replace(FAKE_DARI, DARI)
+    return text
+
+def clean_bangla_text(text: str, digits: str = "") -> str:
+    """Clean and format Bengali text
+
+    Unicode and dari normalization, no space before punctuation, one space
+    after a dari, collapsed whitespace. digits="ascii" or "bangla" converts
+    numerals to that script; the default leaves them as transcribed.
+    """
+    if not text:
+        return ""
+
+    text = normalize_bangla(text)
+    if "|" in text:
+        text = _DARI_RE.sub(DARI, text)
+    if DARI in text or DOUBLE_DARI in text:
+        text = _SPACE_AFTER_DARI_RE.sub(r"\1 ", text)
+    if digits == "ascii":
+        text = text.translate(TO_ASCII_DIGITS)
+    elif digits == "bangla":
+        text = text.translate(TO_BANGLA_DIGITS)
+
+    # Remove extra spaces and clean up
+    text = ' '.join(text.split())
+    # Whitespace is single spaces now, so plain replaces drop the space before punctuation
+    for mark in _PUNCTUATION:
+        if " " + mark in text:
+            text = text.replace(" " + mark, mark)
+    return text
+
+# -- script detection ----------------------------------------------------------------------
+
+_ASCII_LETTERS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+def is_bangla_text(text: str) -> bool:
+    """Check if text contains Bengali characters"""
+    if not text:
+        return False
+
+    # Bengali Unicode range: U+0980–U+09FF
+    return _BANGLA_CHAR_RE.search(text) is not None
+
+def script_counts(text: str):
+    """(Bengali characters, ASCII letters) in text"""
+    if text.isascii():
+        return 0, len(text) - len(text.encode("ascii").translate(None, _ASCII_LETTERS))
+    data = text.encode("utf-8")
+    # U+0980–U+09FF is exactly the UTF-8 lead pairs E0 A6 and E0 A7, and E0 only ever starts a character
+    bangla = data.count(b"\xe0\xa6") + data.count(b"\xe0\xa7")
+    latin = len(data) - len(data.translate(None, _ASCII_LETTERS))
+    return bangla, latin
+
+def bangla_ratio(text: str) -> float:
+    """Share of Bengali among Bengali and Latin characters (0.0 when there are neither)"""
+    bangla, latin = script_counts(text)
+    return bangla / (bangla + latin) if bangla + latin else 0.0
+
+def detect_language(text: str, bangla_above: float = 0.8, english_below: float = 0.2) -> str:
+    """"bn", "en" or "mixed" by script ratio; "" for text with neither script"""
+    bangla, latin = script_counts(text)
+    if not bangla + latin:
+        return ""
+    ratio = bangla / (bangla + latin)
+    if ratio >= bangla_above:
+        return "bn"
+    if ratio <= english_below:
+        return "en"
+    return "mixed"
+
+# -- code-mixed segmentation ---------------------------------------------------------------
+
+class LanguageSpan(NamedTuple):
+    language: str  # "bn" or "en"
+    start: int
+    end: int
+    text: str
+
+# Digits, punctuation and spaces stay inside a run; a run ends on a letter of its own script
+_NEUTRAL = r"\s\d,.!?;:'\"()\-–—%&/" + DARI + DOUBLE_DARI + ZWNJ + ZWJ
+_SPAN_RE = re.compile(
+    rf"(?P<bn>[{BANGLA_RANGE}](?:[{BANGLA_RANGE}{_NEUTRAL}]*[{BANGLA_RANGE}{DARI}{DOUBLE_DARI}])?)"
+    rf"|(?P<en>[A-Za-z](?:[A-Za-z{_NEUTRAL}]*[A-Za-z0-9.!?])?)"
+)
+
+def language_spans(text: str) -> List[LanguageSpan]:
+    """Split code-mixed Bangla–English text into runs of one script each, in order"""
+    return [LanguageSpan(match.lastgroup, match.start(), match.end(), match.group()) for match in _SPAN_RE.finditer(text)]
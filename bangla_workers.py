@@ -0,0 +1,166 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from audio_source import AudioSource
+from model_manager import create_bangla_model_manager
+
+class PoolSaturated(RuntimeError):
+    """Raised when the inference queue stays full for longer than the submit timeout"""
+
+# Per-process state, filled in by _init_worker in each worker process.
+# Each worker enforces BANGLA_MODEL_BUDGET_MB on its own models.
+_worker_models = None
+
+def _init_worker(preload_sizes, cpu_threads, num_workers):
+    global _worker_models
+    _worker_models = create_bangla_model_manager(cpu_threads=cpu_threads, num_workers=num_workers)
+    for size in preload_sizes:
+        _worker_models.get(size)
+
+def _warm_worker(model_sizes) -> int:
+    # Dummy inference on a second of silence allocates CTranslate2 buffers up front
+    import numpy as np
+
+    for size in model_sizes:
+        with _worker_models.lease(size) as model:
+            model(np.zeros(16000, dtype=np.float32))
+    return len(model_sizes)
+
+def _transcribe_in_worker(data: bytes, model_size: str) -> str:
+    samples = AudioSource(data).samples()
+    with _worker_models.lease(model_size) as model:
+        text = model(samples)
+    return text.strip() if text else ""
+
+class BanglaWorkerPool:
+    """Process pool running BanglaSpeech2Text outside the Streamlit script threads.
+
+    Each worker preloads its models and decodes with its own CTranslate2
+    threads, so throughput scales with cores instead of serializing on the
+    GIL and a single shared model. Requests beyond max_queue wait (for at
+    most queue_timeout seconds) instead of piling up without bound.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+        preload_sizes: Iterable[str] = ("base",),
+        max_queue: int = 8,
+        queue_timeout: float = 30.0,
+    ):
+        self.workers = workers
+        self.max_queue = max(max_queue, workers)
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peak_pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+        # spawn keeps CTranslate2 and Streamlit thread state out of the children
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(list(preload_sizes), cpu_threads, num_workers),
+        )
+
+    def submit(self, audio, model_size: str = "base", timeout: Optional[float] = None) -> Future:
+        """Queue a clip for transcription, waiting for a free slot if the queue is full"""
+        if not self._slots.acquire(timeout=self.queue_timeout if timeout is None else timeout):
+            with self._lock:
+                self._rejected += 1
+            raise PoolSaturated(f"BanglaSpeech2Text queue is full ({self.max_queue} requests in flight)")
+
+        data = audio.data if isinstance(audio, AudioSource) else bytes(audio)
+        with self._lock:
+            self._pending += 1
+            self._submitted += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+        started = time.perf_counter()
+        try:
+            future = self._executor.submit(_transcribe_in_worker, data, model_size)
+        except Exception:
+            self._release(started, failed=True)
+            raise
+        future.add_done_callback(lambda f: self._release(started, failed=f.exception() is not None))
+        return future
+
+    def transcribe(self, audio, model_size: str = "base", timeout: Optional[float] = None) -> Optional[str]:
+        """Blocking convenience wrapper around submit()"""
+        text = self.submit(audio, model_size, timeout).result()
+        return text if text else None
+
+    def warm_up(self, model_sizes: Iterable[str] = ()) -> int:
+        """Start every worker process and run a dummy inference in each; returns the worker count"""
+        sizes = list(model_sizes)
+        # One task per worker: the executor spawns a new process for each queued task up to max_workers
+        futures = [self._executor.submit(_warm_worker, sizes) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+        return len(futures)
+
+    def _release(self, started: float, failed: bool):
+        with self._lock:
+            self._pending -= 1
+            self._busy_seconds += time.perf_counter() - started
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+        self._slots.release()
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests submitted but not yet finished (queued plus running)"""
+        return self._pending
+
+    def metrics(self) -> dict:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._pending,
+                "peak_queue_depth": self._peak_pending,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_latency_s": self._busy_seconds / finished if finished else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+def create_bangla_worker_pool() -> Optional[BanglaWorkerPool]:
+    """Worker pool sized from settings, or None when BANGLA_WORKERS is 0"""
+    import os
+
+    import metrics
+    import settings
+
+    workers = settings.BANGLA_WORKERS
+    if workers <= 0:
+        return None
+    cpu_threads = settings.BANGLA_WORKER_CPU_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    pool = BanglaWorkerPool(
+        workers=workers,
+        cpu_threads=cpu_threads,
+        num_workers=settings.BANGLA_WORKER_NUM_WORKERS,
+        preload_sizes=settings.BANGLA_PRELOAD_SIZES,
+        max_queue=settings.BANGLA_WORKER_QUEUE_SIZE or workers * 4,
+        queue_timeout=settings.BANGLA_WORKER_QUEUE_TIMEOUT,
+    )
+    metrics.watch_queue("bangla_workers", lambda: {"bangla_workers": pool.queue_depth})
+    return pool
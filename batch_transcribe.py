@@ -0,0 +1,410 @@
+"""Batch/offline transcription of recordings from files, directories or uploads.
+
+    python batch_transcribe.py recordings/ --engine bangla --model-size base --out batch-out
+    python batch_transcribe.py calls/*.mp3 --engine deepgram --language en-US --workers 8
+
+Each file is decoded incrementally and split on pauses (long_audio), and its
+segments go through the engine layer a few at a time, so long recordings stay
+within memory and the micro-batcher, worker pool or remote connection pool
+always has several requests to work on. Files already in the transcript
+cache (same keys as the UI's long-form mode) are not transcribed again;
+the cache holds text only, so their JSONL record has "segments": null and
+no SRT is written for them (one left by an earlier run is kept).
+
+Results are appended to <out>/transcripts.jsonl and written to
+<out>/srt/<file>.srt as each file finishes. <out>/manifest.jsonl records
+every finished file, so rerunning the same command after an interruption
+skips them.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+import metrics
+import settings
+from audio_preprocess import PreprocessedAudio
+from audio_source import MODEL_SAMPLE_RATE, AudioSource
+from bangla_text import clean_bangla_text, detect_language
+from long_audio import TranscribedSegment, iter_audio_blocks, iter_speech_segments
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".ogg", ".oga", ".opus", ".flac", ".webm", ".aac", ".mp4")
+
+class BatchInput(NamedTuple):
+    name: str                   # relative path or upload name, as written to the outputs
+    key: str                    # identity in the manifest (path, size and mtime, or content hash)
+    read: Callable[[], bytes]
+
+class FileResult(NamedTuple):
+    name: str
+    key: str
+    audio_hash: Optional[str]
+    text: Optional[str]
+    segments: Optional[List[TranscribedSegment]]  # None for a cache hit: timings are not cached
+    duration: float
+    cached: bool
+    elapsed: float
+    error: Optional[str] = None
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def discover(paths: Iterable[str], extensions=AUDIO_EXTENSIONS) -> List[BatchInput]:
+    """Audio files named directly or found under directories, in a stable order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.lower().endswith(extensions))
+        elif os.path.isfile(path):
+            files.append(path)
+    inputs = []
+    for path in files:
+        stat = os.stat(path)
+        name = os.path.relpath(path)
+        inputs.append(BatchInput(name, f"{name}:{stat.st_size}:{stat.st_mtime_ns}", functools.partial(_read_file, path)))
+    return inputs
+
+def upload_input(name: str, data: bytes) -> BatchInput:
+    """An in-memory upload, identified by its content"""
+    return BatchInput(name, hashlib.md5(data).hexdigest(), lambda: data)
+
+def format_srt_time(seconds: float) -> str:
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+def srt_cue(index: int, segment: TranscribedSegment) -> str:
+    return f"{index}\n{format_srt_time(segment.start)} --> {format_srt_time(segment.end)}\n{segment.text}\n\n"
+
+class BatchProgress:
+    """Counts and throughput of a batch run"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.cached = 0
+        self.failed = 0
+        self.skipped = 0
+        self.audio_seconds = 0.0
+        self.started = time.perf_counter()
+
+    def add(self, result: FileResult):
+        if result.error:
+            self.failed += 1
+            return
+        self.done += 1
+        self.cached += result.cached
+        self.audio_seconds += result.duration
+
+    @property
+    def finished(self) -> int:
+        return self.done + self.failed + self.skipped
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def files_per_sec(self) -> float:
+        return (self.done + self.failed) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def audio_hours_per_hour(self) -> float:
+        """Hours of audio transcribed per hour of wall time (the batch's real-time speed-up)"""
+        return self.audio_seconds / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        parts = [f"{self.finished}/{self.total} files", f"{self.files_per_sec:.2f} files/s",
+                 f"{self.audio_hours_per_hour:.1f} audio-h/h"]
+        if self.cached:
+            parts.append(f"{self.cached} cached")
+        if self.skipped:
+            parts.append(f"{self.skipped} resumed")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        return " · ".join(parts)
+
+class BatchTranscriber:
+    """Transcribe many files with one engine, writing JSONL/SRT output and a resume manifest to out_dir.
+
+    workers files are processed at once, each with up to segment_concurrency
+    segments in flight. cache_model is the model component of the transcript
+    cache key (e.g. "nova-3" or "base"); "-longform" is appended, as in the UI.
+    """
+
+    def __init__(
+        self,
+        engine,
+        out_dir: str,
+        language: str = "en-US",
+        cache_model: Optional[str] = None,
+        options: Optional[dict] = None,
+        cache=None,
+        workers: int = 4,
+        segment_concurrency: int = 4,
+        srt: bool = True,
+        tag_languages: bool = False,
+        **segment_options,
+    ):
+        self.engine = engine
+        self.out_dir = out_dir
+        self.language = language
+        self.cache_model = f"{cache_model or engine.name}-longform"
+        self.options = options or {}
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.segment_concurrency = max(1, segment_concurrency)
+        self.srt = srt
+        self.tag_languages = tag_languages
+        self.segment_options = segment_options
+        self.encoding = settings.REMOTE_AUDIO_ENCODING if engine.name == "deepgram" else None
+        self.config = {"engine": engine.name, "model": self.cache_model, "language": language}
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.out_dir, "manifest.jsonl")
+
+    @property
+    def output_path(self) -> str:
+        return os.path.join(self.out_dir, "transcripts.jsonl")
+
+    def srt_path(self, name: str) -> str:
+        flat = name.replace(os.sep, "__").replace("/", "__")
+        return os.path.join(self.out_dir, "srt", os.path.splitext(flat)[0] + ".srt")
+
+    def completed(self) -> Dict[str, dict]:
+        """Manifest records of files already finished with this engine, model and language"""
+        records = {}
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interruption
+                    if record.get("config") == self.config:
+                        records[record["key"]] = record
+        except FileNotFoundError:
+            pass
+        return {key: record for key, record in records.items() if record["status"] == "done"}
+
+    # -- running -----------------------------------------------------------------------
+
+    def run(self, inputs: List[BatchInput], on_result: Optional[Callable[[FileResult, BatchProgress], None]] = None) -> BatchProgress:
+        os.makedirs(os.path.join(self.out_dir, "srt") if self.srt else self.out_dir, exist_ok=True)
+        completed = self.completed()
+        pending = [item for item in inputs if item.key not in completed]
+        progress = BatchProgress(len(inputs))
+        progress.skipped = len(inputs) - len(pending)
+
+        with open(self.output_path, "a", encoding="utf-8") as output, \
+                open(self.manifest_path, "a", encoding="utf-8") as manifest, \
+                ThreadPoolExecutor(self.workers, thread_name_prefix="batch") as pool:
+            queued = iter(pending)
+            running = set()
+
+            def fill():
+                # Only a few files ahead of the workers are read into memory
+                while len(running) < self.workers * 2:
+                    item = next(queued, None)
+                    if item is None:
+                        return
+                    running.add(pool.submit(self.process, item))
+
+            fill()
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    running.discard(future)
+                    result = future.result()
+                    self._record(result, output, manifest)
+                    progress.add(result)
+                    if on_result is not None:
+                        on_result(result, progress)
+                fill()
+        return progress
+
+    def _record(self, result: FileResult, output, manifest):
+        # The transcript is written before the manifest marks the file done
+        if not result.error:
+            output.write(json.dumps({
+                "file": result.name,
+                "hash": result.audio_hash,
+                **self.config,
+                "duration_s": round(result.duration, 3),
+                "text": result.text or "",
+                "segments": None if result.segments is None else [self._segment_record(segment) for segment in result.segments],
+                "cached": result.cached,
+                "elapsed_s": round(result.elapsed, 3),
+            }, ensure_ascii=False) + "\n")
+            output.flush()
+        record = {"key": result.key, "file": result.name, "hash": result.audio_hash,
+                  "status": "failed" if result.error else "done", "config": self.config}
+        if result.error:
+            record["error"] = result.error
+        manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+        manifest.flush()
+        metrics.count("batch_files_total", status="failed" if result.error else "cached" if result.cached else "transcribed")
+
+    def _segment_record(self, segment: TranscribedSegment) -> dict:
+        record = {"start": round(segment.start, 3), "end": round(segment.end, 3), "text": segment.text}
+        if self.tag_languages:
+            # Script-based tag for code-mixed Bangla–English speech: "bn", "en" or "mixed"
+            record["lang"] = detect_language(segment.text)
+        return record
+
+    def process(self, item: BatchInput) -> FileResult:
+        """Transcribe one file (or reuse its cached transcript); errors are returned, not raised"""
+        started = time.perf_counter()
+        audio_hash = None
+        try:
+            data = item.read()
+            audio_hash = hashlib.md5(data).hexdigest()
+            text = self.cache.get(audio_hash, self.engine.label, self.cache_model, self.language) if self.cache else None
+            if text is not None:
+                # Without cached segment timings there are no SRT cues to write; an earlier SRT is kept
+                duration = AudioSource(data).duration
+                return FileResult(item.name, item.key, audio_hash, text, None, duration, True, time.perf_counter() - started)
+
+            segments, duration = self.transcribe(item.name, data)
+            text = " ".join(segment.text for segment in segments)
+            if text and self.language == "bn-BD":
+                text = clean_bangla_text(text)
+            if text and self.cache:
+                self.cache.put(audio_hash, self.engine.label, self.cache_model, self.language, text)
+            elapsed = time.perf_counter() - started
+            metrics.record_audio(f"batch-{self.engine.name}", duration, elapsed)
+            return FileResult(item.name, item.key, audio_hash, text, segments, duration, False, elapsed)
+        except Exception as e:
+            return FileResult(item.name, item.key, audio_hash, None, [], 0.0, False,
+                              time.perf_counter() - started, f"{type(e).__name__}: {e}")
+
+    def transcribe(self, name: str, data: bytes):
+        """(segments, duration in seconds); SRT cues are written as segments finish"""
+        decoded = [0]
+
+        def counted(blocks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+            for block in blocks:
+                decoded[0] += len(block)
+                yield block
+
+        srt_path = self.srt_path(name) if self.srt else None
+        srt = open(srt_path + ".part", "w", encoding="utf-8") if srt_path else None
+        segments = []
+        in_flight = deque()
+
+        def collect():
+            segment, future = in_flight.popleft()
+            text = future.result()
+            text = text.strip() if text else ""
+            if text and self.language == "bn-BD":
+                text = clean_bangla_text(text)
+            if text:
+                segments.append(TranscribedSegment(segment.start, segment.end, text))
+                if srt:
+                    srt.write(srt_cue(len(segments), segments[-1]))
+                    srt.flush()
+
+        try:
+            blocks = counted(iter_audio_blocks(AudioSource(data)))
+            for segment in iter_speech_segments(blocks, **self.segment_options):
+                # Per-segment encoding in the engine's native rate and upload format
+                audio = PreprocessedAudio(segment.samples, MODEL_SAMPLE_RATE, "segment", []).for_engine(self.engine.label, self.encoding)
+                in_flight.append((segment, self.engine.submit(audio, self.language, **self.options)))
+                if len(in_flight) >= self.segment_concurrency:
+                    collect()
+            while in_flight:
+                collect()
+        except BaseException:
+            for _, future in in_flight:
+                future.cancel()
+            raise
+        finally:
+            if srt:
+                srt.close()
+        if srt_path:
+            os.replace(srt_path + ".part", srt_path)
+        return segments, decoded[0] / float(MODEL_SAMPLE_RATE)
+
+# -- command line ------------------------------------------------------------------------
+
+def create_batch_engine(name: str):
+    """Registry engine with its own models, worker pool and batchers (no Streamlit)"""
+    from engines import create_engine
+
+    if name != "bangla":
+        return create_engine(name)  # remote engines share one pooled client layer
+    from bangla_workers import create_bangla_worker_pool
+    from micro_batching import create_bangla_batcher
+    from model_manager import create_bangla_model_manager
+
+    models = create_bangla_model_manager()
+    batchers = functools.lru_cache(maxsize=None)(lambda size: create_bangla_batcher(models, size))
+    return create_engine(name, models=models, worker_pool=create_bangla_worker_pool(), get_batcher=batchers)
+
+def main():
+    from engines import available_engines
+    from transcript_cache import TranscriptCache
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="audio files and/or directories (searched recursively)")
+    parser.add_argument("--engine", default="bangla", choices=available_engines())
+    parser.add_argument("--language", help="BCP-47 code (default: bn-BD for bangla, en-US otherwise)")
+    parser.add_argument("--model", help="Deepgram model (default: the engine's)")
+    parser.add_argument("--model-size", default="base", help="BanglaSpeech2Text size, or auto")
+    parser.add_argument("--out", default=settings.BATCH_OUTPUT_DIR, help="directory for transcripts.jsonl, srt/ and manifest.jsonl")
+    parser.add_argument("--workers", type=int, default=settings.BATCH_WORKERS, help="files processed at once")
+    parser.add_argument("--segment-concurrency", type=int, default=settings.BATCH_SEGMENT_CONCURRENCY,
+                        help="segments of one file in flight at once")
+    parser.add_argument("--max-segment-s", type=float, default=25.0)
+    parser.add_argument("--no-srt", action="store_true")
+    parser.add_argument("--tag-languages", action="store_true", help="tag each segment bn/en/mixed by script in the JSONL")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the transcript cache")
+    args = parser.parse_args()
+
+    inputs = discover(args.paths)
+    if not inputs:
+        parser.error("no audio files found")
+    engine = create_batch_engine(args.engine)
+    language = args.language or ("bn-BD" if args.engine == "bangla" else "en-US")
+    options = {"model_size": args.model_size} if args.engine == "bangla" else {"model": args.model} if args.model else {}
+    cache_model = {"bangla": args.model_size, "deepgram": args.model or getattr(engine, "model", None)}.get(args.engine)
+    cache = None if args.no_cache else TranscriptCache(
+        settings.TRANSCRIPT_CACHE_PATH,
+        max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+        max_bytes=settings.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024,
+    )
+    batch = BatchTranscriber(engine, args.out, language, cache_model, options, cache, args.workers,
+                             args.segment_concurrency, srt=not args.no_srt, tag_languages=args.tag_languages,
+                             max_segment_s=args.max_segment_s)
+
+    def report(result: FileResult, progress: BatchProgress):
+        status = (f"failed: {result.error}" if result.error else "cached, no segment timings or SRT" if result.cached
+                  else f"{len(result.segments)} segments")
+        print(f"[{progress.finished}/{progress.total}] {result.name} ({result.duration:.1f}s audio, {status}) | {progress.summary()}",
+              flush=True)
+
+    print(f"{len(inputs)} files → {args.out} ({args.engine}, {language})", flush=True)
+    try:
+        progress = batch.run(inputs, report)
+    except KeyboardInterrupt:
+        print("\nInterrupted; rerun the same command to resume", flush=True)
+        raise SystemExit(130)
+    print(f"Done in {progress.elapsed:.1f}s: {progress.summary()}")
+    if progress.failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
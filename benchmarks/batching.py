@@ -0,0 +1,89 @@
+"""Clips/sec versus batch size for the BanglaSpeech2Text micro-batching scheduler.
+
+Simulates `--concurrency` clients, each submitting short clips through a
+MicroBatcher in front of one model, and reports throughput and latency for
+every batch size:
+
+    python -m benchmarks.batching --model-size base --batch-sizes 1 2 4 8 16
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+from bangla_model import create_bangla_model
+from benchmarks.common import synthetic_clips
+from micro_batching import MicroBatcher, batched_recognize
+
+def run(model, clips: list, batch_size: int, concurrency: int, max_wait_ms: float) -> dict:
+    if batch_size <= 1:
+        batcher = MicroBatcher(lambda items: [model(item) for item in items], max_batch_size=1, max_wait_ms=0)
+    else:
+        batcher = MicroBatcher(lambda items: batched_recognize(model, items), batch_size, max_wait_ms)
+
+    latencies = []
+    lock = threading.Lock()
+    cursor = iter(range(len(clips)))
+
+    def client():
+        while True:
+            with lock:
+                index = next(cursor, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            batcher(clips[index])
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    metrics = batcher.metrics()
+    batcher.close()
+
+    latencies.sort()
+    return {
+        "batch_size": batch_size,
+        "clips": len(clips),
+        "seconds": elapsed,
+        "clips_per_sec": len(clips) / elapsed,
+        "p50_latency_ms": statistics.median(latencies) * 1000,
+        "p95_latency_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "avg_batch_size": metrics["avg_batch_size"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--clips", type=int, default=64)
+    parser.add_argument("--clip-seconds", type=float, default=4.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--max-wait-ms", type=float, default=30.0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    model = create_bangla_model(args.model_size)
+    clips = synthetic_clips(args.clips, args.clip_seconds)
+    model(clips[0])  # warm-up so the first row isn't paying allocation costs
+
+    results = []
+    print(f"{'batch':>5} {'clips/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'avg batch':>10}")
+    for batch_size in args.batch_sizes:
+        result = run(model, clips, batch_size, args.concurrency, args.max_wait_ms)
+        results.append(result)
+        print(f"{batch_size:>5} {result['clips_per_sec']:>9.2f} {result['p50_latency_ms']:>9.1f} "
+              f"{result['p95_latency_ms']:>9.1f} {result['avg_batch_size']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model_size": args.model_size, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
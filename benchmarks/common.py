@@ -0,0 +1,183 @@
+"""Shared pieces for the benchmark scripts: fixed corpora, timing, percentiles and JSON output"""
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Clip lengths (seconds) of the fixed audio corpus: short commands up to a full Whisper window
+CORPUS_SECONDS = (2.0, 5.0, 10.0, 30.0)
+
+def synthetic_clips(count: int, seconds: float, seed: int = 0) -> list:
+    """Deterministic speech-like clips: amplitude-modulated noise bursts at 16 kHz"""
+    rng = np.random.default_rng(seed)
+    length = int(16000 * seconds)
+    envelope = 0.5 * (1 + np.sin(np.linspace(0, 6 * np.pi, length)))
+    return [(rng.standard_normal(length) * 0.05 * envelope).astype(np.float32) for _ in range(count)]
+
+def audio_corpus(seconds: Iterable[float] = CORPUS_SECONDS, seed: int = 0) -> Dict[str, bytes]:
+    """Fixed set of 16 kHz mono WAV clips, one per length, identical on every run"""
+    from audio_preprocess import encode
+
+    corpus = {}
+    for index, length in enumerate(seconds):
+        clip = synthetic_clips(1, length, seed + index)[0]
+        # Half a second of silence on both ends, like a recorder clip cut on a pause
+        padded = np.concatenate([np.zeros(8000, np.float32), clip, np.zeros(8000, np.float32)])
+        corpus[f"{length:g}s"] = encode(padded, 16000, "wav")
+    return corpus
+
+BANGLA_SAMPLE = "আমি বাংলায় কথা বলি।  এটা একটা   পরীক্ষা বাক্য, with some English words mixed in.\n"
+
+def text_corpus(megabytes: float, seed: int = 0) -> str:
+    """Mixed Bengali/English text of roughly the requested UTF-8 size"""
+    rng = np.random.default_rng(seed)
+    words = BANGLA_SAMPLE.split(" ")
+    target = int(megabytes * 1024 * 1024)
+    parts, size = [], 0
+    while size < target:
+        line = " ".join(words[i] for i in rng.integers(0, len(words), 24)) + "\n"
+        parts.append(line)
+        size += len(line.encode("utf-8"))
+    return "".join(parts)
+
+def summarize(latencies: List[float]) -> dict:
+    """p50/p95/p99/mean/max in milliseconds"""
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+def time_runs(fn: Callable[[], object], runs: int, warmup: int = 0) -> dict:
+    """Cold (first call) plus warm latency statistics for fn"""
+    started = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - started
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return {"cold_ms": round(cold * 1000, 3), "warm": summarize(latencies)}
+
+def run_concurrent(fn: Callable[[int], object], requests: int, concurrency: int) -> dict:
+    """Issue `requests` calls of fn(index) from `concurrency` client threads; throughput and latency"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    cursor = iter(range(requests))
+
+    def client():
+        while True:
+            with lock:
+                index = next(cursor, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            try:
+                fn(index)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        **summarize(latencies),
+    }
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (and waited-for children) in MB"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # bytes on macOS, KB on Linux
+    return round(max(own, children) / scale, 1)
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def write_json(path: str, suite: str, results: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"suite": suite, "environment": environment(), "peak_rss_mb": peak_rss_mb(), "results": results},
+                  f, indent=2, ensure_ascii=False)
+
+def compare(current: dict, baseline_path: str, threshold: float = 0.10) -> List[str]:
+    """Lines describing p50/p95/p99 changes against a previous JSON report; regressions are flagged"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f).get("results", {})
+
+    lines = []
+
+    def walk(now, before, path):
+        if isinstance(now, dict) and isinstance(before, dict):
+            for key, value in now.items():
+                if key in before:
+                    walk(value, before[key], f"{path}.{key}" if path else key)
+        elif isinstance(now, (int, float)) and isinstance(before, (int, float)) and before > 0:
+            if path.rsplit(".", 1)[-1] in ("p50_ms", "p95_ms", "p99_ms", "cold_ms", "rtf", "load_s"):
+                change = (now - before) / before
+                flag = "  REGRESSION" if change > threshold else ""
+                lines.append(f"{path}: {before:.2f} → {now:.2f} ({change:+.1%}){flag}")
+
+    walk(current, baseline, "")
+    return lines
+
+def print_table(rows: List[dict], columns: List[str], title: Optional[str] = None):
+    if title:
+        print(f"\n== {title}")
+    if not rows:
+        print("(no results)")
+        return
+    widths = {column: max(len(column), *(len(_cell(row.get(column))) for row in rows)) for column in columns}
+    print("  ".join(column.rjust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(_cell(row.get(column)).rjust(widths[column]) for column in columns))
+
+def _cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}" if abs(value) < 100 else f"{value:.1f}"
+    return "-" if value is None else str(value)
@@ -0,0 +1,56 @@
+"""Local stand-ins for the remote services, with configurable latency"""
+import argparse
+import threading
+from http.server import ThreadingHTTPServer
+
+from mock_speech_server import MockSpeechHandler
+
+class SpeechStub:
+    """In-process mock of the Deepgram and Google REST APIs (see mock_speech_server.py)"""
+
+    def __init__(self, latency_ms: float = 200.0, jitter_ms: float = 50.0, slow_rate: float = 0.0,
+                 slow_ms: float = 3000.0, error_rate: float = 0.0, transcript: str = "benchmark transcript",
+                 error_codes=(503,), slow_first: int = 0, fail_first: int = 0):
+        config = argparse.Namespace(
+            latency_ms=latency_ms, jitter_ms=jitter_ms, slow_rate=slow_rate, slow_ms=slow_ms,
+            error_rate=error_rate, error_codes=list(error_codes), transcript=transcript, verbose=False,
+            slow_first=slow_first, fail_first=fail_first,
+        )
+        handler = type("StubHandler", (MockSpeechHandler,), {
+            "config": config,
+            "counters": dict.fromkeys(MockSpeechHandler.counters, 0),
+            "counters_lock": threading.Lock(),
+            "peers": set(),
+        })
+        self.handler = handler
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="speech-stub", daemon=True)
+
+    def __enter__(self) -> "SpeechStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self) -> dict:
+        """Server-side counters, as served on GET /stats"""
+        with self.handler.counters_lock:
+            return {**self.handler.counters, "connections": len(self.handler.peers)}
+
+    def remote_engines(self, concurrency: int = 8, hedge_after: float = 0.0):
+        """RemoteEngines pointed at this stub for both Deepgram and Google"""
+        from remote_engines import RemoteEngines, RetryPolicy
+
+        return RemoteEngines(
+            deepgram_api_key="stub",
+            deepgram_url=self.url,
+            google_url=f"{self.url}/speech-api/v2/recognize",
+            google_key="stub",
+            concurrency={"deepgram": concurrency, "google": concurrency},
+            retry=RetryPolicy(attempts=3, timeout=30.0),
+            hedge_after=hedge_after or None,
+        )
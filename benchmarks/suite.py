@@ -0,0 +1,237 @@
+"""Reproducible performance suite for the pieces the app is built from.
+
+Suites (pick with --suites, default: text engines voice):
+    model-load  BanglaSpeech2Text load time per size, each in a fresh process (cold) and reloaded (warm)
+    rtf         real-time factor of BanglaSpeech2Text per size and compute_type on the fixed corpus
+    text        Bengali post-processing (clean, normalize, script ratio, language spans, detection)
+                throughput on multi-MB inputs, next to the old split/join and per-character baselines
+    engines     Deepgram and Google engines against a local stub with configurable latency,
+                single-request cold/warm latency and throughput under N concurrent clients
+    voice       STT → LLM → TTS chain with the stub, a fake streaming LLM and a fake TTS:
+                time to first token, time to first audio and total latency
+
+Every run uses the same synthetic corpus, reports p50/p95/p99 and peak RSS,
+and can be saved as JSON and compared with an earlier run:
+
+    python -m benchmarks.suite --suites rtf --sizes tiny base --compute-types int8 float32
+    python -m benchmarks.suite --json after.json --compare before.json
+"""
+import argparse
+import multiprocessing
+import time
+
+from benchmarks.common import (audio_corpus, compare, peak_rss_mb, print_table, run_concurrent, text_corpus,
+                               time_runs, write_json)
+
+SUITES = ["model-load", "rtf", "text", "engines", "voice"]
+
+def _load_in_fresh_process(model_size: str, compute_type: str) -> dict:
+    started = time.perf_counter()
+    from bangla_model import create_bangla_model
+    imported = time.perf_counter()
+    model = create_bangla_model(model_size, compute_type=compute_type)
+    loaded = time.perf_counter()
+    del model
+    create_bangla_model(model_size, compute_type=compute_type)
+    reloaded = time.perf_counter()
+    return {
+        "import_s": round(imported - started, 3),
+        "load_s": round(loaded - imported, 3),
+        "warm_load_s": round(reloaded - loaded, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def bench_model_load(args) -> dict:
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        for compute_type in args.compute_types:
+            with context.Pool(1) as pool:
+                try:
+                    result = pool.apply(_load_in_fresh_process, (size, compute_type))
+                except Exception as e:
+                    result = {"error": str(e)}
+            results[f"{size}/{compute_type}"] = result
+    print_table([{"model": key, **value} for key, value in results.items()],
+                ["model", "import_s", "load_s", "warm_load_s", "peak_rss_mb", "error"], "model load")
+    return results
+
+def bench_rtf(args, corpus: dict) -> dict:
+    from bangla_model import create_bangla_model
+    from engines import BanglaEngine
+
+    results = {}
+    rows = []
+    for size in args.sizes:
+        for compute_type in args.compute_types:
+            key = f"{size}/{compute_type}"
+            try:
+                model = create_bangla_model(size, compute_type=compute_type)
+            except Exception as e:
+                results[key] = {"error": str(e)}
+                rows.append({"model": key, "error": str(e)})
+                continue
+            engine = BanglaEngine(load_model=lambda _size, model=model: model)
+            results[key] = {}
+            for name, wav in corpus.items():
+                seconds = float(name.rstrip("s"))
+                timing = time_runs(lambda wav=wav: engine.transcribe(wav), args.runs)
+                timing["rtf"] = round(timing["warm"]["p50_ms"] / 1000 / seconds, 4)
+                results[key][name] = timing
+                rows.append({"model": key, "clip": name, "cold_ms": timing["cold_ms"],
+                             "p50_ms": timing["warm"]["p50_ms"], "p95_ms": timing["warm"]["p95_ms"],
+                             "rtf": timing["rtf"]})
+            del engine, model
+    print_table(rows, ["model", "clip", "cold_ms", "p50_ms", "p95_ms", "rtf", "error"], "BanglaSpeech2Text real-time factor")
+    return results
+
+def _loop_is_bangla(text: str) -> bool:
+    # The per-character scan is_bangla_text used before, kept as a baseline
+    return any("\u0980" <= char <= "\u09FF" for char in text)
+
+def bench_text(args) -> dict:
+    from bangla_text import bangla_ratio, clean_bangla_text, is_bangla_text, language_spans, normalize_bangla
+
+    results = {}
+    rows = []
+    for megabytes in args.text_mb:
+        text = text_corpus(megabytes)
+        latin = "x" * len(text)
+        size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+        for name, fn in (("clean_bangla_text", clean_bangla_text), ("normalize_bangla", normalize_bangla),
+                         ("split/join (old clean)", lambda text: " ".join(text.split())),
+                         ("bangla_ratio", bangla_ratio), ("language_spans", language_spans),
+                         ("is_bangla_text", is_bangla_text),
+                         ("is_bangla_text(latin)", lambda _text: is_bangla_text(latin)),
+                         ("per-char loop(latin)", lambda _text: _loop_is_bangla(latin))):
+            timing = time_runs(lambda fn=fn: fn(text), args.runs)
+            timing["mb_per_s"] = round(size_mb / (timing["warm"]["p50_ms"] / 1000), 2) if timing["warm"]["p50_ms"] else None
+            results[f"{name}@{megabytes:g}MB"] = timing
+            rows.append({"function": name, "input_mb": round(size_mb, 2), "p50_ms": timing["warm"]["p50_ms"],
+                         "p99_ms": timing["warm"]["p99_ms"], "mb_per_s": timing["mb_per_s"]})
+    print_table(rows, ["function", "input_mb", "p50_ms", "p99_ms", "mb_per_s"], "Bengali text processing")
+    return results
+
+def bench_engines(args, corpus: dict) -> dict:
+    from benchmarks.stubs import SpeechStub
+    from engines import create_engine
+
+    clips = list(corpus.values())
+    results = {}
+    rows = []
+    with SpeechStub(latency_ms=args.stub_latency_ms, jitter_ms=args.stub_jitter_ms) as stub:
+        remote = stub.remote_engines(concurrency=max(args.concurrency))
+        for name in ("deepgram", "google"):
+            engine = create_engine(name, remote=remote)
+            single = time_runs(lambda engine=engine: engine.transcribe(clips[0]), args.runs)
+            results[name] = {"single": single, "concurrent": {}}
+            for concurrency in args.concurrency:
+                load = run_concurrent(lambda i, engine=engine: engine.transcribe(clips[i % len(clips)]),
+                                      args.requests, concurrency)
+                results[name]["concurrent"][str(concurrency)] = load
+                rows.append({"engine": name, "clients": concurrency, "req_per_s": load["requests_per_sec"],
+                             "p50_ms": load["p50_ms"], "p95_ms": load["p95_ms"], "p99_ms": load["p99_ms"],
+                             "errors": load["errors"]})
+        results["remote_stats"] = remote.stats()
+        remote.close()
+    print_table(rows, ["engine", "clients", "req_per_s", "p50_ms", "p95_ms", "p99_ms", "errors"],
+                f"remote engines (stub latency {args.stub_latency_ms:g}±{args.stub_jitter_ms:g} ms)")
+    return results
+
+def bench_voice(args, corpus: dict) -> dict:
+    import threading
+
+    from benchmarks.common import summarize
+    from benchmarks.stubs import SpeechStub
+    from engines import create_engine
+    from voice_reply import VoiceReplyPipeline, fake_llm, fake_tts
+
+    wav = corpus[next(iter(corpus))]
+    tts = fake_tts(args.tts_ms_per_char)
+    samples = {"stt": [], "first_token": [], "first_audio": [], "total": [], "baseline_first_audio": []}
+    lock = threading.Lock()
+
+    with SpeechStub(latency_ms=args.stub_latency_ms, jitter_ms=args.stub_jitter_ms) as stub:
+        remote = stub.remote_engines(concurrency=max(args.concurrency))
+        engine = create_engine("deepgram", remote=remote)
+
+        def chain(_index):
+            started = time.perf_counter()
+            engine.transcribe(wav)
+            stt = time.perf_counter() - started
+            pipeline = VoiceReplyPipeline(fake_llm(tokens_per_second=args.tokens_per_second), tts)
+            for _event in pipeline.events():
+                pass
+            total = time.perf_counter() - started
+            with lock:
+                samples["stt"].append(stt)
+                samples["first_token"].append(stt + pipeline.first_token_at)
+                samples["first_audio"].append(stt + pipeline.first_audio_at)
+                samples["total"].append(total)
+
+        def baseline(_index):
+            # Previous behaviour: full reply, then one TTS call for all of it
+            started = time.perf_counter()
+            engine.transcribe(wav)
+            tts("".join(fake_llm(tokens_per_second=args.tokens_per_second)))
+            with lock:
+                samples["baseline_first_audio"].append(time.perf_counter() - started)
+
+        results = {}
+        rows = []
+        for concurrency in args.concurrency:
+            for values in samples.values():
+                values.clear()
+            load = run_concurrent(chain, args.voice_requests, concurrency)
+            run_concurrent(baseline, args.voice_requests, concurrency)
+            stages = {name: summarize(values) for name, values in samples.items()}
+            results[str(concurrency)] = {"throughput": load, "stages": stages}
+            for name, stats in stages.items():
+                rows.append({"clients": concurrency, "stage": name, "p50_ms": stats.get("p50_ms"),
+                             "p95_ms": stats.get("p95_ms"), "p99_ms": stats.get("p99_ms")})
+        remote.close()
+    print_table(rows, ["clients", "stage", "p50_ms", "p95_ms", "p99_ms"], "voice reply chain (stub STT, fake LLM/TTS)")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=["text", "engines", "voice"])
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base"])
+    parser.add_argument("--compute-types", nargs="+", default=["int8"])
+    parser.add_argument("--runs", type=int, default=5, help="warm repetitions per measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    parser.add_argument("--voice-requests", type=int, default=16)
+    parser.add_argument("--stub-latency-ms", type=float, default=200.0)
+    parser.add_argument("--stub-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--tts-ms-per-char", type=float, default=4.0)
+    parser.add_argument("--text-mb", type=float, nargs="+", default=[1.0, 8.0])
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier JSON report to compare p50/p95/p99 against")
+    args = parser.parse_args()
+
+    corpus = audio_corpus()
+    results = {}
+    for suite in args.suites:
+        if suite == "model-load":
+            results[suite] = bench_model_load(args)
+        elif suite == "rtf":
+            results[suite] = bench_rtf(args, corpus)
+        elif suite == "text":
+            results[suite] = bench_text(args)
+        elif suite == "engines":
+            results[suite] = bench_engines(args, corpus)
+        elif suite == "voice":
+            results[suite] = bench_voice(args, corpus)
+    print(f"\npeak RSS: {peak_rss_mb()} MB")
+
+    if args.json:
+        write_json(args.json, "suite", results)
+    if args.compare:
+        print(f"\n== compared with {args.compare}")
+        for line in compare(results, args.compare):
+            print(line)
+
+if __name__ == "__main__":
+    main()
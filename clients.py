@@ -0,0 +1,48 @@
+import os
+from typing import Optional
+
+import settings
+
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+def create_groq_client(api_key: Optional[str] = None):
+    """Build the Groq chat client, or None when no API key is configured"""
+    from langchain_groq import ChatGroq
+
+    groq_api_key = api_key or os.getenv("GROQ_API_KEY")
+    if not groq_api_key:
+        return None
+
+    return ChatGroq(
+        groq_api_key=groq_api_key,
+        model_name=GROQ_MODEL,
+        temperature=0.3,  # Lower temperature for faster responses
+        max_tokens=512,   # Reduced tokens for faster generation
+        streaming=True    # Enable streaming for faster responses
+    )
+
+def create_deepgram_client(api_key: Optional[str] = None):
+    """Build the Deepgram client, pointed at DEEPGRAM_URL when that is set"""
+    from deepgram import DeepgramClient, DeepgramClientOptions
+
+    deepgram_api_key = api_key or settings.DEEPGRAM_API_KEY
+    if not deepgram_api_key:
+        return None
+
+    if settings.DEEPGRAM_URL:
+        return DeepgramClient(deepgram_api_key, DeepgramClientOptions(url=settings.DEEPGRAM_URL))
+    return DeepgramClient(deepgram_api_key)
+
+def create_remote_engines():
+    """Shared asyncio client layer for the Deepgram and Google REST APIs"""
+    from remote_engines import RemoteEngines, RetryPolicy
+
+    return RemoteEngines(
+        deepgram_api_key=settings.DEEPGRAM_API_KEY,
+        deepgram_url=settings.DEEPGRAM_URL or "https://api.deepgram.com",
+        google_url=settings.GOOGLE_SPEECH_URL,
+        google_key=settings.GOOGLE_SPEECH_KEY,
+        concurrency={"deepgram": settings.DEEPGRAM_CONCURRENCY, "google": settings.GOOGLE_CONCURRENCY},
+        retry=RetryPolicy(attempts=max(1, settings.REMOTE_RETRIES), timeout=float(settings.REMOTE_TIMEOUT_S)),
+        hedge_after=settings.REMOTE_HEDGE_AFTER_MS / 1000.0,
+    )
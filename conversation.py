@@ -0,0 +1,222 @@
+"""Conversation context for the assistant: a fixed prompt prefix, a token-budgeted window and a running summary.
+
+Every request is built as
+
+    [system prompt] [summary of older turns] [newest turns that fit the token budget]
+
+The system prompt and the LangChain message objects are built once and
+reused, and the prefix stays identical between requests so provider-side
+prompt caching applies. Turns that fall out of the window are folded into
+the summary in the background instead of being dropped. Replies are cached
+by the exact prompt, so an identical history and question is answered
+without calling the model.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+import metrics
+from llm_chat import chat_message, system_message
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You keep a running summary of a conversation between a user and an AI assistant.
+Update the summary below with the new turns. Keep every requirement, decision, name, number and open
+question; drop greetings and filler. Reply with the updated summary only, at most {words} words.
+
+Summary so far:
+{summary}
+
+New turns:
+{turns}"""
+
+def estimate_tokens(text: str) -> int:
+    """Rough Llama 3 token count: about 4 characters per token for Latin text, 2 for Bengali script"""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return 4 + ascii_chars // 4 + (len(text) - ascii_chars) // 2
+
+def summarize(client, summary: str, turns: List[dict], words: int = 150) -> str:
+    """Fold chat turns into the summary with one model call"""
+    lines = "\n".join(f"{message['role']}: {message['content']}" for message in turns)
+    prompt = SUMMARY_PROMPT.format(words=words, summary=summary or "(empty)", turns=lines)
+    return client.invoke([chat_message("user", prompt)]).content.strip()
+
+class ResponseCache:
+    """Assistant replies keyed by the exact prompt, least recently used evicted first"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: list) -> str:
+        digest = hashlib.sha256(model.encode("utf-8"))
+        for message in prompt:
+            digest.update(b"\x00" + message.type.encode("utf-8") + b"\x00" + message.content.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            reply = self._entries.get(key)
+            if reply is not None:
+                self._entries.move_to_end(key)
+        metrics.cache_result("llm", reply is not None)
+        return reply
+
+    def put(self, key: str, reply: str):
+        with self._lock:
+            self._entries[key] = reply
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class Conversation:
+    """Prompt builder and reply source for one conversation.
+
+    messages are {"role", "content"} dicts, oldest first; an optional "seq"
+    identifies a turn across calls (otherwise its position in the list, so
+    pass the full history). With summarize=False older turns are simply
+    left out, for callers that do not keep a Conversation between requests.
+    """
+
+    def __init__(
+        self,
+        client,
+        cache: Optional[ResponseCache] = None,
+        budget_tokens: int = 1500,
+        summarize: bool = True,
+        fold_min_messages: int = 2,
+        summary_words: int = 150,
+    ):
+        self.client = client
+        self.cache = cache
+        self.budget_tokens = budget_tokens
+        self.summarize = summarize
+        self.fold_min_messages = fold_min_messages
+        self.summary_words = summary_words
+        self.summary = ""
+        self._folded_through = -1
+        self._folding = False
+        self._summary_cache = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        return getattr(self.client, "model_name", "") or ""
+
+    def window(self, messages: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """(newest turns within budget_tokens, older turns); the newest turn is always kept"""
+        messages = [message for message in messages if message["role"] in ("user", "assistant")]
+        used = 0
+        start = len(messages)
+        while start > 0:
+            cost = estimate_tokens(messages[start - 1]["content"])
+            if start < len(messages) and used + cost > self.budget_tokens:
+                break
+            used += cost
+            start -= 1
+        return messages[start:], messages[:start]
+
+    def prompt(self, messages: List[dict]) -> list:
+        """LangChain messages for the next reply"""
+        kept, dropped = self.window(messages)
+        if self.summarize and dropped:
+            self._fold(messages, dropped)
+        prompt = [system_message()]
+        if self.summary:
+            prompt.append(self._summary_message())
+        prompt.extend(chat_message(message["role"], message["content"]) for message in kept)
+        metrics.count("llm_prompt_tokens_total", sum(estimate_tokens(message.content) for message in prompt))
+        return prompt
+
+    def _summary_message(self):
+        from langchain.schema import SystemMessage
+
+        summary = self.summary
+        if self._summary_cache is None or self._summary_cache[0] != summary:
+            self._summary_cache = (summary, SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+        return self._summary_cache[1]
+
+    def _fold(self, messages: List[dict], dropped: List[dict]):
+        positions = {id(message): i for i, message in enumerate(messages)}
+        ids = [message.get("seq", positions[id(message)]) for message in dropped]
+        with self._lock:
+            new = [(turn_id, message) for turn_id, message in zip(ids, dropped) if turn_id > self._folded_through]
+            if self._folding or len(new) < self.fold_min_messages:
+                return
+            self._folding = True
+        # The reply does not wait for the summary; the next request picks it up
+        threading.Thread(target=self._fold_now, args=([message for _, message in new], new[-1][0]),
+                         name="conversation-summary", daemon=True).start()
+
+    def _fold_now(self, turns: List[dict], last_id: int):
+        try:
+            with metrics.span("llm_summary", turns=len(turns)):
+                summary = summarize(self.client, self.summary, turns, self.summary_words)
+            with self._lock:
+                self.summary = summary
+                self._folded_through = last_id
+        except Exception as e:
+            logger.warning("Could not update the conversation summary: %s", e)
+        finally:
+            with self._lock:
+                self._folding = False
+
+    def stream(self, messages: List[dict]) -> Iterator[str]:
+        """Yield reply tokens, or the cached reply for an identical prompt in one piece"""
+        prompt = self.prompt(messages)
+        key = ResponseCache.key(self.model, prompt) if self.cache is not None else None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        for chunk in self.client.stream(prompt):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        # Only complete replies are cached; an abandoned stream never reaches this point
+        if key and parts:
+            self.cache.put(key, "".join(parts))
+
+    def invoke(self, messages: List[dict]) -> str:
+        prompt = self.prompt(messages)
+        key = ResponseCache.key(self.model, prompt) if self.cache is not None else None
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
+        reply = self.client.invoke(prompt).content
+        if key and reply:
+            self.cache.put(key, reply)
+        return reply
+
+    def reset(self):
+        with self._lock:
+            self.summary = ""
+            self._folded_through = -1
+
+    def stats(self) -> dict:
+        return {
+            "summary_chars": len(self.summary),
+            "folded_through": self._folded_through,
+            "summarizing": self._folding,
+            "cached_replies": len(self.cache) if self.cache is not None else 0,
+        }
+
+def create_conversation(client, cache: Optional[ResponseCache] = None, summarize: bool = True) -> Conversation:
+    """Conversation configured from settings (LLM_*)"""
+    import settings
+
+    return Conversation(
+        client,
+        cache=cache,
+        budget_tokens=settings.LLM_CONTEXT_TOKENS,
+        summarize=summarize and settings.LLM_SUMMARY_ENABLED,
+        summary_words=settings.LLM_SUMMARY_WORDS,
+    )
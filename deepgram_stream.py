@@ -0,0 +1,183 @@
+import json
+import queue
+import threading
+import time
+import wave
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from deepgram import LiveOptions, LiveTranscriptionEvents
+
+from audio_source import AudioSource
+
+class StreamUpdate(NamedTuple):
+    """Transcript state after a live result: finalized text plus the current interim guess"""
+    text: str
+    is_final: bool
+    done: bool = False
+
+class DeepgramStream:
+    """One live transcription session over Deepgram's websocket API.
+
+    Audio chunks are pushed with send() as they become available; every
+    interim and final result is reported through on_update from the SDK's
+    listener thread.
+    """
+
+    def __init__(
+        self,
+        client,
+        language: str = "en-US",
+        model: str = "nova-3",
+        on_update: Optional[Callable[[StreamUpdate], None]] = None,
+        endpointing_ms: int = 300,
+    ):
+        self.client = client
+        self.language = language
+        self.model = model
+        self.on_update = on_update
+        self.endpointing_ms = endpointing_ms
+        self.finals = []
+        self.error = None
+        self._final_end = 0.0
+        self._last_message = time.monotonic()
+        self._closed = threading.Event()
+        self._connection = None
+
+    def start(self):
+        """Open the websocket connection"""
+        self._connection = self.client.listen.live.v("1")
+        self._connection.on(LiveTranscriptionEvents.Transcript, self._on_transcript)
+        self._connection.on(LiveTranscriptionEvents.Error, self._on_error)
+        # Deepgram answers CloseStream with a Metadata message once every result has been sent
+        self._connection.on(LiveTranscriptionEvents.Metadata, self._on_closed)
+        self._connection.on(LiveTranscriptionEvents.Close, self._on_closed)
+
+        options = LiveOptions(
+            model=self.model,
+            language=self.language,
+            smart_format=True,
+            interim_results=True,
+            endpointing=str(self.endpointing_ms),
+        )
+        if not self._connection.start(options):
+            self._connection = None
+            raise RuntimeError("Could not connect to the Deepgram live API")
+
+    def send(self, chunk) -> bool:
+        """Send one chunk of audio (the first chunk may include the WAV header)"""
+        if self._connection is None:
+            return False
+        return self._connection.send(chunk)
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.finals)
+
+    def _on_transcript(self, _connection, result, **kwargs):
+        self._last_message = time.monotonic()
+        alternatives = result.channel.alternatives if result.channel else None
+        transcript = alternatives[0].transcript.strip() if alternatives else ""
+
+        if result.is_final:
+            if transcript:
+                self.finals.append(transcript)
+            self._final_end = max(self._final_end, result.start + result.duration)
+            update = StreamUpdate(self.text, True)
+        else:
+            update = StreamUpdate(" ".join(self.finals + [transcript]).strip(), False)
+
+        if self.on_update:
+            self.on_update(update)
+
+    def _on_error(self, _connection, error=None, **kwargs):
+        self._last_message = time.monotonic()
+        self.error = error
+
+    def _on_closed(self, _connection, *args, **kwargs):
+        self._closed.set()
+
+    def finish(self, audio_duration: Optional[float] = None, timeout: float = 5.0, idle: float = 3.0) -> str:
+        """Wait for trailing results, close the connection and return the final transcript.
+
+        Sends CloseStream and waits for Deepgram's closing Metadata message, or
+        until finalized segments cover the whole clip. `idle` seconds without
+        any message is only a fallback for servers that never send it; nothing
+        waits longer than `timeout`.
+        """
+        if self._connection is None:
+            return self.text
+
+        self._connection.send(json.dumps({"type": "CloseStream"}))
+        self._last_message = time.monotonic()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.error is None and not self._closed.is_set():
+            if audio_duration is not None and self._final_end >= audio_duration - 0.05:
+                break
+            if time.monotonic() - self._last_message > idle:
+                break
+            time.sleep(0.02)
+
+        self._connection.finish()
+        self._connection = None
+        return self.text
+
+    def close(self):
+        """Close the connection without waiting for trailing results (no-op after finish)"""
+        if self._connection is not None:
+            self._connection.finish()
+            self._connection = None
+
+def iter_chunks(audio: AudioSource, chunk_ms: int = 100) -> Iterator[memoryview]:
+    """Split the clip into chunk_ms slices of the encoded bytes without copying"""
+    bytes_per_second = 32000  # 16 kHz mono int16 from the recorder
+    if audio.is_wav:
+        with wave.open(audio.stream(), "rb") as wav:
+            bytes_per_second = wav.getframerate() * wav.getnchannels() * wav.getsampwidth()
+    chunk_size = max(1024, bytes_per_second * chunk_ms // 1000)
+
+    view = audio.view()
+    for offset in range(0, len(view), chunk_size):
+        yield view[offset:offset + chunk_size]
+
+def stream_transcribe(
+    client,
+    audio: AudioSource,
+    language: str = "en-US",
+    model: str = "nova-3",
+    chunk_ms: int = 100,
+    timeout: float = 10.0,
+) -> Iterator[StreamUpdate]:
+    """Stream a clip to the live API and yield transcript updates as they arrive.
+
+    Updates are yielded on the caller's thread (so Streamlit elements can be
+    updated from them); the last update has done=True and holds the final text.
+    """
+    updates = queue.Queue()
+    stream = DeepgramStream(client, language, model, on_update=updates.put)
+    stream.start()
+    outcome = {}
+
+    def pump():
+        try:
+            for chunk in iter_chunks(audio, chunk_ms):
+                if not stream.send(chunk):
+                    break
+            outcome["text"] = stream.finish(audio_duration=audio.duration, timeout=timeout)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            updates.put(None)
+
+    threading.Thread(target=pump, name="deepgram-stream", daemon=True).start()
+
+    while True:
+        update = updates.get()
+        if update is None:
+            break
+        yield update
+
+    if "error" in outcome:
+        raise outcome["error"]
+    if stream.error is not None and not stream.finals:
+        raise RuntimeError(f"Deepgram live API error: {stream.error}")
+    yield StreamUpdate(outcome.get("text", stream.text), True, done=True)
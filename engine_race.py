@@ -0,0 +1,128 @@
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from bangla_text import is_bangla_text
+
+RACE_MODES = ["first-wins", "consensus"]
+
+class EngineResult(NamedTuple):
+    engine: str
+    text: Optional[str]
+    latency: Optional[float]   # seconds; None when the engine was cancelled or timed out
+    error: Optional[str] = None
+
+class RaceResult(NamedTuple):
+    text: Optional[str]
+    winner: Optional[str]      # engine whose transcript was used (the pivot in consensus mode)
+    mode: str
+    results: List[EngineResult]
+
+def race_engines(
+    engines: Dict[str, Callable[[], Future]],
+    mode: str = "first-wins",
+    language: Optional[str] = None,
+    timeout: float = 30.0,
+) -> RaceResult:
+    """Send one clip to several engines at once.
+
+    `engines` maps a name to a function that starts the transcription and
+    returns a Future. "first-wins" returns the first non-empty transcript and
+    cancels the rest; "consensus" waits for every engine (up to timeout) and
+    combines their transcripts with combine_transcripts().
+    """
+    started = time.perf_counter()
+    futures = {}
+    results = {}
+    for name, start in engines.items():
+        try:
+            futures[start()] = name
+        except Exception as e:
+            results[name] = EngineResult(name, None, 0.0, str(e))
+
+    pending = set(futures)
+    deadline = started + timeout
+    winner = None
+    while pending and winner is None:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            name = futures[future]
+            latency = time.perf_counter() - started
+            try:
+                text = future.result()
+                text = text.strip() if text else None
+                results[name] = EngineResult(name, text, latency)
+            except Exception as e:
+                results[name] = EngineResult(name, None, latency, str(e))
+                continue
+            if mode == "first-wins" and text and _acceptable(text, language):
+                winner = name
+                break
+
+    # Losers and stragglers are cancelled so they release their connections and workers
+    for future in pending:
+        future.cancel()
+        name = futures[future]
+        results.setdefault(name, EngineResult(name, None, None, "cancelled" if winner else "timed out"))
+
+    ordered = [results[name] for name in engines if name in results]
+    if mode == "first-wins":
+        if winner is None:
+            # Nothing passed the language check; fall back to any transcript at all
+            winner = next((result.engine for result in ordered if result.text), None)
+        text = results[winner].text if winner else None
+        return RaceResult(text, winner, mode, ordered)
+
+    text, winner = combine_transcripts([(r.engine, r.text) for r in ordered if r.text], language)
+    return RaceResult(text, winner, mode, ordered)
+
+def _acceptable(text: str, language: Optional[str]) -> bool:
+    # For Bengali only accept transcripts that are actually in Bengali script
+    if language and language.startswith("bn"):
+        return is_bangla_text(text)
+    return True
+
+def combine_transcripts(candidates: List[tuple], language: Optional[str] = None) -> tuple:
+    """ROVER-style word voting over (engine, text) candidates; returns (text, pivot engine).
+
+    The pivot is the transcript that agrees most with all others. Every other
+    transcript is word-aligned to it, and each pivot word is replaced by the
+    majority word at that position when a majority disagrees with the pivot.
+    """
+    if language and language.startswith("bn"):
+        bangla = [candidate for candidate in candidates if is_bangla_text(candidate[1])]
+        candidates = bangla or candidates
+    if not candidates:
+        return None, None
+    if len(candidates) == 1:
+        return candidates[0][1], candidates[0][0]
+
+    words = [text.split() for _, text in candidates]
+    agreement = [
+        sum(SequenceMatcher(None, words[i], words[j], autojunk=False).ratio() for j in range(len(words)) if j != i)
+        for i in range(len(words))
+    ]
+    pivot = max(range(len(words)), key=lambda i: agreement[i])  # ties keep engine order
+    if len(candidates) < 3:
+        return candidates[pivot][1], candidates[pivot][0]
+
+    votes = [Counter({word: 1}) for word in words[pivot]]
+    for i, hypothesis in enumerate(words):
+        if i == pivot:
+            continue
+        matcher = SequenceMatcher(None, words[pivot], hypothesis, autojunk=False)
+        for tag, p1, p2, h1, h2 in matcher.get_opcodes():
+            if tag == "equal" or (tag == "replace" and p2 - p1 == h2 - h1):
+                for offset in range(p2 - p1):
+                    votes[p1 + offset][hypothesis[h1 + offset]] += 1
+
+    combined = []
+    for position, counter in enumerate(votes):
+        pivot_word = words[pivot][position]
+        best, count = counter.most_common(1)[0]
+        combined.append(best if count > counter[pivot_word] else pivot_word)
+    return " ".join(combined), candidates[pivot][0]
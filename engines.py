@@ -0,0 +1,399 @@
+"""Transcription engine registry.
+
+Every engine exposes the same interface (transcribe, submit,
+transcribe_async, transcribe_stream) plus capability metadata, and none of
+them touch Streamlit, so the UI, the HTTP service, routing and benchmarks can
+all drive any engine the same way.
+
+Third-party engines are discovered through the "stt_app.engines" entry point
+group; each entry point names a factory (usually the engine class):
+
+    [project.entry-points."stt_app.engines"]
+    whisper_api = "my_package.engines:WhisperAPIEngine"
+"""
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import metrics
+import settings
+from audio_source import MODEL_SAMPLE_RATE, AudioSource
+from deepgram_stream import StreamUpdate
+
+ENTRY_POINT_GROUP = "stt_app.engines"
+
+logger = logging.getLogger(__name__)
+
+AudioInput = Union[bytes, bytearray, memoryview, AudioSource]
+
+class EngineError(RuntimeError):
+    """An engine could not produce a transcript"""
+
+class EngineUnavailable(EngineError):
+    """The engine is missing a model, credentials or a dependency"""
+
+class EngineCapabilities(NamedTuple):
+    languages: Tuple[str, ...]       # BCP-47 codes, or ("*",) for any language
+    sample_rate: int = MODEL_SAMPLE_RATE
+    batching: bool = False           # concurrent requests are batched into one inference call
+    streaming: bool = False          # transcribe_stream yields interim results
+    local: bool = False              # runs on this machine (no network round trip)
+    cost_per_minute: float = 0.0     # USD per audio minute
+    upload_encoding: str = "wav"     # preferred encoding when audio is sent over the network
+
+    def supports(self, language: str) -> bool:
+        if "*" in self.languages:
+            return True
+        return language in self.languages or language.split("-")[0] in self.languages
+
+def as_source(audio: AudioInput) -> AudioSource:
+    return audio if isinstance(audio, AudioSource) else AudioSource(bytes(audio))
+
+# Runs synchronous engines for submit() and transcribe_async()
+_engine_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="stt-engine")
+
+class Engine:
+    """Base class for transcription engines; subclasses implement transcribe().
+
+    The defaults run transcribe() on a shared thread pool for submit() and
+    transcribe_async(), and report a single final update from
+    transcribe_stream(); engines with native async or streaming APIs override
+    them.
+    """
+
+    name = "engine"
+    label = "Engine"
+    capabilities = EngineCapabilities(languages=("*",))
+
+    def transcribe(self, audio: AudioInput, language: str = "en-US", **options) -> Optional[str]:
+        raise NotImplementedError
+
+    def submit(self, audio: AudioInput, language: str = "en-US", **options) -> Future:
+        """Start a transcription in the background; cancel the Future to abandon it"""
+        return _engine_executor.submit(self.transcribe, audio, language, **options)
+
+    async def transcribe_async(self, audio: AudioInput, language: str = "en-US", **options) -> Optional[str]:
+        return await asyncio.wrap_future(self.submit(audio, language, **options))
+
+    def transcribe_stream(self, audio: AudioInput, language: str = "en-US", **options) -> Iterator[StreamUpdate]:
+        text = self.transcribe(audio, language, **options) or ""
+        yield StreamUpdate(text, is_final=True, done=True)
+
+    def close(self):
+        pass
+
+class DeepgramEngine(Engine):
+    """Deepgram pre-recorded REST API, with the live websocket API for streaming"""
+
+    name = "deepgram"
+    label = "Deepgram"
+    capabilities = EngineCapabilities(
+        languages=("en", "en-US", "en-GB", "es", "fr", "de", "it", "pt", "hi", "zh", "ja", "ko", "bn", "bn-BD"),
+        streaming=True,
+        cost_per_minute=0.0043,
+        upload_encoding="flac",
+    )
+
+    def __init__(self, remote=None, live_client: Optional[Callable] = None, model: str = "nova-3"):
+        self._remote = remote
+        self._live_client = live_client
+        self.model = model
+
+    @property
+    def remote(self):
+        if self._remote is None:
+            self._remote = shared_remote_engines()
+        return self._remote
+
+    def _call(self, audio: AudioInput, language: str, model: Optional[str]):
+        source = as_source(audio)
+        return self.remote.deepgram(source.data, language, model or self.model, source.content_type)
+
+    def transcribe(self, audio, language="en-US", model=None, **options):
+        return self.remote.run(self._call(audio, language, model))
+
+    def submit(self, audio, language="en-US", model=None, **options):
+        return self.remote.submit(self._call(audio, language, model))
+
+    def transcribe_stream(self, audio, language="en-US", model=None, **options):
+        from deepgram_stream import stream_transcribe
+
+        client = self._live_client() if self._live_client else None
+        if client is None:
+            from clients import create_deepgram_client
+
+            client = create_deepgram_client()
+        if client is None:
+            raise EngineUnavailable("Deepgram: no API key configured")
+        yield from stream_transcribe(client, as_source(audio), language, model or self.model)
+
+class GoogleEngine(Engine):
+    """Google Web Speech API (the free endpoint behind SpeechRecognition's recognize_google)"""
+
+    name = "google"
+    label = "Python SpeechRecognition"
+    capabilities = EngineCapabilities(languages=("*",), upload_encoding="wav")
+
+    def __init__(self, remote=None):
+        self._remote = remote
+
+    @property
+    def remote(self):
+        if self._remote is None:
+            self._remote = shared_remote_engines()
+        return self._remote
+
+    def transcribe(self, audio, language="en-US", **options):
+        return self.remote.run(self.remote.google(as_source(audio).data, language))
+
+    def submit(self, audio, language="en-US", **options):
+        return self.remote.submit(self.remote.google(as_source(audio).data, language))
+
+class BanglaEngine(Engine):
+    """BanglaSpeech2Text (Whisper fine-tuned for Bengali) running locally.
+
+    Requests go to the inference worker pool when one is given, otherwise to
+    the model size's micro-batcher, otherwise straight to the model. Models
+    come from a ModelManager, which keeps them within the memory budget and
+    does not evict a model while an inference holds it; a plain load_model
+    callable is wrapped in an unbounded manager.
+
+    model_size="auto" lets a SizeRouter pick the size per request from the
+    clip length, the current load and the latency SLO (see size_router.py).
+    """
+
+    name = "bangla"
+    label = "BanglaSpeech2Text"
+    capabilities = EngineCapabilities(languages=("bn", "bn-BD"), batching=True, local=True, upload_encoding="samples")
+
+    def __init__(
+        self,
+        load_model: Optional[Callable[[str], object]] = None,
+        worker_pool=None,
+        get_batcher: Optional[Callable[[str], object]] = None,
+        model_size: str = "base",
+        models=None,
+        router=None,
+    ):
+        if models is None:
+            from model_manager import ModelManager
+
+            models = ModelManager(load_model) if load_model is not None else _default_bangla_models()
+        self.models = models
+        self.worker_pool = worker_pool
+        self.get_batcher = get_batcher if get_batcher is not None else (lambda size: None)
+        self.model_size = model_size
+        if router is None:
+            from size_router import create_size_router
+
+            # Worker processes hold their own models, so every size counts as loaded there
+            router = (create_size_router(parallelism=worker_pool.workers) if worker_pool is not None
+                      else create_size_router(models))
+        self.router = router
+
+    def route(self, source: AudioSource):
+        """Size for an "auto" request, decided from its duration and the current queue depth"""
+        queue_depth = self.worker_pool.queue_depth if self.worker_pool is not None else 0
+        return self.router.choose(source.duration, queue_depth)
+
+    def _infer(self, model_size: str, samples, batcher=None):
+        from model_manager import ModelUnavailable
+
+        try:
+            if batcher is not None:
+                return batcher(samples)
+            # The lease keeps the model from being evicted until inference is done
+            with self.models.lease(model_size) as stt:
+                return stt(samples)
+        except ModelUnavailable as e:
+            raise EngineUnavailable(f"BanglaSpeech2Text {model_size} model is not available: {e}") from e
+
+    def submit(self, audio, language="bn-BD", model_size=None, **options):
+        from size_router import AUTO
+
+        model_size = model_size or self.model_size
+        source = as_source(audio)
+        if model_size == AUTO:
+            model_size = self.route(source).size
+        self.router.started()
+        started = time.perf_counter()
+        try:
+            if self.worker_pool is not None:
+                # Queued behind busy workers, the elapsed time would mostly be waiting
+                learn = self.worker_pool.queue_depth < self.worker_pool.workers
+                seconds = source.known_duration  # compressed audio is only decoded in the worker
+                future = self.worker_pool.submit(source, model_size)
+            else:
+                samples = source.samples()
+                learn, seconds = True, len(samples) / float(MODEL_SAMPLE_RATE)
+                batcher = self.get_batcher(model_size)
+                future = (batcher.submit(samples) if batcher is not None
+                          else _engine_executor.submit(self._infer, model_size, samples))
+        except BaseException:
+            self.router.finished()
+            raise
+        future.add_done_callback(functools.partial(self._finished, model_size, seconds if learn else None, started))
+        return future
+
+    def _finished(self, model_size: str, seconds: Optional[float], started: float, future: Future):
+        """Done callback of submit(): release the router's in-flight slot and learn the real-time factor"""
+        self.router.finished()
+        if seconds and not future.cancelled() and future.exception() is None:
+            elapsed = time.perf_counter() - started
+            metrics.record_audio(f"{self.name}-{model_size}", seconds, elapsed)
+            self.router.observe(model_size, seconds, elapsed)
+
+    def transcribe(self, audio, language="bn-BD", model_size=None, **options):
+        from size_router import AUTO
+
+        model_size = model_size or self.model_size
+        source = as_source(audio)
+        decision = None
+        if model_size == AUTO:
+            decision = self.route(source)
+            model_size = decision.size
+        with self.router.track():
+            if self.worker_pool is not None:
+                learn = self.worker_pool.queue_depth < self.worker_pool.workers
+                started = time.perf_counter()
+                with metrics.span("inference", engine=self.name, size=model_size, path="workers"):
+                    text = self.worker_pool.transcribe(source, model_size)
+                seconds = source.known_duration
+                if learn and seconds:
+                    elapsed = time.perf_counter() - started
+                    metrics.record_audio(f"{self.name}-{model_size}", seconds, elapsed)
+                    self.router.observe(model_size, seconds, elapsed)
+            else:
+                with metrics.span("decode", engine=self.name):
+                    samples = source.samples()  # decoded in memory, no temp file
+                if decision is not None and decision.escalate_to and settings.BANGLA_ESCALATE_ENABLED:
+                    text = self._transcribe_escalating(samples, decision)
+                else:
+                    text = self._transcribe_samples(model_size, samples)
+        text = text.strip() if text else ""
+        return text or None
+
+    def _transcribe_samples(self, model_size: str, samples) -> Optional[str]:
+        batcher = self.get_batcher(model_size)
+        started = time.perf_counter()
+        with metrics.span("inference", engine=self.name, size=model_size, path="batcher" if batcher else "model"):
+            text = self._infer(model_size, samples, batcher)
+        elapsed = time.perf_counter() - started
+        seconds = len(samples) / float(MODEL_SAMPLE_RATE)
+        metrics.record_audio(f"{self.name}-{model_size}", seconds, elapsed)
+        self.router.observe(model_size, seconds, elapsed)
+        return text
+
+    def _transcribe_escalating(self, samples, decision) -> Optional[str]:
+        """Transcribe with segment confidences, then re-run the dubious ones on decision.escalate_to.
+
+        Only taken when the server is idle, so skipping the micro-batcher costs nothing.
+        """
+        from model_manager import ModelUnavailable
+        from size_router import escalate
+
+        started = time.perf_counter()
+        seconds = len(samples) / float(MODEL_SAMPLE_RATE)
+        try:
+            with self.models.lease(decision.size) as stt:
+                recognize = getattr(stt, "recognize", None)
+                if recognize is None:
+                    # Not a BanglaSpeech2Text model (no segment confidences): plain transcription
+                    return self._transcribe_samples(decision.size, samples)
+                with metrics.span("inference", engine=self.name, size=decision.size, path="model"):
+                    segments = list(recognize(samples, return_segments=True))
+            elapsed = time.perf_counter() - started
+            metrics.record_audio(f"{self.name}-{decision.size}", seconds, elapsed)
+            self.router.observe(decision.size, seconds, elapsed)
+
+            text = "".join(segment.text for segment in segments)
+            budget = self.router.slo_ms / 1000 - elapsed
+            if budget <= 0 or decision.escalate_to not in self.models.loaded():
+                return text
+            with self.models.lease(decision.escalate_to) as bigger:
+                with metrics.span("escalation", engine=self.name, size=decision.escalate_to):
+                    text, replaced = escalate(segments, samples, bigger, settings.BANGLA_ESCALATE_LOGPROB,
+                                              budget, self.router.rtf(decision.escalate_to))
+            if replaced:
+                metrics.count("escalated_segments_total", replaced, size=decision.escalate_to)
+            return text
+        except ModelUnavailable as e:
+            raise EngineUnavailable(f"BanglaSpeech2Text {decision.size} model is not available: {e}") from e
+
+@functools.lru_cache(maxsize=1)
+def _default_bangla_models():
+    """Process-wide model manager for engines created without one"""
+    from model_manager import create_bangla_model_manager
+
+    return create_bangla_model_manager()
+
+@functools.lru_cache(maxsize=1)
+def shared_remote_engines():
+    """Process-wide async client layer for engines created without one"""
+    from clients import create_remote_engines
+
+    return create_remote_engines()
+
+# -- registry --------------------------------------------------------------------
+
+_factories: Dict[str, Callable[..., Engine]] = {}
+_entry_points_loaded = False
+_registry_lock = threading.Lock()
+
+def register_engine(name: str, factory: Callable[..., Engine]):
+    """Register an engine factory (a class or any callable returning an Engine) under a name"""
+    with _registry_lock:
+        _factories[name] = factory
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name in _factories:
+            continue
+        try:
+            register_engine(entry_point.name, entry_point.load())
+        except Exception as e:
+            logger.warning("Could not load transcription engine %r: %s", entry_point.name, e)
+    _entry_points_loaded = True
+
+def available_engines() -> List[str]:
+    """Names of every built-in and installed engine"""
+    _load_entry_points()
+    with _registry_lock:
+        return list(_factories)
+
+def engine_factory(name: str) -> Callable[..., Engine]:
+    _load_entry_points()
+    with _registry_lock:
+        factory = _factories.get(name)
+    if factory is None:
+        raise KeyError(f"Unknown transcription engine {name!r}; available: {', '.join(available_engines())}")
+    return factory
+
+def create_engine(name: str, **resources) -> Engine:
+    """Build an engine by name; resources (clients, pools, loaders) are passed to its factory"""
+    return engine_factory(name)(**resources)
+
+def engine_label(name: str) -> str:
+    """UI label of a registered engine; factories without a label of their own show their name"""
+    label = getattr(engine_factory(name), "label", None)
+    return label if isinstance(label, str) and label != Engine.label else name
+
+def engine_for_label(label: str) -> str:
+    """Registry name for a UI label such as "BanglaSpeech2Text"; names are accepted too"""
+    for name in available_engines():
+        if name == label or engine_label(name) == label:
+            return name
+    raise KeyError(f"No transcription engine labelled {label!r}")
+
+register_engine(DeepgramEngine.name, DeepgramEngine)
+register_engine(GoogleEngine.name, GoogleEngine)
+register_engine(BanglaEngine.name, BanglaEngine)
@@ -0,0 +1,70 @@
+import functools
+import re
+from typing import Iterator, List
+
+SYSTEM_PROMPT = """You are Aaladin AI — the voice-activated, web and mobile app development genie from AaladinAI.com.
+
+        Aaladin specializes in:
+        • Full-stack web & mobile development
+        • UI/UX design
+        • Automation tools and AI/ChatGPT integrations
+        • Cloud & DevOps solutions
+        • API development & browser extensions
+        The team works with Next.js, React, Flutter, Node.js, TypeScript, and tailors solutions for startups, enterprises, and innovators :contentReference[oaicite:1]{index=1}.
+
+        Users speak to you via live-transcribed voice commands (Deepgram-backed), which may include informal phrasing. You interpret their intent, plan or build software solutions, and respond clearly and confidently—as if you’re their technical co-founder.
+
+        Your roles:
+        1. Analyze and refine the spoken request.
+        2. Design appropriate architecture, code snippets, UI wireframes, or project outlines.
+        3. Ask follow-up questions **only if needed** to clarify requirements.
+        4. Deliver final outputs in ready-to-use formats (e.g., code with imports, comments, filenames).
+        5. Keep answers concise, natural, and conversational—suitable for voice playback or visual consumption.
+
+        Always:
+        - Include relevant technology choices (e.g., Next.js + Tailwind CSS, Flutter, cloud, AI)
+        - Align answers with Aaladin’s proven development methodology: planning, wireframing, design, coding, testing, deployment :contentReference[oaicite:2]{index=2}.
+        - Reflect Aaladin’s brand identity: empowering, dependable, agile, and digitally transformative.
+
+        Never:
+        - Mention Deepgram, transcription, or the toolchain behind the voice interface.
+        - Be overly formal or robotic.
+
+        You are Aaladin AI — your voice, our power. Build something amazing.
+"""
+
+# Only the last 3 exchanges are sent, to keep prompts short and replies fast
+HISTORY_MESSAGES = 6
+
+def compact_prompt(prompt: str) -> str:
+    """The prompt without indentation and pasted citation markers, which only cost tokens"""
+    prompt = re.sub(r"\s*:contentReference\[[^\]]*\]\{[^}]*\}", "", prompt)
+    return "\n".join(line.strip() for line in prompt.strip().splitlines())
+
+@functools.lru_cache(maxsize=1)
+def system_message():
+    """The system prompt as a LangChain message, built once and shared by every request"""
+    from langchain.schema import SystemMessage
+
+    return SystemMessage(content=compact_prompt(SYSTEM_PROMPT))
+
+@functools.lru_cache(maxsize=2048)
+def chat_message(role: str, content: str):
+    """LangChain message for a chat turn; repeated turns reuse the same object"""
+    from langchain.schema import AIMessage, HumanMessage
+
+    return HumanMessage(content=content) if role == "user" else AIMessage(content=content)
+
+def to_langchain_messages(messages: List[dict], history: int = HISTORY_MESSAGES) -> list:
+    """Convert {"role", "content"} chat messages to LangChain messages behind the system prompt"""
+    return [system_message()] + [
+        chat_message(message["role"], message["content"])
+        for message in messages[-history:]
+        if message["role"] in ("user", "assistant")
+    ]
+
+def stream_answer(client, messages: List[dict]) -> Iterator[str]:
+    """Yield reply tokens from a LangChain chat model as the API produces them"""
+    for chunk in client.stream(to_langchain_messages(messages)):
+        if chunk.content:
+            yield chunk.content
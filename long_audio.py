@@ -0,0 +1,175 @@
+import wave
+from collections import deque
+from typing import BinaryIO, Iterator, NamedTuple, Union
+
+import numpy as np
+
+from audio_preprocess import frame_energy_db
+from audio_source import MODEL_SAMPLE_RATE, AudioSource, pcm_to_float, resample
+
+class SpeechSegment(NamedTuple):
+    """A voiced stretch of audio, with times in seconds from the start of the recording"""
+    start: float
+    end: float
+    samples: np.ndarray
+
+class TranscribedSegment(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+def iter_audio_blocks(
+    source: Union[AudioSource, BinaryIO, str],
+    block_seconds: float = 10.0,
+    sample_rate: int = MODEL_SAMPLE_RATE,
+) -> Iterator[np.ndarray]:
+    """Decode audio incrementally into mono float32 blocks, so memory stays flat for long files"""
+    if isinstance(source, AudioSource):
+        source = source.stream()
+
+    if _is_wav(source):
+        with wave.open(source, "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            frames_per_block = max(1, int(rate * block_seconds))
+            while True:
+                frames = wav.readframes(frames_per_block)
+                if not frames:
+                    break
+                yield resample(pcm_to_float(frames, width, channels), rate, sample_rate)
+        return
+
+    # Compressed formats: decode with PyAV frame by frame instead of materializing the whole file
+    import av
+
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+    block_samples = int(sample_rate * block_seconds)
+    pending = []
+    pending_samples = 0
+    with av.open(source, mode="r", metadata_errors="ignore") as container:
+        for frame in _decoded_frames(container):
+            frame.pts = None
+            for resampled in resampler.resample(frame):
+                pending.append(resampled.to_ndarray().reshape(-1))
+                pending_samples += resampled.samples
+            if pending_samples >= block_samples:
+                yield np.concatenate(pending).astype(np.float32) / 32768.0
+                pending, pending_samples = [], 0
+        for resampled in resampler.resample(None):
+            pending.append(resampled.to_ndarray().reshape(-1))
+    if pending:
+        yield np.concatenate(pending).astype(np.float32) / 32768.0
+
+def _decoded_frames(container):
+    import av
+
+    frames = container.decode(audio=0)
+    while True:
+        try:
+            yield next(frames)
+        except StopIteration:
+            return
+        except av.error.InvalidDataError:
+            continue
+
+def _is_wav(source) -> bool:
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            header = f.read(12)
+    else:
+        position = source.tell()
+        header = source.read(12)
+        source.seek(position)
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+def iter_speech_segments(
+    blocks: Iterator[np.ndarray],
+    sample_rate: int = MODEL_SAMPLE_RATE,
+    frame_ms: int = 30,
+    threshold_db: float = -40.0,
+    min_silence_s: float = 0.6,
+    max_segment_s: float = 25.0,
+    min_speech_s: float = 0.25,
+    pad_s: float = 0.2,
+) -> Iterator[SpeechSegment]:
+    """Energy-gate VAD: group voiced frames into segments no longer than max_segment_s.
+
+    A segment closes after min_silence_s of quiet or when it reaches
+    max_segment_s, keeping every chunk inside Whisper's 30 s window.
+    """
+    frame_length = sample_rate * frame_ms // 1000
+    frame_s = frame_length / float(sample_rate)
+    silence_frames = max(1, int(min_silence_s / frame_s))
+    max_frames = max(1, int(max_segment_s / frame_s))
+    min_voiced = max(1, int(min_speech_s / frame_s))
+    pad_frames = int(pad_s / frame_s)
+
+    preroll = deque(maxlen=pad_frames or 1)
+    segment = []
+    segment_start = 0
+    voiced_count = 0
+    silence_run = 0
+    frame_index = 0
+    carry = np.zeros(0, dtype=np.float32)
+
+    def close_segment():
+        # Keep pad_frames of trailing silence, drop the rest
+        keep = len(segment) - max(0, silence_run - pad_frames)
+        samples = np.concatenate(segment[:keep])
+        start = segment_start * frame_s
+        return SpeechSegment(start, start + len(samples) / float(sample_rate), samples)
+
+    for block in blocks:
+        audio = np.concatenate((carry, block)) if len(carry) else block
+        n_frames = len(audio) // frame_length
+        carry = audio[n_frames * frame_length:]
+        if n_frames == 0:
+            continue
+
+        frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+        voiced = frame_energy_db(frames) > threshold_db
+
+        for frame, is_voiced in zip(frames, voiced):
+            if segment:
+                segment.append(frame)
+                if is_voiced:
+                    voiced_count += 1
+                    silence_run = 0
+                else:
+                    silence_run += 1
+                if silence_run >= silence_frames or len(segment) >= max_frames:
+                    if voiced_count >= min_voiced:
+                        yield close_segment()
+                    segment = []
+                    preroll.clear()
+            elif is_voiced:
+                segment = list(preroll) if pad_frames else []
+                segment_start = frame_index - len(segment)
+                segment.append(frame)
+                voiced_count = 1
+                silence_run = 0
+            elif pad_frames:
+                preroll.append(frame)
+            frame_index += 1
+
+    if segment and voiced_count >= min_voiced:
+        if len(carry):
+            segment.append(carry)
+        yield close_segment()
+
+def transcribe_segments(stt, source, **segment_options) -> Iterator[TranscribedSegment]:
+    """Run the model on each voiced segment as soon as it is cut, yielding text with timestamps"""
+    blocks = iter_audio_blocks(source)
+    for segment in iter_speech_segments(blocks, **segment_options):
+        text = stt(segment.samples)
+        text = text.strip() if text else ""
+        if text:
+            yield TranscribedSegment(segment.start, segment.end, text)
+
+def format_timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,394 @@
+"""Hot-path instrumentation: stage timings, cache hit rates, model loads, queue depth and RTF.
+
+    with metrics.span("stt", engine="deepgram"):
+        ...
+    metrics.cache_result("transcript", hit=True)
+    metrics.record_audio("bangla", audio_seconds=4.2, elapsed=0.9)
+
+Everything lands in one in-process registry that the Streamlit performance
+panel reads and that renders the Prometheus text format (GET /metrics on the
+API server, or a small exporter thread on METRICS_PORT for the UI process).
+Spans are also sent to OpenTelemetry when OTEL_ENABLED=1 and the
+opentelemetry packages are installed. With METRICS_ENABLED=0 every call
+returns immediately.
+"""
+import bisect
+import contextvars
+import logging
+import math
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+ENABLED = settings.METRICS_ENABLED
+PREFIX = "stt_"
+
+# Histogram buckets in seconds (stage latencies) and plain ratios (real-time factor)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+HELP = {
+    "stage_seconds": "Time spent in each processing stage",
+    "cache_requests_total": "Cache lookups by cache and result",
+    "model_loads_total": "BanglaSpeech2Text model loads",
+    "audio_seconds": "Duration of transcribed audio",
+    "realtime_factor": "Transcription time divided by audio duration",
+    "errors_total": "Failed stages",
+    "queue_depth": "Requests waiting or running in a queue",
+    "process_peak_rss_bytes": "Peak resident set size of this process",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+class Histogram:
+    """Cumulative buckets for Prometheus plus a window of recent values for percentiles"""
+
+    def __init__(self, buckets: Tuple[float, ...], window: int = 512):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+class SpanRecord(NamedTuple):
+    name: str
+    labels: dict
+    offset_ms: float   # start, relative to the beginning of the trace
+    ms: float
+    depth: int
+    error: Optional[str] = None
+
+class Trace:
+    """Spans recorded on one request, for the per-request breakdown in the UI"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: List[SpanRecord] = []
+        self.depth = 0
+        self.ms = None
+
+    def total_ms(self) -> float:
+        return self.ms if self.ms is not None else (time.perf_counter() - self.started) * 1000
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._callbacks: Dict[str, Callable[[], Dict[Labels, float]]] = {}
+        self.traces = deque(maxlen=20)
+
+    def count(self, name: str, amount: float, labels: Labels):
+        with self._lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: Labels):
+        with self._lock:
+            self.gauges[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: Labels, buckets: Tuple[float, ...]):
+        with self._lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[(name, labels)] = Histogram(buckets)
+            histogram.observe(value)
+
+    def register_callback(self, key: str, callback: Callable[[], Dict[Labels, float]]):
+        """Gauge values read at collection time (queue depths of pools created elsewhere)"""
+        with self._lock:
+            self._callbacks[key] = callback
+
+    def collect_gauges(self) -> Dict[Tuple[str, Labels], float]:
+        with self._lock:
+            gauges = dict(self.gauges)
+            callbacks = list(self._callbacks.values())
+        for callback in callbacks:
+            try:
+                gauges.update(callback())
+            except Exception as e:
+                logger.debug("Gauge callback failed: %s", e)
+        gauges[("process_peak_rss_bytes", ())] = peak_rss_bytes()
+        return gauges
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.traces.clear()
+
+REGISTRY = Registry()
+
+def peak_rss_bytes() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return float(rss if sys.platform == "darwin" else rss * 1024)  # bytes on macOS, KB on Linux
+
+# -- recording ---------------------------------------------------------------------------
+
+def count(name: str, amount: float = 1, **labels):
+    if ENABLED:
+        REGISTRY.count(name, amount, _labels(labels))
+
+def gauge(name: str, value: float, **labels):
+    if ENABLED:
+        REGISTRY.set_gauge(name, value, _labels(labels))
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels):
+    if ENABLED:
+        REGISTRY.observe(name, value, _labels(labels), buckets)
+
+def cache_result(cache: str, hit: bool):
+    count("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+def record_audio(engine: str, audio_seconds: float, elapsed: float):
+    """Audio duration and real-time factor of one transcription"""
+    if not ENABLED or audio_seconds <= 0:
+        return
+    observe("audio_seconds", audio_seconds, LATENCY_BUCKETS, engine=engine)
+    observe("realtime_factor", elapsed / audio_seconds, RATIO_BUCKETS, engine=engine)
+
+def watch_queue(key: str, read_depth: Callable[[], Dict[str, float]]):
+    """Report queue depths, read when metrics are collected: read_depth() → {queue name: depth}"""
+    if ENABLED:
+        REGISTRY.register_callback(key, lambda: {
+            ("queue_depth", (("queue", name),)): float(depth) for name, depth in read_depth().items()
+        })
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("stt_trace", default=None)
+
+@contextmanager
+def _span(name: str, labels: dict):
+    trace = _current_trace.get()
+    depth = 0
+    if trace is not None:
+        depth = trace.depth
+        trace.depth += 1
+    otel_span = _otel_span(name, labels)
+    started = time.perf_counter()
+    error = None
+    try:
+        if otel_span is None:
+            yield
+        else:
+            with otel_span:
+                yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        REGISTRY.observe("stage_seconds", elapsed, _labels({"stage": name, **labels}), LATENCY_BUCKETS)
+        if error:
+            REGISTRY.count("errors_total", 1, _labels({"stage": name, "error": error}))
+        if trace is not None:
+            trace.depth = depth
+            trace.spans.append(SpanRecord(name, labels, (started - trace.started) * 1000, elapsed * 1000, depth, error))
+
+_NOOP = nullcontext()
+
+def span(name: str, **labels):
+    """Time a stage: histogram stage_seconds{stage=name,...}, the current trace and OpenTelemetry"""
+    if not ENABLED:
+        return _NOOP
+    return _span(name, labels)
+
+def timed(name: str, **labels):
+    """Decorator form of span()"""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        def wrapper(*args, **kwargs):
+            with _span(name, labels):
+                return fn(*args, **kwargs)
+        wrapper.__name__, wrapper.__doc__, wrapper.__wrapped__ = fn.__name__, fn.__doc__, fn
+        return wrapper
+    return decorate
+
+@contextmanager
+def trace(name: str):
+    """Collect the spans of one request (on this thread or task); yields the Trace, or None when disabled"""
+    if not ENABLED:
+        yield None
+        return
+    current = Trace(name)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+        current.ms = (time.perf_counter() - current.started) * 1000
+        REGISTRY.traces.append(current)
+
+# -- OpenTelemetry (optional) ----------------------------------------------------------------
+
+_tracer = None
+_tracer_checked = False
+
+def _otel_span(name: str, labels: dict):
+    global _tracer, _tracer_checked
+    if not settings.OTEL_ENABLED:
+        return None
+    if not _tracer_checked:
+        _tracer_checked = True
+        _tracer = _create_tracer()
+    if _tracer is None:
+        return None
+    return _tracer.start_as_current_span(name, attributes={key: str(value) for key, value in labels.items()})
+
+def _create_tracer():
+    try:
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        logger.warning("OTEL_ENABLED is set but opentelemetry-api is not installed; traces are not exported")
+        return None
+    try:
+        # Export over OTLP when the SDK is installed; otherwise use whatever provider is configured
+        # (for example by opentelemetry-instrument)
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        if not isinstance(otel_trace.get_tracer_provider(), TracerProvider):
+            provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            otel_trace.set_tracer_provider(provider)
+    except ImportError:
+        pass
+    return otel_trace.get_tracer("stt-app")
+
+# -- reading -------------------------------------------------------------------------------
+
+def snapshot() -> dict:
+    """Aggregates for the in-app panel: per-stage latency, cache hit rates, counters and gauges"""
+    with REGISTRY._lock:
+        histograms = {key: (h.count, h.sum, h.percentile(0.5), h.percentile(0.95), h.percentile(0.99))
+                      for key, h in REGISTRY.histograms.items()}
+        counters = dict(REGISTRY.counters)
+
+    stages = []
+    for (name, labels), (total, seconds, p50, p95, p99) in sorted(histograms.items()):
+        row = {"metric": name, **dict(labels), "count": total}
+        if name in ("realtime_factor", "audio_seconds"):
+            row.update({"mean": round(seconds / total, 3), "p50": round(p50, 3), "p95": round(p95, 3)})
+        else:
+            row.update({"mean_ms": round(seconds / total * 1000, 1), "p50_ms": round(p50 * 1000, 1),
+                        "p95_ms": round(p95 * 1000, 1), "p99_ms": round(p99 * 1000, 1)})
+        stages.append(row)
+
+    caches = {}
+    for (name, labels), value in counters.items():
+        if name == "cache_requests_total":
+            labels = dict(labels)
+            caches.setdefault(labels["cache"], {"hit": 0, "miss": 0})[labels["result"]] += int(value)
+    for values in caches.values():
+        lookups = values["hit"] + values["miss"]
+        values["hit_rate"] = round(values["hit"] / lookups, 3) if lookups else None
+
+    return {
+        "enabled": ENABLED,
+        "stages": stages,
+        "caches": caches,
+        "counters": {f"{name}{_format_labels(labels)}": value for (name, labels), value in sorted(counters.items())
+                     if name != "cache_requests_total"},
+        "gauges": {f"{name}{_format_labels(labels)}": value
+                   for (name, labels), value in sorted(REGISTRY.collect_gauges().items())},
+    }
+
+def recent_traces() -> List[Trace]:
+    return list(REGISTRY.traces)
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    labels = labels + extra
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def prometheus_text() -> str:
+    """Everything in the registry in the Prometheus text exposition format (version 0.0.4)"""
+    with REGISTRY._lock:
+        counters = sorted(REGISTRY.counters.items())
+        histograms = sorted((key, (h.buckets, list(h.counts), h.sum, h.count)) for key, h in REGISTRY.histograms.items())
+    gauges = sorted(REGISTRY.collect_gauges().items())
+
+    lines = []
+    declared = set()
+
+    def declare(name, kind):
+        if name not in declared:
+            declared.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {PREFIX}{name} {HELP[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    for (name, labels), value in counters:
+        declare(name, "counter")
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_number(value)}")
+    for (name, labels), value in gauges:
+        declare(name, "gauge")
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_number(value)}")
+    for (name, labels), (buckets, counts, total, observations) in histograms:
+        declare(name, "histogram")
+        cumulative = 0
+        for bound, bucket_count in zip((*buckets, math.inf), counts):
+            cumulative += bucket_count
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, (('le', _number(bound)),))} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {_number(total)}")
+        lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {observations}")
+    return "\n".join(lines) + "\n"
+
+def start_exporter(port: int, host: str = "0.0.0.0"):
+    """Serve GET /metrics from a daemon thread (for processes without their own HTTP API)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    return server
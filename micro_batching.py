@@ -0,0 +1,176 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+
+class MicroBatcher:
+    """Groups requests that arrive close together and runs them as one batch.
+
+    A batch is dispatched as soon as it holds max_batch_size items or the
+    oldest item has waited max_wait_ms, whichever comes first. Raising
+    max_wait_ms trades single-request latency for throughput under load.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], list],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 30.0,
+        name: str = "micro-batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout: Optional[float] = None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self) -> list:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._closed = True
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+
+            # Callers may have cancelled (e.g. a lost engine race); don't spend compute on them
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                if self._closed:
+                    return
+                continue
+
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                results = self.batch_fn(items)
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+
+            if self._closed:
+                return
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+                "batch_size_counts": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+
+def batched_recognize(model, clips: List[np.ndarray], language: str = "bn", beam_size: int = 5) -> List[str]:
+    """Transcribe several clips with one batched CTranslate2 encode + generate call.
+
+    `model` is a BanglaSpeech2Text / faster-whisper model. The batched decode is
+    a single beam search: unlike the regular single-clip path it has no
+    temperature fallback, no compression-ratio check and no no-speech filter,
+    so it is more prone to hallucinated text on silence or noise. A lone clip,
+    and clips longer than the 30 s Whisper window, go through the regular path.
+    """
+    from faster_whisper.audio import pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
+    from faster_whisper.transcribe import get_suppressed_tokens
+
+    extractor = model.feature_extractor
+    results = [None] * len(clips)
+    short = [i for i, clip in enumerate(clips) if len(clip) <= extractor.n_samples]
+    if len(short) == 1:
+        short = []
+
+    for i, clip in enumerate(clips):
+        if i not in short:
+            text = model(clip)
+            results[i] = text.strip() if text else ""
+
+    if short:
+        tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language=language)
+        features = np.stack([pad_or_trim(extractor(clips[i])[..., :-1]) for i in short])
+        encoder_output = model.encode(features)
+        prompt = model.get_prompt(tokenizer, [], without_timestamps=True)
+        outputs = model.model.generate(
+            encoder_output,
+            [list(prompt) for _ in short],
+            beam_size=beam_size,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=list(get_suppressed_tokens(tokenizer, [-1])),
+        )
+        for i, output in zip(short, outputs):
+            results[i] = tokenizer.decode(output.sequences_ids[0]).strip()
+
+    return results
+
+def create_bangla_batcher(models, model_size: str = "base") -> Optional[MicroBatcher]:
+    """Batching scheduler for one BanglaSpeech2Text size, or None when batching is disabled.
+
+    models is the ModelManager the size is leased from for each batch, so the
+    batcher never keeps an evicted model alive.
+    """
+    import metrics
+    import settings
+
+    if models is None or settings.BANGLA_BATCH_MAX_SIZE <= 1:
+        return None
+
+    def recognize(clips):
+        with models.lease(model_size) as model:
+            return batched_recognize(model, clips)
+
+    batcher = MicroBatcher(
+        recognize,
+        max_batch_size=settings.BANGLA_BATCH_MAX_SIZE,
+        max_wait_ms=settings.BANGLA_BATCH_MAX_WAIT_MS,
+        name=f"bangla-batcher-{model_size}",
+    )
+    metrics.watch_queue(f"bangla_batcher_{model_size}", lambda: {f"bangla_batcher_{model_size}": batcher.metrics()["queue_depth"]})
+    return batcher
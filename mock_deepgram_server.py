@@ -0,0 +1,122 @@
+"""Local stand-in for Deepgram's live transcription websocket.
+
+Replays canned Deepgram responses so the streaming mode can be exercised
+without network access or an API key:
+
+    python mock_deepgram_server.py --port 8765 --responses canned.json
+    DEEPGRAM_URL=http://localhost:8765 streamlit run sttt.py
+
+The responses file is a JSON list of either full Deepgram "Results" messages
+or shorthand objects such as {"transcript": "hello", "is_final": false}.
+One canned response is sent per `--every` audio chunks received; whatever is
+left is flushed when the client sends CloseStream, followed by a Metadata
+message.
+"""
+import argparse
+import asyncio
+import json
+
+import websockets
+
+DEFAULT_RESPONSES = [
+    {"transcript": "hello", "is_final": False},
+    {"transcript": "hello world", "is_final": True, "speech_final": True},
+    {"transcript": "this is", "is_final": False},
+    {"transcript": "this is a streaming test", "is_final": True, "speech_final": True},
+]
+
+def to_result_message(response: dict, start: float) -> dict:
+    """Expand a shorthand response into a Deepgram live "Results" message"""
+    if response.get("type") == "Results":
+        return response
+    duration = float(response.get("duration", 1.0))
+    transcript = response.get("transcript", "")
+    return {
+        "type": "Results",
+        "channel_index": [0, 1],
+        "duration": duration,
+        "start": start,
+        "is_final": bool(response.get("is_final", False)),
+        "speech_final": bool(response.get("speech_final", False)),
+        "channel": {
+            "alternatives": [{
+                "transcript": transcript,
+                "confidence": float(response.get("confidence", 0.99)),
+                "words": [],
+            }]
+        },
+        "metadata": {"request_id": "mock", "model_info": {"name": "mock", "version": "0", "arch": "mock"}, "model_uuid": "mock"},
+    }
+
+def metadata_message(duration: float) -> dict:
+    """The Metadata message Deepgram sends once a stream is closed"""
+    return {
+        "type": "Metadata",
+        "transaction_key": "deprecated",
+        "request_id": "mock",
+        "sha256": "",
+        "created": "1970-01-01T00:00:00.000Z",
+        "duration": duration,
+        "channels": 1,
+        "models": ["mock"],
+        "model_info": {"mock": {"name": "mock", "version": "0", "arch": "mock"}},
+    }
+
+def build_handler(responses: list, every: int, delay: float, metadata: bool = True):
+    async def handler(websocket):
+        pending = list(responses)
+        start = 0.0
+        chunks = 0
+
+        async def send_next():
+            nonlocal start
+            response = pending.pop(0)
+            message = to_result_message(response, start)
+            if message.get("is_final"):
+                start += message.get("duration", 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            await websocket.send(json.dumps(message))
+
+        async for message in websocket:
+            if isinstance(message, str):
+                if json.loads(message).get("type") == "CloseStream":
+                    while pending:
+                        await send_next()
+                    # Like Deepgram: a Metadata message after the last result, then close
+                    if metadata:
+                        await websocket.send(json.dumps(metadata_message(start)))
+                    await websocket.close()
+                    return
+                continue
+
+            chunks += 1
+            if pending and chunks % every == 0:
+                await send_next()
+
+    return handler
+
+async def serve(host: str, port: int, responses: list, every: int, delay: float, metadata: bool = True):
+    async with websockets.serve(build_handler(responses, every, delay, metadata), host, port):
+        print(f"Mock Deepgram live API listening on ws://{host}:{port}/v1/listen")
+        await asyncio.Future()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--responses", help="JSON file with canned responses")
+    parser.add_argument("--every", type=int, default=3, help="audio chunks per canned response")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument("--no-metadata", action="store_true", help="close without the final Metadata message")
+    args = parser.parse_args()
+
+    responses = DEFAULT_RESPONSES
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as f:
+            responses = json.load(f)
+
+    asyncio.run(serve(args.host, args.port, responses, max(1, args.every), args.delay, not args.no_metadata))
+
+if __name__ == "__main__":
+    main()
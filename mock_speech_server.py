@@ -0,0 +1,125 @@
+"""Local HTTP stand-in for the Deepgram and Google speech REST APIs.
+
+Simulates upstream latency and failures so the retry, hedging and
+concurrency behaviour of remote_engines.py can be exercised offline:
+
+    python mock_speech_server.py --port 8766 --latency-ms 300 --jitter-ms 200 \\
+        --slow-rate 0.05 --slow-ms 4000 --error-rate 0.1
+    DEEPGRAM_URL=http://localhost:8766 GOOGLE_SPEECH_URL=http://localhost:8766/speech-api/v2/recognize \\
+        streamlit run sttt.py
+
+POST /v1/listen answers like Deepgram's pre-recorded API and
+POST /speech-api/v2/recognize like Google's Web Speech API.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockSpeechHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    config = None
+    counters = {"requests": 0, "errors": 0, "slow": 0, "in_flight": 0, "peak_in_flight": 0}
+    counters_lock = threading.Lock()
+    peers = set()  # client (host, port) pairs: one per connection, so reuse keeps it small
+
+    def log_message(self, format, *args):
+        if self.config.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self) -> bool:
+        """Sleep for the simulated latency; returns False when this request should fail"""
+        config = self.config
+        with self.counters_lock:
+            index = self.counters["requests"]
+            self.counters["requests"] += 1
+            self.peers.add(self.client_address)
+        latency = max(0.0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000.0
+        # The first slow_first / fail_first requests are slow / fail deterministically, for tests
+        slow = index < config.slow_first or random.random() < config.slow_rate
+        if slow:
+            latency += config.slow_ms / 1000.0
+        failed = index < config.fail_first or random.random() < config.error_rate
+        with self.counters_lock:
+            self.counters["slow"] += int(slow)
+            self.counters["errors"] += int(failed)
+        time.sleep(latency)
+        return not failed
+
+    def do_POST(self):
+        with self.counters_lock:
+            self.counters["in_flight"] += 1
+            self.counters["peak_in_flight"] = max(self.counters["peak_in_flight"], self.counters["in_flight"])
+        try:
+            self._respond()
+        finally:
+            with self.counters_lock:
+                self.counters["in_flight"] -= 1
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        audio = self.rfile.read(length)
+        ok = self._simulate()
+        path = self.path.split("?", 1)[0]
+
+        if not ok:
+            status = random.choice(self.config.error_codes)
+            self._reply(status, json.dumps({"err_code": "MOCK_ERROR", "err_msg": "simulated failure"}).encode())
+        elif path == "/v1/listen":
+            transcript = self.config.transcript
+            body = {
+                "metadata": {"request_id": "mock", "duration": len(audio) / 32000.0, "channels": 1},
+                "results": {"channels": [{"alternatives": [{"transcript": transcript, "confidence": 0.98}]}]},
+            }
+            self._reply(200, json.dumps(body).encode())
+        elif path == "/speech-api/v2/recognize":
+            result = {"result": [{"alternative": [{"transcript": self.config.transcript, "confidence": 0.95}],
+                                  "final": True}], "result_index": 0}
+            body = json.dumps({"result": []}) + "\n" + json.dumps(result) + "\n"
+            self._reply(200, body.encode())
+        else:
+            self._reply(404, b'{"err_msg": "not found"}')
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.counters_lock:
+                stats = {**self.counters, "connections": len(self.peers)}
+            self._reply(200, json.dumps(stats).encode())
+        else:
+            self._reply(404, b'{"err_msg": "not found"}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="standard deviation of the latency")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests hit by a latency spike")
+    parser.add_argument("--slow-ms", type=float, default=3000.0, help="extra latency of a spike")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-codes", type=int, nargs="+", default=[429, 500, 503])
+    parser.add_argument("--slow-first", type=int, default=0, help="make the first N requests slow")
+    parser.add_argument("--fail-first", type=int, default=0, help="make the first N requests fail")
+    parser.add_argument("--transcript", default="hello from the mock speech server")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    MockSpeechHandler.config = args
+    server = ThreadingHTTPServer((args.host, args.port), MockSpeechHandler)
+    print(f"Mock speech APIs listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
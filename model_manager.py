@@ -0,0 +1,291 @@
+"""Loaded BanglaSpeech2Text models kept within a memory budget.
+
+Models are loaded on first use and evicted least recently used first when
+the next load would not fit in the budget. Inferences hold a lease on their
+model, so a model that is in use is never evicted; a load that cannot make
+room waits for leases to be released and then fails with
+ModelBudgetExceeded instead of pushing the process into the OOM killer.
+
+    models = create_bangla_model_manager()
+    with models.lease("base") as stt:
+        text = stt(samples)
+"""
+import ctypes
+import gc
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+class ModelUnavailable(RuntimeError):
+    """A model could not be loaded"""
+
+class ModelBudgetExceeded(ModelUnavailable):
+    """A model does not fit in the memory budget, even after evicting every idle model"""
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process right now (Linux only; None elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _release_memory():
+    # Freed CTranslate2 buffers otherwise stay in glibc's arenas and the RSS does not drop
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+class _Entry:
+    __slots__ = ("model", "bytes", "measured", "refs", "last_used", "loaded_at", "load_seconds", "uses")
+
+    def __init__(self, model, size_bytes: int, measured: bool, load_seconds: float):
+        self.model = model
+        self.bytes = size_bytes
+        self.measured = measured
+        self.refs = 0
+        self.last_used = time.monotonic()
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.uses = 0
+
+class ModelManager:
+    """Load-on-demand model cache bounded by bytes, with LRU eviction and reference counting.
+
+    budget_bytes of 0 means unbounded. estimate_bytes(key) sizes a model before
+    it is loaded; once loaded, the growth in resident memory during the load is
+    recorded instead when it can be measured.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], object],
+        budget_bytes: int = 0,
+        estimate_bytes: Optional[Callable[[str], int]] = None,
+        wait_timeout: float = 30.0,
+        name: str = "bangla",
+    ):
+        self._load = load
+        self.budget_bytes = budget_bytes
+        self._estimate = estimate_bytes or (lambda key: 0)
+        self.wait_timeout = wait_timeout
+        self.name = name
+        self._entries: Dict[str, _Entry] = {}
+        self._loading: Dict[str, threading.Event] = {}
+        self._reserved: Dict[str, int] = {}  # estimated bytes of loads in progress
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._stats = {"loads": 0, "hits": 0, "evictions": 0, "load_failures": 0}
+
+    # -- access ------------------------------------------------------------------------
+
+    @contextmanager
+    def lease(self, key: str) -> Iterator[object]:
+        """Hold the model for the duration of the block; it cannot be evicted meanwhile"""
+        model = self.acquire(key)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    def acquire(self, key: str):
+        """Load (or reuse) the model and hold it until the matching release(key)"""
+        return self._acquire(key).model
+
+    def release(self, key: str):
+        with self._lock:
+            entry = self._entries[key]
+            entry.refs -= 1
+            entry.last_used = time.monotonic()
+            self._released.notify_all()
+
+    def get(self, key: str):
+        """Load (or reuse) the model without holding it; for warm-up and short-lived callers"""
+        with self.lease(key) as model:
+            return model
+
+    __call__ = get
+
+    def _acquire(self, key: str) -> _Entry:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refs += 1
+                    entry.uses += 1
+                    entry.last_used = time.monotonic()
+                    self._stats["hits"] += 1
+                    return entry
+                pending = self._loading.get(key)
+                if pending is None:
+                    # This thread loads the model; others asking for it wait for the result
+                    self._loading[key] = threading.Event()
+                    break
+            pending.wait()
+
+        try:
+            entry = self._load_entry(key)
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+        return entry
+
+    def _load_entry(self, key: str) -> _Entry:
+        estimate = self._estimate(key)
+        self._make_room(key, estimate)
+
+        concurrent = len(self._loading) > 1
+        rss_before = current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            model = self._load(key)
+        except Exception as e:
+            model, error = None, e
+        else:
+            error = None
+        if model is None:
+            with self._lock:
+                self._reserved.pop(key, None)
+                self._stats["load_failures"] += 1
+            raise ModelUnavailable(f"Model {key!r} could not be loaded{f': {error}' if error else ''}") from error
+        load_seconds = time.perf_counter() - started
+
+        # The RSS growth is only this model's when no other load ran at the same time
+        rss_after = current_rss_bytes()
+        measured = not concurrent and rss_before is not None and rss_after is not None and rss_after > rss_before
+        size_bytes = rss_after - rss_before if measured else estimate
+
+        entry = _Entry(model, size_bytes, measured, load_seconds)
+        with self._lock:
+            entry.refs = 1
+            entry.uses = 1
+            self._entries[key] = entry
+            self._reserved.pop(key, None)
+            self._stats["loads"] += 1
+        metrics.gauge("model_memory_bytes", size_bytes, manager=self.name, model=key)
+        logger.info("Loaded %s model %s (%.0f MB, %.1fs)", self.name, key, size_bytes / _MB, load_seconds)
+        return entry
+
+    # -- eviction ----------------------------------------------------------------------
+
+    def _used_bytes(self) -> int:
+        return sum(entry.bytes for entry in self._entries.values()) + sum(self._reserved.values())
+
+    def _make_room(self, key: str, needed: int):
+        """Evict idle models until `needed` bytes fit, then reserve them for this load"""
+        if self.budget_bytes and needed > self.budget_bytes:
+            raise ModelBudgetExceeded(
+                f"Model {key!r} needs about {needed / _MB:.0f} MB, more than the "
+                f"{self.budget_bytes / _MB:.0f} MB model memory budget"
+            )
+        deadline = time.monotonic() + self.wait_timeout
+        evicted = []
+        try:
+            with self._lock:
+                while self.budget_bytes and self._used_bytes() + needed > self.budget_bytes:
+                    idle = [(entry.last_used, name) for name, entry in self._entries.items() if entry.refs == 0]
+                    if idle:
+                        _, victim = min(idle)
+                        evicted.append((victim, self._entries.pop(victim)))
+                        self._stats["evictions"] += 1
+                        continue
+                    # Everything resident is mid-inference: wait for a lease to end
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ModelBudgetExceeded(
+                            f"No room for model {key!r}: {self._used_bytes() / _MB:.0f} MB of "
+                            f"{self.budget_bytes / _MB:.0f} MB is held by models in use"
+                        )
+                    self._released.wait(remaining)
+                self._reserved[key] = needed
+        finally:
+            if evicted:
+                self._after_evict(evicted)
+
+    def _after_evict(self, evicted):
+        for name, entry in evicted:
+            logger.info("Evicted %s model %s (%.0f MB)", self.name, name, entry.bytes / _MB)
+            metrics.count("model_evictions_total", manager=self.name, model=name)
+            metrics.gauge("model_memory_bytes", 0, manager=self.name, model=name)
+            entry.model = None
+        evicted.clear()
+        _release_memory()
+
+    def evict(self, key: str) -> bool:
+        """Drop an idle model now; returns False if it is not loaded or still in use"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refs:
+                return False
+            del self._entries[key]
+            self._stats["evictions"] += 1
+        self._after_evict([(key, entry)])
+        return True
+
+    def clear(self):
+        """Evict every idle model"""
+        for key in list(self._entries):
+            self.evict(key)
+
+    # -- reporting ---------------------------------------------------------------------
+
+    def would_fit(self, key: str) -> bool:
+        """Whether loading the model now would fit the budget without evicting anything"""
+        with self._lock:
+            if key in self._entries:
+                return True
+            return not self.budget_bytes or self._used_bytes() + self._estimate(key) <= self.budget_bytes
+
+    def loaded(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                name: {
+                    "mb": round(entry.bytes / _MB, 1),
+                    "measured": entry.measured,
+                    "in_use": entry.refs,
+                    "uses": entry.uses,
+                    "idle_s": round(now - entry.last_used, 1),
+                    "load_s": round(entry.load_seconds, 2),
+                }
+                for name, entry in sorted(self._entries.items(), key=lambda item: item[1].last_used, reverse=True)
+            }
+            used = self._used_bytes()
+            stats = dict(self._stats)
+        rss = current_rss_bytes()
+        return {
+            "budget_mb": round(self.budget_bytes / _MB, 1) if self.budget_bytes else None,
+            "used_mb": round(used / _MB, 1),
+            "process_rss_mb": round(rss / _MB, 1) if rss is not None else None,
+            "models": models,
+            **stats,
+        }
+
+def create_bangla_model_manager(budget_mb: Optional[int] = None, **model_options) -> ModelManager:
+    """Manager for BanglaSpeech2Text sizes using the BANGLA_MODEL_BUDGET_MB budget (0 = unbounded)"""
+    import settings
+    from bangla_model import BANGLA_COMPUTE_TYPE, create_bangla_model, estimate_model_bytes
+
+    budget_mb = settings.BANGLA_MODEL_BUDGET_MB if budget_mb is None else budget_mb
+    compute_type = model_options.get("compute_type", BANGLA_COMPUTE_TYPE)
+    return ModelManager(
+        lambda size: create_bangla_model(size, **model_options),
+        budget_bytes=budget_mb * _MB,
+        estimate_bytes=lambda size: estimate_model_bytes(size, compute_type),
+        wait_timeout=settings.BANGLA_MODEL_WAIT_S,
+    )
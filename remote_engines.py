@@ -0,0 +1,255 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+import httpx
+
+import metrics
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+class RemoteEngineError(RuntimeError):
+    """A remote recognition call failed after retries (or with a non-retryable error)"""
+
+    def __init__(self, engine: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{engine}: {message}")
+        self.engine = engine
+        self.status = status
+
+class RetryPolicy(NamedTuple):
+    attempts: int = 3
+    base_delay: float = 0.2   # seconds, doubled on every retry
+    max_delay: float = 2.0
+    timeout: float = 15.0     # overall deadline for one transcription, retries included
+
+class RemoteEngines:
+    """asyncio client layer for the Deepgram and Google speech REST APIs.
+
+    All sessions share one keep-alive connection pool and one event loop
+    running on a background thread. Each engine has its own concurrency cap;
+    calls retry transient failures with jittered backoff inside an overall
+    deadline, and a hedged duplicate request is sent when the first one is
+    slower than hedge_after seconds.
+    """
+
+    def __init__(
+        self,
+        deepgram_api_key: str = "",
+        deepgram_url: str = "https://api.deepgram.com",
+        google_url: str = "http://www.google.com/speech-api/v2/recognize",
+        google_key: str = "",
+        concurrency: Optional[Dict[str, int]] = None,
+        retry: RetryPolicy = RetryPolicy(),
+        hedge_after: Optional[float] = 3.0,
+        max_connections: int = 32,
+    ):
+        self.deepgram_api_key = deepgram_api_key
+        self.deepgram_url = (deepgram_url or "https://api.deepgram.com").rstrip("/")
+        if "://" not in self.deepgram_url:
+            self.deepgram_url = "https://" + self.deepgram_url
+        self.google_url = google_url
+        self.google_key = google_key
+        self.concurrency = {"deepgram": 8, "google": 4, **(concurrency or {})}
+        self.retry = retry
+        self.hedge_after = hedge_after if hedge_after and hedge_after > 0 else None
+        self._stats = {name: {"requests": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+                              "failures": 0, "latency_s": 0.0} for name in self.concurrency}
+        self._stats_lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="remote-engines", daemon=True)
+        self._thread.start()
+        # The client and semaphores belong to the background loop, so create them there
+        self._client, self._semaphores = self.run(self._setup(max_connections))
+
+    async def _setup(self, max_connections: int):
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(self.retry.timeout, connect=5.0),
+        )
+        semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.concurrency.items()}
+        return client, semaphores
+
+    # -- thread-safe entry points -------------------------------------------------
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule a coroutine on the shared loop; cancel the returned future to abort it"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """Run a coroutine on the shared loop and wait for its result from any thread"""
+        return self.submit(coro).result(timeout)
+
+    def deepgram_sync(self, audio: bytes, language: str = "en-US", model: str = "nova-3",
+                      content_type: str = "audio/wav") -> Optional[str]:
+        return self.run(self.deepgram(audio, language, model, content_type))
+
+    def google_sync(self, audio: bytes, language: str = "en-US") -> Optional[str]:
+        return self.run(self.google(audio, language))
+
+    # -- engines -----------------------------------------------------------------
+
+    async def deepgram(self, audio: bytes, language: str = "en-US", model: str = "nova-3",
+                       content_type: str = "audio/wav") -> Optional[str]:
+        """Transcribe a clip with Deepgram's pre-recorded REST endpoint (WAV, FLAC or Ogg/Opus)"""
+        if not self.deepgram_api_key:
+            raise RemoteEngineError("deepgram", "no API key configured")
+
+        async def request():
+            return await self._client.post(
+                f"{self.deepgram_url}/v1/listen",
+                params={"model": model, "language": language, "smart_format": "true"},
+                headers={"Authorization": f"Token {self.deepgram_api_key}", "Content-Type": content_type},
+                content=audio,
+            )
+
+        response = await self._call("deepgram", request)
+        channels = response.json().get("results", {}).get("channels", [])
+        alternatives = channels[0].get("alternatives", []) if channels else []
+        transcript = alternatives[0].get("transcript", "").strip() if alternatives else ""
+        return transcript or None
+
+    async def google(self, audio: bytes, language: str = "en-US") -> Optional[str]:
+        """Transcribe a WAV clip with the Google Web Speech API used by SpeechRecognition"""
+        # FLAC encoding shells out to the flac binary, so keep it off the event loop
+        flac_data, sample_rate = await asyncio.get_running_loop().run_in_executor(None, wav_to_flac, audio)
+
+        async def request():
+            return await self._client.post(
+                self.google_url,
+                params={"client": "chromium", "lang": language, "key": self.google_key},
+                headers={"Content-Type": f"audio/x-flac; rate={sample_rate}"},
+                content=flac_data,
+            )
+
+        response = await self._call("google", request)
+        return parse_google_response(response.text)
+
+    # -- retries, deadlines and hedging ------------------------------------------------
+
+    async def _call(self, engine: str, request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        started = time.monotonic()
+        deadline = started + self.retry.timeout
+        self._bump(engine, "requests")
+        last_error = None
+
+        try:
+            for attempt in range(self.retry.attempts):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if attempt:
+                    self._bump(engine, "retries")
+                try:
+                    async with self._semaphores[engine]:
+                        response = await self._hedged(engine, request, deadline - time.monotonic())
+                except (httpx.TimeoutException, httpx.TransportError, asyncio.TimeoutError) as e:
+                    last_error = RemoteEngineError(engine, f"{type(e).__name__}: {e}")
+                else:
+                    if response.status_code < 400:
+                        return response
+                    last_error = RemoteEngineError(engine, f"HTTP {response.status_code}", response.status_code)
+                    if response.status_code not in RETRYABLE_STATUS:
+                        break
+
+                # Full-jitter exponential backoff, never sleeping past the deadline
+                backoff = random.uniform(0, min(self.retry.max_delay, self.retry.base_delay * (2 ** attempt)))
+                await asyncio.sleep(max(0.0, min(backoff, deadline - time.monotonic())))
+
+            self._bump(engine, "failures")
+            raise last_error or RemoteEngineError(engine, "deadline exceeded")
+        finally:
+            self._bump(engine, "latency_s", time.monotonic() - started)
+            metrics.observe("stage_seconds", time.monotonic() - started, stage="remote", engine=engine)
+
+    async def _hedged(self, engine: str, request, timeout: float) -> httpx.Response:
+        self._bump(engine, "attempts")
+        first = asyncio.ensure_future(request())
+        if self.hedge_after is None or self.hedge_after >= timeout:
+            return await asyncio.wait_for(first, timeout)
+
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        # The first attempt is slow: race a duplicate, but only if the engine has spare capacity
+        semaphore = self._semaphores[engine]
+        if semaphore.locked():
+            return await asyncio.wait_for(first, timeout - self.hedge_after)
+
+        async with semaphore:
+            self._bump(engine, "hedges")
+            self._bump(engine, "attempts")
+            second = asyncio.ensure_future(request())
+            pending = {first, second}
+            end = time.monotonic() + timeout - self.hedge_after
+            error = None
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, timeout=max(0.0, end - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        raise asyncio.TimeoutError()
+                    for task in done:
+                        if task.exception() is None and task.result().status_code < 500:
+                            if task is second:
+                                self._bump(engine, "hedge_wins")
+                            return task.result()
+                        error = task
+                return error.result()  # both failed: surface the last response or exception
+            finally:
+                for task in pending:
+                    task.cancel()
+
+    def _bump(self, engine: str, name: str, amount: float = 1):
+        with self._stats_lock:
+            self._stats[engine][name] += amount
+
+    def stats(self) -> Dict[str, dict]:
+        with self._stats_lock:
+            return {engine: dict(values) for engine, values in self._stats.items()}
+
+    def close(self):
+        self.run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+def wav_to_flac(audio: bytes) -> tuple:
+    """Encode WAV bytes to FLAC the same way SpeechRecognition's recognize_google does"""
+    import io
+
+    import speech_recognition as sr
+
+    with sr.AudioFile(io.BytesIO(audio)) as source:
+        audio_data = sr.Recognizer().record(source)
+    sample_rate = audio_data.sample_rate if audio_data.sample_rate >= 8000 else 8000
+    flac_data = audio_data.get_flac_data(
+        convert_rate=None if audio_data.sample_rate >= 8000 else 8000,
+        convert_width=2,
+    )
+    return flac_data, sample_rate
+
+def parse_google_response(text: str) -> Optional[str]:
+    """Pick the best alternative from Google's newline-delimited JSON results"""
+    for line in text.split("\n"):
+        if not line:
+            continue
+        results = json.loads(line).get("result", [])
+        if not results:
+            continue
+        alternatives = results[0].get("alternative", [])
+        if not alternatives:
+            continue
+        best = max(alternatives, key=lambda alternative: alternative.get("confidence", 0))
+        transcript = best.get("transcript", "").strip()
+        return transcript or None
+    return None
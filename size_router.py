@@ -0,0 +1,224 @@
+"""Automatic BanglaSpeech2Text size selection ("Auto") from clip length, load and a latency SLO.
+
+The largest size whose predicted latency fits the SLO wins, and bigger sizes
+lose out as the clip gets longer or requests queue up. Predictions use a
+real-time factor per size that starts from rough CPU int8 priors and follows
+the measured RTF of finished requests. A size that is not loaded counts its
+load time, so a request never waits for a big model to load: a cold server
+answers with a loaded (preloaded) size, or tiny, and an idle server loads the
+biggest size that would have fitted in the background instead, as long as it
+fits the memory budget next to the models already loaded.
+
+With the default priors and 3 s SLO, medium serves clips up to about 3.5 s
+and large only clips under 2 s. Large also needs BANGLA_MODEL_BUDGET_MB of
+about 3.5 GB to load next to the preloaded base model; under the default
+3 GB budget Auto tops out at medium.
+
+When the server is idle, segments the chosen model was unsure about (low
+average log-probability) can be re-run on a bigger loaded model within what
+is left of the SLO (escalate()).
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import metrics
+from audio_source import MODEL_SAMPLE_RATE
+from bangla_model import BANGLA_MODEL_SIZES
+
+AUTO = "auto"
+
+logger = logging.getLogger(__name__)
+
+# Seconds of CPU int8 inference per second of audio, before anything has been measured
+RTF_PRIORS = {"tiny": 0.05, "base": 0.1, "small": 0.3, "medium": 0.8, "large": 1.6}
+# Download-free load time (conversion cached on disk) used to penalize sizes that are not loaded
+LOAD_SECONDS_PRIORS = {"tiny": 2.0, "base": 3.0, "small": 8.0, "medium": 20.0, "large": 40.0}
+
+class RouteDecision(NamedTuple):
+    size: str
+    predicted_ms: float
+    queue_depth: int
+    reason: str
+    escalate_to: Optional[str] = None  # bigger loaded size for low-confidence segments, if idle
+
+class SizeRouter:
+    """Pick a model size per request and learn each size's real-time factor"""
+
+    def __init__(
+        self,
+        sizes: Iterable[str] = BANGLA_MODEL_SIZES,
+        slo_ms: float = 3000.0,
+        models=None,
+        parallelism: int = 1,
+        prefetch: bool = True,
+        smoothing: float = 0.2,
+    ):
+        self.sizes = [size for size in BANGLA_MODEL_SIZES if size in set(sizes)]  # smallest first
+        self.slo_ms = slo_ms
+        self.models = models
+        self.parallelism = max(1, parallelism)
+        self.prefetch = prefetch
+        self.smoothing = smoothing
+        self._rtf = {size: RTF_PRIORS.get(size, 1.0) for size in self.sizes}
+        self._samples = {size: 0 for size in self.sizes}
+        self._in_flight = 0
+        self._prefetching: Optional[str] = None
+        self._lock = threading.Lock()
+
+    # -- learning ----------------------------------------------------------------------
+
+    def observe(self, size: str, audio_seconds: float, elapsed: float):
+        """Fold a finished inference into the size's real-time factor (exponential moving average)"""
+        if size not in self._rtf or audio_seconds <= 0:
+            return
+        rtf = elapsed / audio_seconds
+        with self._lock:
+            if self._samples[size] == 0:
+                self._rtf[size] = rtf
+            else:
+                self._rtf[size] += self.smoothing * (rtf - self._rtf[size])
+            self._samples[size] += 1
+
+    def rtf(self, size: str) -> float:
+        return self._rtf.get(size, RTF_PRIORS.get(size, 1.0))
+
+    def started(self):
+        """Count a request as in flight, for the queue depth seen by later decisions"""
+        with self._lock:
+            self._in_flight += 1
+
+    def finished(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    @contextmanager
+    def track(self):
+        """started() and finished() around a blocking request"""
+        self.started()
+        try:
+            yield
+        finally:
+            self.finished()
+
+    # -- decisions ---------------------------------------------------------------------
+
+    def _loaded(self) -> set:
+        return set(self.models.loaded()) if self.models is not None else set(self.sizes)
+
+    def predict_ms(self, size: str, audio_seconds: float, queue_depth: int = 0, loaded: bool = True) -> float:
+        compute = audio_seconds * self.rtf(size)
+        # Requests ahead of this one are assumed to be about as long and share the workers
+        waiting = compute * queue_depth / self.parallelism
+        load = 0.0 if loaded else LOAD_SECONDS_PRIORS.get(size, 30.0)
+        return (compute + waiting + load) * 1000
+
+    def choose(self, audio_seconds: float, queue_depth: int = 0) -> RouteDecision:
+        with self._lock:
+            queue_depth = max(queue_depth, self._in_flight)
+        loaded = self._loaded()
+        predicted = {size: self.predict_ms(size, audio_seconds, queue_depth, size in loaded) for size in self.sizes}
+
+        fitting = [size for size in self.sizes if predicted[size] <= self.slo_ms]
+        if fitting:
+            size, reason = fitting[-1], "largest size within the SLO"
+        else:
+            size, reason = min(self.sizes, key=predicted.get), "SLO out of reach, fastest size"
+
+        escalate_to = None
+        if queue_depth == 0:
+            bigger = self.sizes[self.sizes.index(size) + 1:]
+            escalate_to = next((candidate for candidate in reversed(bigger) if candidate in loaded), None)
+            # A bigger size would fit once loaded: load it in the background for the next requests
+            warm = [candidate for candidate in bigger if candidate not in loaded
+                    and self.predict_ms(candidate, audio_seconds, 0, loaded=True) <= self.slo_ms]
+            if warm and self.prefetch and self.models is not None:
+                # The biggest one that fits next to what is loaded; a bigger one never would without evictions
+                fits = [candidate for candidate in warm if self.models.would_fit(candidate)]
+                if fits:
+                    self._prefetch(fits[-1])
+
+        metrics.count("auto_route_total", size=size)
+        return RouteDecision(size, round(predicted[size], 1), queue_depth, reason, escalate_to)
+
+    def _prefetch(self, size: str):
+        with self._lock:
+            if self._prefetching is not None:
+                return
+            self._prefetching = size
+
+        def load():
+            try:
+                self.models.get(size)
+            except Exception as e:
+                logger.info("Background load of %s model failed: %s", size, e)
+            finally:
+                with self._lock:
+                    self._prefetching = None
+
+        threading.Thread(target=load, name=f"prefetch-{size}", daemon=True).start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slo_ms": self.slo_ms,
+                "in_flight": self._in_flight,
+                "prefetching": self._prefetching,
+                "rtf": {size: round(rtf, 3) for size, rtf in self._rtf.items()},
+                "observations": dict(self._samples),
+            }
+
+# -- escalation --------------------------------------------------------------------------
+
+def low_confidence(segment, threshold: float) -> bool:
+    """Whisper's own signals for a dubious segment: low log-probability or repetitive output"""
+    return segment.avg_logprob < threshold or segment.compression_ratio > 2.4
+
+def escalate(
+    segments: List,
+    samples: np.ndarray,
+    recognize: Callable[[np.ndarray], str],
+    threshold: float = -1.0,
+    budget_s: Optional[float] = None,
+    rtf: float = 1.0,
+    pad_s: float = 0.2,
+) -> Tuple[str, int]:
+    """Re-run low-confidence segments with a bigger model; returns (text, segments replaced).
+
+    Segments are retried least confident first until the predicted time
+    (segment length × rtf) would exceed budget_s.
+    """
+    texts = [segment.text for segment in segments]
+    dubious = sorted((i for i, segment in enumerate(segments) if low_confidence(segment, threshold)),
+                     key=lambda i: segments[i].avg_logprob)
+    remaining = budget_s
+    replaced = 0
+    for i in dubious:
+        segment = segments[i]
+        start = max(0, int((segment.start - pad_s) * MODEL_SAMPLE_RATE))
+        end = min(len(samples), int((segment.end + pad_s) * MODEL_SAMPLE_RATE))
+        cost = (end - start) / float(MODEL_SAMPLE_RATE) * rtf
+        if end <= start or (remaining is not None and cost > remaining):
+            continue
+        if remaining is not None:
+            remaining -= cost
+        text = recognize(samples[start:end])
+        if text and text.strip():
+            texts[i] = " " + text.strip()
+            replaced += 1
+    return "".join(texts), replaced
+
+def create_size_router(models=None, parallelism: int = 1) -> SizeRouter:
+    """Router configured from settings (BANGLA_AUTO_*)"""
+    import settings
+
+    return SizeRouter(
+        sizes=settings.BANGLA_AUTO_SIZES,
+        slo_ms=settings.BANGLA_AUTO_SLO_MS,
+        models=models,
+        parallelism=parallelism,
+        prefetch=settings.BANGLA_AUTO_PREFETCH,
+    )
@@ -1,19 +1,75 @@
 import streamlit as st
-import os
-from utilss import speech_to_text
-from bangla_stt_fixed import bangla_speech_to_text, test_bangla_model, clean_bangla_text
+from utilss import get_deepgram_client, get_groq_client, get_remote_engines, get_engine, stream_answer_tokens, autoplay_audio, get_tts_cache, start_metrics_exporter
+from bangla_stt_fixed import test_bangla_model, clean_bangla_text, bangla_long_speech_to_text, stitch_segments, get_bangla_worker_pool, load_bangla_model, get_bangla_batcher, get_bangla_models, get_bangla_engine
+from bangla_workers import PoolSaturated
+from engines import EngineUnavailable, available_engines, engine_for_label, engine_label
 # from bangla_stt_large import bangla_speech_to_text, test_bangla_model, clean_bangla_text
 from audio_recorder_streamlit import audio_recorder
 from streamlit_float import *
 import hashlib
-import speech_recognition as sr
+import io
+import os
+import zipfile
+import uuid
+import time
+from collections import deque
+from audio_source import AudioSource
+from audio_preprocess import preprocess
+from long_audio import format_timestamp
+from engine_race import RACE_MODES, race_engines
+import settings
+import metrics
+from transcript_cache import TranscriptCache
+from warmup import Readiness, start_background_warm_up
+from voice_reply import VoiceReplyPipeline, mp3_duration, tts_voice
+from clients import GROQ_MODEL, create_deepgram_client, create_groq_client
+from transcript_store import TranscriptEntry, TranscriptStore
+from size_router import AUTO
+from batch_transcribe import BatchTranscriber, upload_input
 
 # Float feature initialization
 float_init()
 
+@st.cache_resource
+def start_warm_up():
+    """Preload configured models and clients once per server process, in the background
+
+    The warm-up thread has no script run context, so it only uses the
+    Streamlit-free factories: failures land in the Readiness panel instead of
+    an st.error nobody sees. Run `python warmup.py` before `streamlit run` to
+    fill the model cache before the first session arrives.
+    """
+    if not settings.WARMUP_ENABLED:
+        return Readiness()
+
+    models = get_bangla_models()
+
+    def load_model(size):
+        stt = models.get(size)
+        get_bangla_batcher(size)
+        return stt
+
+    factories = {"deepgram": create_deepgram_client, "groq": create_groq_client}
+    return start_background_warm_up(
+        load_model=load_model,
+        model_sizes=settings.BANGLA_PRELOAD_SIZES,
+        client_factories={name: factories[name] for name in settings.WARMUP_CLIENTS if name in factories},
+        worker_pool=get_bangla_worker_pool(),
+    )
+
+warm_up_status = start_warm_up()
+start_metrics_exporter()
+
 def initialize_session_state():
     if "transcripts" not in st.session_state:
-        st.session_state.transcripts = []
+        # History lives on disk; the session id in the URL brings it back after a reload
+        session_id = st.experimental_get_query_params().get("session", [None])[0]
+        if not session_id or not session_id.isalnum():
+            session_id = uuid.uuid4().hex
+            st.experimental_set_query_params(session=session_id)
+        st.session_state.transcripts = TranscriptStore(os.path.join(settings.TRANSCRIPT_STORE_DIR, f"{session_id}.jsonl"))
+    if "history_pages" not in st.session_state:
+        st.session_state.history_pages = 1
     if "last_audio_hash" not in st.session_state:
         st.session_state.last_audio_hash = None
     if "is_option_change" not in st.session_state:
@@ -25,7 +81,9 @@ st.title("Enhanced Speech-to-Text App 🎤")
 st.markdown("*Now with Bengali language support!*")
 
 # Transcription engine selection with BanglaSpeech2Text
-ENGINE_OPTIONS = ["Deepgram", "Python SpeechRecognition", "BanglaSpeech2Text"]
+# Built-in engines plus any installed through the "stt_app.engines" entry point group
+ENGINE_LABELS = [engine_label(name) for name in available_engines()]
+ENGINE_OPTIONS = ENGINE_LABELS + ["Multi-engine (race)"]
 selected_engine = st.selectbox(
     "Choose transcription engine:",
     options=ENGINE_OPTIONS,
@@ -33,6 +91,14 @@ selected_engine = st.selectbox(
     help="BanglaSpeech2Text is specifically optimized for Bengali language"
 )
 
+model_code = "nova-3"
+bangla_model_size = settings.BANGLA_PRELOAD_SIZES[0] if settings.BANGLA_PRELOAD_SIZES else "base"
+long_form_mode = False
+long_form_upload = None
+stream_deepgram = False
+race_engine_names = []
+race_mode = RACE_MODES[0]
+
 # Language selection with conditional options
 if selected_engine == "BanglaSpeech2Text":
     # For BanglaSpeech2Text, only Bengali is supported
@@ -45,6 +111,7 @@ if selected_engine == "BanglaSpeech2Text":
     
     # Model size selection for BanglaSpeech2Text
     BANGLA_MODEL_SIZES = {
+        "Auto (by clip length and load)": AUTO,
         "Tiny (~39MB)": "tiny",
         "Base (~74MB) - Recommended": "base", 
         "Small (~244MB)": "small",
@@ -55,13 +122,28 @@ if selected_engine == "BanglaSpeech2Text":
     selected_bangla_model = st.selectbox(
         "Choose BanglaSpeech2Text model size:",
         options=list(BANGLA_MODEL_SIZES.keys()),
-        index=1,  # Default to base model
-        help="Smaller models download faster but may have lower accuracy. Base model (~74MB) is recommended for good balance."
+        index=2,  # Default to base model
+        help="Smaller models download faster but may have lower accuracy. Base model (~74MB) is recommended for good balance. "
+             "Auto picks the largest size that answers within the latency target for each clip and falls back to smaller ones under load."
     )
     bangla_model_size = BANGLA_MODEL_SIZES[selected_bangla_model]
+    if bangla_model_size == AUTO:
+        st.caption(f"⚖️ Latency target {settings.BANGLA_AUTO_SLO_MS / 1000:g}s per clip; "
+                   f"sizes: {', '.join(settings.BANGLA_AUTO_SIZES)}")
+
+    long_form_mode = st.checkbox(
+        "📼 Long-form mode (split on pauses)",
+        value=False,
+        help="For long recordings: audio is split on silence and each segment is shown with timestamps as soon as it is transcribed"
+    )
+    if long_form_mode:
+        long_form_upload = st.file_uploader(
+            "Upload a long Bengali recording (10–60 minutes)",
+            type=["wav", "mp3", "m4a", "ogg", "flac"]
+        )
     
     # Test the model on first load
-    if st.button("🧪 Test BanglaSpeech2Text Model"):
+    if bangla_model_size != AUTO and st.button("🧪 Test BanglaSpeech2Text Model"):
         with st.spinner(f"Testing BanglaSpeech2Text {bangla_model_size} model..."):
             test_bangla_model(bangla_model_size)
             
@@ -89,8 +171,23 @@ else:
     )
     language_code = DEEPGRAM_LANGUAGES[selected_language]
 
+# Run several engines on the same clip at once
+if selected_engine == "Multi-engine (race)":
+    RACE_ENGINES = ENGINE_LABELS
+    race_engine_names = st.multiselect(
+        "Engines to run in parallel:",
+        options=RACE_ENGINES,
+        default=[label for label in RACE_ENGINES if language_code == "bn-BD" or label != "BanglaSpeech2Text"]
+    )
+    race_mode = st.radio(
+        "Race mode:",
+        options=RACE_MODES,
+        horizontal=True,
+        help="first-wins returns the first usable transcript and cancels the others; consensus combines all transcripts by word voting"
+    )
+
 # Show Deepgram models dropdown only when Deepgram is selected
-if selected_engine == "Deepgram":
+if selected_engine == "Deepgram" or "Deepgram" in race_engine_names:
     DEEPGRAM_MODELS = {
         "Nova-3 (best, default)": "nova-3",
         "Nova-2 (fast, legacy)": "nova-2",
@@ -104,27 +201,235 @@ if selected_engine == "Deepgram":
     )
     model_code = DEEPGRAM_MODELS[selected_model]
 
+voice_reply = st.checkbox(
+    "🤖 Voice reply (AI assistant)",
+    value=False,
+    help="Answer each transcript with the AI assistant; the reply is spoken sentence by sentence while it is still being written"
+)
+
+if selected_engine == "Deepgram":
+    stream_deepgram = st.checkbox(
+        "⚡ Stream interim results (live API)",
+        value=False,
+        help="Send audio over Deepgram's websocket API and show partial transcripts while it is processed"
+    )
+
+# Per-engine keyword options taken from the controls above
+ENGINE_KWARGS = {"deepgram": {"model": model_code}, "bangla": {"model_size": bangla_model_size}}
+
+@st.cache_resource
+def get_transcript_cache():
+    """Shared on-disk transcript cache (one per server process, same file for all workers)"""
+    return TranscriptCache(
+        settings.TRANSCRIPT_CACHE_PATH,
+        max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+        max_bytes=settings.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024,
+    )
+
+transcript_cache = get_transcript_cache()
+
 def get_audio_hash(audio_bytes):
     if audio_bytes is None:
         return None
     return hashlib.md5(audio_bytes).hexdigest()
 
-def python_stt(audio_file_path, language="en-US"):
-    recognizer = sr.Recognizer()
-    with sr.AudioFile(audio_file_path) as source:
-        audio = recognizer.record(source)
+def run_engine(label, audio_for, language, stream=False):
+    """Transcribe with one registry engine; user-facing error reporting stays here, not in the engines"""
+    name = engine_for_label(label)
+    engine = get_engine(name)
+    options = ENGINE_KWARGS.get(name, {})
+    transcript = None
     try:
-        return recognizer.recognize_google(audio, language=language)
+        if stream and engine.capabilities.streaming:
+            with st.chat_message("user"), metrics.span("stt", engine=name, mode="stream"):
+                live_placeholder = st.empty()
+                for update in engine.transcribe_stream(audio_for(label, "wav"), language, **options):
+                    live_placeholder.markdown(update.text if update.is_final else f"{update.text} …")
+                    if update.done:
+                        transcript = update.text.strip() or None
+                # The finished transcript is rendered with the chat history below
+                live_placeholder.empty()
+        else:
+            audio = audio_for(label)
+            with metrics.span("stt", engine=name):
+                transcript = engine.transcribe(audio, language, **options)
+    except PoolSaturated:
+        st.warning(f"⏳ {label} is busy with other requests. Please try again in a moment.")
+    except EngineUnavailable as e:
+        st.error(f"{label} is not available: {e}")
     except Exception as e:
-        st.error(f"Python STT error: {e}")
-        return None
+        st.error(f"{label} error: {e}")
+
+    if transcript and language == "bn-BD":
+        transcript = clean_bangla_text(transcript)
+    return transcript
+
+def run_batch(uploads, label, language):
+    """Transcribe uploaded files with one engine, showing progress; results persist in the session"""
+    name = engine_for_label(label)
+    options = ENGINE_KWARGS.get(name, {})
+    session = os.path.splitext(os.path.basename(st.session_state.transcripts.path))[0]
+    batch = BatchTranscriber(
+        get_engine(name),
+        os.path.join(settings.BATCH_OUTPUT_DIR, session),
+        language,
+        cache_model=options.get("model") or options.get("model_size") or name,
+        options=options,
+        cache=transcript_cache,
+        workers=settings.BATCH_WORKERS,
+        segment_concurrency=settings.BATCH_SEGMENT_CONCURRENCY,
+    )
+    inputs = [upload_input(upload.name, upload.getvalue()) for upload in uploads]
+    progress_bar = st.progress(0.0)
+    status = st.empty()
+    rows = []
+
+    def on_result(result, progress):
+        progress_bar.progress(progress.finished / progress.total)
+        status.caption(f"{result.name} · {progress.summary()}")
+        rows.append({"file": result.name, "audio s": round(result.duration, 1),
+                     "status": result.error or ("cached (text only, no SRT)" if result.cached else "transcribed"),
+                     "text": (result.text or "")[:120]})
+
+    progress = batch.run(inputs, on_result)
+    status.empty()
+    st.session_state.batch_result = {
+        "summary": progress.summary(),
+        "rows": rows,
+        "output": batch.output_path,
+        "srt": [batch.srt_path(item.name) for item in inputs],
+    }
+
+def run_long_form(audio, model_size):
+    """Show Bengali segments in the chat as they finish and return the stitched transcript"""
+    segments = []
+    try:
+        with st.chat_message("user"):
+            placeholder = st.empty()
+            for segment in bangla_long_speech_to_text(audio, model_size):
+                segments.append(segment)
+                placeholder.markdown("\n\n".join(
+                    f"`{format_timestamp(s.start)}–{format_timestamp(s.end)}` {s.text}" for s in segments
+                ))
+            # The stitched transcript is rendered with the chat history below
+            placeholder.empty()
+    except Exception as e:
+        st.error(f"BanglaSpeech2Text long-form error: {e}")
+    return stitch_segments(segments) if segments else None
+
+def prepare_audio(audio_bytes):
+    """Preprocess the clip once; returns a function giving each engine its own view of it"""
+    raw = AudioSource(audio_bytes)
+    if not settings.PREPROCESS_ENABLED:
+        return lambda engine, encoding=None: raw, None
+    try:
+        prepared = preprocess(audio_bytes, threshold_db=settings.PREPROCESS_TRIM_DB)
+    except Exception as e:
+        st.warning(f"Audio preprocessing failed, sending the original clip: {e}")
+        return lambda engine, encoding=None: raw, None
+    if prepared.duration < 0.1:
+        # The gate found no speech; let the engines see the untrimmed clip rather than nothing
+        return lambda engine, encoding=None: raw, prepared
+
+    def audio_for(engine, encoding=None):
+        if engine == "Deepgram" and encoding is None:
+            encoding = settings.REMOTE_AUDIO_ENCODING
+        return prepared.for_engine(engine, encoding)
+    return audio_for, prepared
+
+def run_race(audio_for, engine_names, mode, language):
+    """Run the selected engines in parallel; returns (transcript, winning engine, latencies in ms)"""
+    def starter(label):
+        name = engine_for_label(label)
+        engine = get_engine(name)
+        return lambda: engine.submit(audio_for(label), language, **ENGINE_KWARGS.get(name, {}))
+
+    with metrics.span("race", mode=mode):
+        result = race_engines(
+            {label: starter(label) for label in engine_names},
+            mode=mode,
+            language=language,
+            timeout=settings.RACE_TIMEOUT_S,
+        )
+
+    latencies = {r.engine: round(r.latency * 1000) for r in result.results if r.latency is not None}
+    summary = " · ".join(
+        f"{r.engine}: {latencies[r.engine]} ms" if r.engine in latencies else f"{r.engine}: {r.error}"
+        for r in result.results
+    )
+    st.caption(f"🏁 {mode} → {result.winner or 'no transcript'} | {summary}")
+
+    text = result.text
+    if text and language == "bn-BD":
+        text = clean_bangla_text(text)
+    return text, result.winner, latencies
+
+def run_voice_reply(language):
+    """Stream the assistant's answer and speak it sentence by sentence; returns the reply text"""
+    # The conversation keeps what fits the token budget and folds older turns into its summary
+    messages = [
+        {"role": entry.role, "content": entry.text, "seq": entry.seq}
+        for entry in st.session_state.transcripts.recent(settings.LLM_RECENT_MESSAGES)
+    ]
+    tts_lang, tld = tts_voice(language)
+    tts_cache = get_tts_cache()
+    pipeline = VoiceReplyPipeline(stream_answer_tokens(messages), lambda text: tts_cache.read(text, tts_lang, tld))
+
+    reply = ""
+    pending = deque()
+    play_until = 0.0
+
+    with st.chat_message("assistant"):
+        text_placeholder = st.empty()
+        audio_placeholder = st.empty()
+
+        def play_due():
+            # Start the next sentence once the previous one has (approximately) finished playing
+            nonlocal play_until
+            if pending and time.monotonic() >= play_until:
+                event = pending.popleft()
+                autoplay_audio(event.audio, audio_placeholder)
+                play_until = time.monotonic() + mp3_duration(event.audio)
+
+        for event in pipeline.events(poll=0.05):
+            if event is None:
+                pass
+            elif event.kind == "token":
+                reply += event.text
+                text_placeholder.markdown(reply + " ▌")
+            elif event.kind == "audio":
+                pending.append(event)
+            elif event.kind == "error":
+                st.warning(event.text)
+            else:
+                reply = event.text
+            play_due()
+
+        text_placeholder.markdown(reply)
+        while pending:
+            time.sleep(max(0.0, play_until - time.monotonic()))
+            play_due()
+
+    if pipeline.first_token_at is not None:
+        metrics.observe("stage_seconds", pipeline.first_token_at, stage="llm_first_token")
+    if pipeline.first_audio_at is not None:
+        metrics.observe("stage_seconds", pipeline.first_audio_at, stage="voice_first_audio")
+        st.caption(f"🔊 First audio after {pipeline.first_audio_at * 1000:.0f} ms "
+                   f"(first token {pipeline.first_token_at * 1000:.0f} ms)")
+    return reply.strip() or None
+
+def append_transcript(text, engine, language, latencies=None, role="user"):
+    st.session_state.transcripts.append(
+        TranscriptEntry(text=text, engine=engine, language=language, role=role, latencies_ms=latencies or None)
+    )
 
 # Track last processed audio hash and reset if options change
 if (
     st.session_state.get("last_engine") != selected_engine or
     st.session_state.get("last_lang") != selected_language or
     (selected_engine == "Deepgram" and st.session_state.get("last_model") != selected_model) or
-    (selected_engine == "BanglaSpeech2Text" and st.session_state.get("last_bangla_model") != bangla_model_size)
+    (selected_engine == "BanglaSpeech2Text" and st.session_state.get("last_bangla_model") != bangla_model_size) or
+    (selected_engine == "Multi-engine (race)" and st.session_state.get("last_race") != (race_mode, tuple(race_engine_names)))
 ):
     st.session_state.is_option_change = True
 else:
@@ -136,6 +441,10 @@ if selected_engine == "Deepgram":
     st.session_state["last_model"] = selected_model
 elif selected_engine == "BanglaSpeech2Text":
     st.session_state["last_bangla_model"] = bangla_model_size
+elif selected_engine == "Multi-engine (race)":
+    st.session_state["last_race"] = (race_mode, tuple(race_engine_names))
+    if "Deepgram" in race_engine_names:
+        st.session_state["last_model"] = selected_model
 
 # Create footer container for the microphone
 footer_container = st.container()
@@ -158,94 +467,213 @@ with st.expander("🔍 Debug Information", expanded=False):
     st.write(f"Current engine: {selected_engine}")
     st.write(f"Current language: {selected_language}")
     st.write(f"Is option change: {st.session_state.get('is_option_change', False)}")
+    st.write(f"Transcript cache: {transcript_cache.stats()}")
+    st.write(f"Remote engines: {get_remote_engines().stats()}")
+    st.write(f"TTS cache: {get_tts_cache().stats()}")
+    if st.session_state.get("last_preprocess_report"):
+        st.write("Preprocessing (stage, bytes in → out, ms):")
+        st.write([(r.stage, r.bytes_in, r.bytes_out, round(r.ms, 2)) for r in st.session_state.last_preprocess_report])
+    st.write(f"BanglaSpeech2Text models: {get_bangla_models().stats()}")
+    st.write(f"Auto size router: {get_bangla_engine().router.stats()}")
+    if get_bangla_worker_pool() is not None:
+        st.write(f"BanglaSpeech2Text workers: {get_bangla_worker_pool().metrics()}")
 
 if audio_bytes and (audio_hash != st.session_state.get("last_audio_hash")) and not st.session_state.is_option_change:
-    with st.spinner(f"Transcribing with {selected_engine}..."):
-        # Determine file extension based on engine
-        if selected_engine == "Python SpeechRecognition":
-            temp_file_path = "temp_audio.wav"
-        elif selected_engine == "BanglaSpeech2Text":
-            temp_file_path = "temp_audio.wav"  # BanglaSpeech2Text works better with WAV
+    # Model component of the transcript cache key
+    if selected_engine == "Deepgram":
+        cache_model = model_code
+    elif selected_engine == "BanglaSpeech2Text":
+        cache_model = f"{bangla_model_size}-longform" if long_form_mode else bangla_model_size
+    elif selected_engine == "Multi-engine (race)":
+        deepgram_model = model_code if "Deepgram" in race_engine_names else "-"
+        cache_model = f"{race_mode}:{'+'.join(sorted(race_engine_names))}:{deepgram_model}:{bangla_model_size}"
+    else:
+        cache_model = engine_for_label(selected_engine)
+
+    # Stage timings of this recording, shown in the performance panel
+    with metrics.trace("recording") as request_trace:
+        transcript_engine = selected_engine
+        race_latencies = None
+
+        with metrics.span("cache_lookup"):
+            transcript = transcript_cache.get(audio_hash, selected_engine, cache_model, language_code)
+        if transcript:
+            st.caption("⚡ Served from transcript cache")
         else:
-            temp_file_path = "temp_audio.mp3"
-            
-        # Save audio to temporary file
-        with open(temp_file_path, "wb") as f:
-            f.write(audio_bytes)
+            with st.spinner(f"Transcribing with {selected_engine}..."):
+                # Every engine reads the clip from memory; nothing is written to the working directory.
+                # Downmix, resampling and silence trimming run once, then each engine gets its own encoding.
+                with metrics.span("preprocess"):
+                    audio_for, prepared = prepare_audio(audio_bytes)
+                stt_started = time.perf_counter()
 
-        # Transcribe based on selected engine
-        transcript = None
-        
-        if selected_engine == "Deepgram":
-            transcript = speech_to_text(temp_file_path, language_code, model_code)
-            
-        elif selected_engine == "Python SpeechRecognition":
-            try:
-                transcript = python_stt(temp_file_path, language_code)
-            except Exception as e:
-                st.warning("Python STT only supports WAV audio. Please try again.")
-                transcript = None
-                
-        elif selected_engine == "BanglaSpeech2Text":
-            try:
-                transcript = bangla_speech_to_text(temp_file_path, bangla_model_size)
-                if transcript:
-                    transcript = clean_bangla_text(transcript)
-                    st.success(f"🇧🇩 Bengali transcription completed with {bangla_model_size} model!")
-            except Exception as e:
-                st.error(f"BanglaSpeech2Text error: {e}")
-                transcript = None
+                # Transcribe based on selected engine
+                if selected_engine == "Multi-engine (race)":
+                    if not race_engine_names:
+                        st.warning("Select at least one engine to race.")
+                        transcript = None
+                    else:
+                        transcript, winner, race_latencies = run_race(audio_for, race_engine_names, race_mode, language_code)
+                        if winner:
+                            transcript_engine = f"{selected_engine} → {winner}"
+
+                elif selected_engine == "BanglaSpeech2Text" and long_form_mode:
+                    # Long-form mode does its own segmentation on the untrimmed recording
+                    transcript = run_long_form(AudioSource(audio_bytes), bangla_model_size)
+
+                else:
+                    transcript = run_engine(selected_engine, audio_for, language_code, stream=stream_deepgram)
+                    if transcript and selected_engine == "BanglaSpeech2Text":
+                        st.success(f"🇧🇩 Bengali transcription completed with {bangla_model_size} model!")
+
+                if prepared is not None:
+                    if transcript:
+                        metrics.record_audio(transcript_engine, prepared.duration, time.perf_counter() - stt_started)
+                    st.caption(prepared.summary())
+                    st.session_state.last_preprocess_report = prepared.report
+
+            if transcript and len(transcript.strip()) > 0:
+                with metrics.span("cache_write"):
+                    transcript_cache.put(audio_hash, selected_engine, cache_model, language_code, transcript)
 
         # Process transcript
         if transcript and len(transcript.strip()) > 0:
-            st.session_state.transcripts.append({
-                "text": transcript,
-                "engine": selected_engine,
-                "language": selected_language,
-                "timestamp": st.session_state.get("transcript_count", len(st.session_state.transcripts))
-            })
+            append_transcript(transcript, transcript_engine, selected_language, race_latencies)
+            if voice_reply:
+                with metrics.span("voice_reply"):
+                    reply = run_voice_reply(language_code)
+                if reply:
+                    append_transcript(reply, GROQ_MODEL, selected_language, role="assistant")
         else:
             st.warning("Could not transcribe audio. Please try speaking again.")
 
-        # Clean up temporary file
-        try:
-            os.remove(temp_file_path)
-        except:
-            pass
+    st.session_state.last_trace = request_trace
+    st.session_state.last_audio_hash = audio_hash
+
+# Long uploaded recordings are transcribed segment by segment
+if long_form_upload is not None:
+    upload_hash = hashlib.md5(long_form_upload.getbuffer()).hexdigest()
+    if upload_hash != st.session_state.get("last_upload_hash"):
+        cache_model = f"{bangla_model_size}-longform"
+        transcript = transcript_cache.get(upload_hash, selected_engine, cache_model, language_code)
+        if not transcript:
+            with st.spinner(f"Transcribing {long_form_upload.name} segment by segment..."):
+                long_form_upload.seek(0)
+                transcript = run_long_form(long_form_upload, bangla_model_size)
+            if transcript:
+                transcript_cache.put(upload_hash, selected_engine, cache_model, language_code, transcript)
+
+        if transcript:
+            append_transcript(transcript, selected_engine, selected_language)
+        else:
+            st.warning(f"Could not transcribe {long_form_upload.name}.")
+        st.session_state.last_upload_hash = upload_hash
+
+# Batch mode: many recordings through the same engine, cache and outputs as batch_transcribe.py
+with st.expander("📚 Batch transcription (multiple files)", expanded=False):
+    batch_uploads = st.file_uploader(
+        "Upload recordings",
+        type=["wav", "mp3", "m4a", "ogg", "flac", "webm"],
+        accept_multiple_files=True,
+        key="batch_uploads",
+        help="Files are split on pauses and transcribed in parallel; files finished before an interruption are skipped when you start again"
+    )
+    if selected_engine == "Multi-engine (race)":
+        st.caption("Choose a single engine above for batch transcription.")
+    elif batch_uploads and st.button(f"▶️ Transcribe {len(batch_uploads)} file(s) with {selected_engine}"):
+        run_batch(batch_uploads, selected_engine, language_code)
 
-        st.session_state.last_audio_hash = audio_hash
+    batch_result = st.session_state.get("batch_result")
+    if batch_result:
+        st.success(f"Batch finished: {batch_result['summary']}")
+        st.dataframe(batch_result["rows"], use_container_width=True)
+        download_jsonl, download_srt = st.columns(2)
+        if os.path.exists(batch_result["output"]):
+            with open(batch_result["output"], "rb") as f:
+                download_jsonl.download_button("⬇️ transcripts.jsonl", f.read(), file_name="transcripts.jsonl", mime="application/json")
+        srt_files = [path for path in batch_result["srt"] if os.path.exists(path)]
+        if srt_files:
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as bundle:
+                for path in srt_files:
+                    bundle.write(path, os.path.basename(path))
+            download_srt.download_button("⬇️ Subtitles (.srt, zip)", archive.getvalue(), file_name="subtitles.zip", mime="application/zip")
+
+# Where the time went: the last recording's stages plus process-wide aggregates
+with st.expander("⏱️ Performance", expanded=False):
+    if not metrics.ENABLED:
+        st.caption("Instrumentation is disabled (METRICS_ENABLED=0).")
+    else:
+        last_trace = st.session_state.get("last_trace")
+        if last_trace is not None:
+            st.write(f"Last recording: {last_trace.total_ms():.0f} ms")
+            st.table([
+                {"stage": "  " * span.depth + span.name, "start ms": round(span.offset_ms, 1), "ms": round(span.ms, 1),
+                 "labels": ", ".join(f"{key}={value}" for key, value in span.labels.items()), "error": span.error or ""}
+                for span in sorted(last_trace.spans, key=lambda span: span.offset_ms)
+            ])
+        snapshot = metrics.snapshot()
+        if snapshot["caches"]:
+            st.write("Cache hit rates: " + " · ".join(
+                f"{name} {values['hit_rate']:.0%} ({values['hit']}/{values['hit'] + values['miss']})"
+                for name, values in snapshot["caches"].items() if values["hit_rate"] is not None
+            ))
+        if snapshot["stages"]:
+            st.write("All requests in this server process (p50/p95 over the most recent 512):")
+            st.table(snapshot["stages"])
+        st.write({**snapshot["counters"], **snapshot["gauges"]})
+        if settings.METRICS_PORT:
+            st.caption(f"Prometheus endpoint: http://<host>:{settings.METRICS_PORT}/metrics")
 
 # Display all transcripts in a chat UI
 st.subheader("📝 Transcription Chat History")
 
-if st.session_state.transcripts:
-    for i, transcript_data in enumerate(st.session_state.transcripts):
-        with st.chat_message("user"):
-            # Handle both old format (string) and new format (dict)
-            if isinstance(transcript_data, dict):
-                text = transcript_data["text"]
-                engine = transcript_data.get("engine", "Unknown")
-                language = transcript_data.get("language", "Unknown")
-                
-                # Display transcript with metadata
-                st.write(text)
-                st.caption(f"🔧 Engine: {engine} | 🌐 Language: {language}")
-                
-                # Special styling for Bengali text
-                if engine == "BanglaSpeech2Text":
-                    st.markdown(f"<div style='background-color: #e8f5e8; padding: 10px; border-radius: 5px; margin: 5px 0;'>"
-                              f"<strong>Bengali:</strong> {text}</div>", 
-                              unsafe_allow_html=True)
-            else:
-                # Legacy format - just display the text
-                st.write(transcript_data)
+def render_entry(entry):
+    with st.chat_message(entry.role):
+        # Display transcript with metadata
+        st.write(entry.text)
+        st.caption(f"🔧 Engine: {entry.engine} | 🌐 Language: {entry.language}")
+        if entry.latencies_ms:
+            st.caption("⏱️ " + " · ".join(f"{name}: {ms} ms" for name, ms in entry.latencies_ms.items()))
+        
+        # Special styling for Bengali text
+        if entry.engine == "BanglaSpeech2Text":
+            st.markdown(f"<div style='background-color: #e8f5e8; padding: 10px; border-radius: 5px; margin: 5px 0;'>"
+                      f"<strong>Bengali:</strong> {entry.text}</div>", 
+                      unsafe_allow_html=True)
+
+history = st.session_state.transcripts
+if len(history):
+    # Only the newest pages are rendered, so reruns stay fast however long the session gets
+    shown = min(len(history), st.session_state.history_pages * settings.TRANSCRIPT_PAGE_SIZE)
+    if shown < len(history):
+        if st.button(f"⬆️ Load {min(settings.TRANSCRIPT_PAGE_SIZE, len(history) - shown)} earlier messages ({len(history) - shown} hidden)"):
+            st.session_state.history_pages += 1
+            st.rerun()
+    for entry in history.recent(shown):
+        render_entry(entry)
 else:
     st.info("🎙️ Start recording to see your transcriptions here!")
 
-# Clear history button
-if st.session_state.transcripts:
+if len(history):
+    with st.expander("🔎 Search and export history", expanded=False):
+        query = st.text_input("Search all transcripts", key="history_query")
+        if query:
+            matches = history.search(query, limit=20)
+            st.caption(f"{len(matches)} most recent match(es)")
+            for entry in matches:
+                st.write(f"**#{entry.seq + 1}** ({entry.role}, {entry.engine}): {entry.text}")
+        # Exports read the whole log, so they are only built on request
+        if st.checkbox("Prepare export", key="history_export"):
+            export_txt, export_jsonl = st.columns(2)
+            export_txt.download_button("⬇️ Export .txt", history.export("txt"), file_name="transcripts.txt", mime="text/plain")
+            export_jsonl.download_button("⬇️ Export .jsonl", history.export("jsonl"), file_name="transcripts.jsonl", mime="application/json")
+
+    # Clear history button
     if st.button("🗑️ Clear History"):
-        st.session_state.transcripts = []
+        history.clear()
+        st.session_state.pop("conversation", None)
+        st.session_state.history_pages = 1
         st.session_state.last_audio_hash = None
         st.rerun()
 
@@ -274,6 +702,12 @@ with st.sidebar:
     st.write("- Multiple model options")
     st.write("- Commercial API")
     
+    st.subheader("Multi-engine (race)")
+    st.write("- Sends each clip to several engines at once")
+    st.write("- first-wins: fastest usable transcript, others cancelled")
+    st.write("- consensus: word-level voting across engines")
+    st.write("- Shows per-engine latency for every request")
+    
     st.subheader("Python SpeechRecognition")
     st.write("- Uses Google's speech API")
     st.write("- Free but limited")
@@ -282,3 +716,31 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("**💡 Tip:** Use BanglaSpeech2Text for the best Bengali transcription results!")
+
+    st.subheader("🚦 Warm-up Status")
+    status_icons = {"ready": "🟢", "warming": "🟡", "pending": "⚪", "failed": "🔴"}
+    components = warm_up_status.snapshot()
+    if not components:
+        st.write("Warm-up disabled")
+    for name, info in components.items():
+        seconds = f" ({info['seconds']:.1f}s)" if info["seconds"] is not None else ""
+        error = f" – {info['error']}" if info["error"] else ""
+        st.write(f"{status_icons.get(info['state'], '⚪')} {name}{seconds}{error}")
+
+    st.subheader("🧠 Loaded Models")
+    model_stats = get_bangla_models().stats()
+    budget = f"{model_stats['budget_mb']:.0f} MB" if model_stats["budget_mb"] else "unlimited"
+    st.write(f"{model_stats['used_mb']:.0f} MB of {budget} budget")
+    for size, info in model_stats["models"].items():
+        approx = "" if info["measured"] else "~"
+        in_use = " · in use" if info["in_use"] else ""
+        st.write(f"• {size}: {approx}{info['mb']:.0f} MB{in_use}")
+    if model_stats["evictions"]:
+        st.caption(f"{model_stats['evictions']} model(s) evicted to stay within the budget")
+    if bangla_model_size == AUTO:
+        router_stats = get_bangla_engine().router.stats()
+        measured = [f"{size} {rtf:.2f}×" for size, rtf in router_stats["rtf"].items() if router_stats["observations"][size]]
+        if measured:
+            st.caption(f"Measured real-time factor: {', '.join(measured)}")
+        if router_stats["prefetching"]:
+            st.caption(f"Loading {router_stats['prefetching']} in the background")
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+import pytest
+
+import settings
+
+@pytest.fixture
+def deepgram_mock(monkeypatch):
+    """Start mock_deepgram_server on a free port and point DEEPGRAM_URL at it: start(every, delay, metadata)"""
+    websockets = pytest.importorskip("websockets")
+    from mock_deepgram_server import DEFAULT_RESPONSES, build_handler
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="mock-deepgram", daemon=True)
+    thread.start()
+    servers = []
+
+    def start(every: int = 1, delay: float = 0.0, metadata: bool = True, responses=DEFAULT_RESPONSES) -> str:
+        async def listen():
+            return await websockets.serve(build_handler(list(responses), every, delay, metadata), "127.0.0.1", 0)
+
+        server = asyncio.run_coroutine_threadsafe(listen(), loop).result(5)
+        servers.append(server)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        monkeypatch.setattr(settings, "DEEPGRAM_URL", url)
+        return url
+
+    yield start
+
+    async def shutdown():
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("httpx")  # Starlette's TestClient
+
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import api_server
+import settings
+
+async def echo(request):
+    data, params = await api_server.read_request(request)
+    return JSONResponse({"bytes": len(data), "params": params})
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route("/echo", echo, methods=["POST"])],
+                    exception_handlers={HTTPException: api_server.http_error})
+    with TestClient(app) as client:
+        yield client
+
+def test_multipart_upload_with_form_fields(client):
+    response = client.post("/echo?engine=google", files={"file": ("clip.wav", b"RIFF" + b"\0" * 96, "audio/wav")},
+                           data={"language": "bn-BD"})
+    assert response.status_code == 200
+    assert response.json() == {"bytes": 100, "params": {"engine": "google", "language": "bn-BD"}}
+
+def test_multipart_without_file_field(client):
+    response = client.post("/echo", files={"other": ("clip.wav", b"abc", "audio/wav")})
+    assert response.status_code == 400
+
+def test_raw_body_upload(client):
+    response = client.post("/echo?engine=bangla", content=b"\0" * 10)
+    assert response.json() == {"bytes": 10, "params": {"engine": "bangla"}}
+
+def test_oversized_upload_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(settings, "API_MAX_UPLOAD_MB", 0)
+    response = client.post("/echo", files={"file": ("clip.wav", b"\0" * 10, "audio/wav")})
+    assert response.status_code == 413
+
+@pytest.fixture
+def api_client(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", False)
+    monkeypatch.setattr(settings, "BANGLA_WORKERS", 0)
+    monkeypatch.setattr(settings, "TRANSCRIPT_CACHE_PATH", str(tmp_path / "transcripts.sqlite3"))
+    monkeypatch.setattr(settings, "TTS_CACHE_DIR", str(tmp_path / "tts"))
+    with TestClient(api_server.app) as client:
+        yield client
+
+def test_stream_forwards_slow_deepgram_results(api_client, deepgram_mock):
+    pytest.importorskip("deepgram")
+    # Every result comes after the end of the audio, each more than a second apart
+    deepgram_mock(every=1000, delay=1.2)
+    with api_client.websocket_connect("/stream") as websocket:
+        websocket.send_json({"engine": "deepgram", "language": "en-US"})
+        for _ in range(3):
+            websocket.send_bytes(b"\0" * 3200)
+        websocket.send_json({"type": "end"})
+        messages = []
+        while not messages or not messages[-1]["done"]:
+            messages.append(websocket.receive_json())
+    assert [message["type"] for message in messages] == ["partial", "final", "partial", "final", "final"]
+    assert messages[-1]["text"] == "hello world this is a streaming test"
@@ -0,0 +1,58 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from audio_preprocess import decode
+
+av = pytest.importorskip("av")
+
+RATE = 16000
+
+def sine(seconds=1.0, amplitude=0.5):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return amplitude * np.sin(2 * np.pi * 440 * t)
+
+def encode_flac(channels, sample_format):
+    """Packed (interleaved) integer FLAC, the way PyAV's decoder hands it back"""
+    layout = "stereo" if len(channels) == 2 else "mono"
+    scale, dtype = {"s16": (32767, "<i2"), "s32": (2 ** 31 - 1, "<i4")}[sample_format]
+    pcm = (np.stack(channels, axis=1).reshape(1, -1) * scale).astype(dtype)
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="flac") as container:
+        stream = container.add_stream("flac", rate=RATE, layout=layout)
+        stream.codec_context.format = sample_format
+        frame = av.AudioFrame.from_ndarray(pcm, format=sample_format, layout=layout)
+        frame.sample_rate = RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+def test_stereo_flac_keeps_both_channels():
+    audio, rate, channels = decode(encode_flac([sine(amplitude=0.5), sine(amplitude=0.25)], "s16"))
+    assert (rate, channels) == (RATE, 2)
+    assert audio.shape == (RATE, 2)  # one second, not two seconds of interleaved "mono"
+    assert np.abs(audio).max(axis=0) == pytest.approx([0.5, 0.25], abs=1e-3)
+
+def test_s32_flac_is_scaled_to_unit_range():
+    audio, rate, channels = decode(encode_flac([sine(amplitude=0.5)], "s32"))
+    assert channels == 1
+    assert audio.dtype == np.float32
+    assert audio.shape == (RATE,)
+    assert np.abs(audio).max() == pytest.approx(0.5, abs=1e-3)
+
+def test_stereo_wav_keeps_both_channels():
+    pcm = (np.stack([sine(amplitude=0.5), sine(amplitude=0.25)], axis=1) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(pcm.tobytes())
+    audio, rate, channels = decode(buffer.getvalue())
+    assert (rate, channels) == (RATE, 2)
+    assert audio.shape == (RATE, 2)
+    assert np.abs(audio).max(axis=0) == pytest.approx([0.5, 0.25], abs=1e-3)
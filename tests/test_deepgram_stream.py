@@ -0,0 +1,65 @@
+import io
+import time
+import wave
+
+import pytest
+
+pytest.importorskip("deepgram")
+
+from audio_source import AudioSource
+from clients import create_deepgram_client
+from deepgram_stream import DeepgramStream, StreamUpdate, iter_chunks, stream_transcribe
+
+FULL_TEXT = "hello world this is a streaming test"
+
+def silence(seconds: float) -> AudioSource:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\0\0" * int(16000 * seconds))
+    return AudioSource(buffer.getvalue())
+
+def run_stream(chunks: int = 4, **finish_options):
+    """Send `chunks` chunks, then finish(); returns (updates, final text, seconds spent in finish)"""
+    updates = []
+    stream = DeepgramStream(create_deepgram_client(), on_update=updates.append)
+    stream.start()
+    for chunk in list(iter_chunks(silence(1.0)))[:chunks]:
+        assert stream.send(chunk)
+    started = time.monotonic()
+    text = stream.finish(**finish_options)
+    return updates, text, time.monotonic() - started
+
+def test_partial_and_final_results_arrive_in_order(deepgram_mock):
+    deepgram_mock(every=1)
+    updates = list(stream_transcribe(create_deepgram_client(), silence(1.0), chunk_ms=100))
+    assert updates == [
+        StreamUpdate("hello", False),
+        StreamUpdate("hello world", True),
+        StreamUpdate("hello world this is", False),
+        StreamUpdate(FULL_TEXT, True),
+        StreamUpdate(FULL_TEXT, True, done=True),
+    ]
+
+def test_finish_waits_for_metadata_after_slow_results(deepgram_mock):
+    # Every result arrives after CloseStream, each 0.4 s apart, so an idle cutoff below that would drop them
+    deepgram_mock(every=1000, delay=0.4)
+    updates, text, waited = run_stream(timeout=10.0, idle=3.0)
+    assert text == FULL_TEXT
+    assert [update.is_final for update in updates] == [False, True, False, True]
+    # The Metadata message ends the wait, not the 3 s idle fallback
+    assert waited < 1.6 + 2.0
+
+def test_idle_fallback_without_metadata(deepgram_mock):
+    deepgram_mock(every=1000, delay=0.1, metadata=False)
+    updates, text, waited = run_stream(timeout=10.0, idle=0.5)
+    assert text == FULL_TEXT
+    assert waited < 0.4 + 0.5 + 2.0
+
+def test_timeout_bounds_the_wait(deepgram_mock):
+    deepgram_mock(every=1000, delay=1.0)
+    updates, text, waited = run_stream(timeout=1.5, idle=5.0)
+    assert waited < 1.5 + 2.0
+    assert len(updates) < 4
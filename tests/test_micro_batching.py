@@ -0,0 +1,81 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from micro_batching import MicroBatcher, batched_recognize
+
+class RecordingBatchFn:
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, items):
+        with self.lock:
+            self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+def test_full_batch_is_dispatched_without_waiting():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=10000)
+    try:
+        started = time.monotonic()
+        futures = [batcher.submit(i) for i in range(4)]
+        assert [future.result(timeout=2.0) for future in futures] == [0, 10, 20, 30]
+        assert time.monotonic() - started < 2.0
+        assert batch_fn.batches == [[0, 1, 2, 3]]
+    finally:
+        batcher.close()
+
+def test_partial_batch_is_dispatched_after_max_wait():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch_size=16, max_wait_ms=50)
+    try:
+        started = time.monotonic()
+        futures = [batcher.submit(i) for i in range(2)]
+        assert [future.result(timeout=2.0) for future in futures] == [0, 10]
+        assert time.monotonic() - started >= 0.045
+        assert batch_fn.batches == [[0, 1]]
+        assert batcher.metrics()["batch_size_counts"] == {2: 1}
+    finally:
+        batcher.close()
+
+def test_overflow_goes_to_the_next_batch():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(i) for i in range(5)]
+        assert [future.result(timeout=2.0) for future in futures] == [0, 10, 20, 30, 40]
+        assert [len(batch) for batch in batch_fn.batches] == [3, 2]
+    finally:
+        batcher.close()
+
+def test_batch_failure_reaches_every_caller():
+    def fail(items):
+        raise ValueError("decode failed")
+
+    batcher = MicroBatcher(fail, max_batch_size=2, max_wait_ms=10)
+    try:
+        futures = [batcher.submit(i) for i in range(2)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=2.0)
+    finally:
+        batcher.close()
+
+def test_closed_batcher_rejects_new_items():
+    batcher = MicroBatcher(RecordingBatchFn(), max_batch_size=2, max_wait_ms=10)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+def test_lone_clip_uses_the_regular_decode():
+    class FakeModel:
+        class feature_extractor:
+            n_samples = 480000
+
+        def __call__(self, clip):
+            return " regular decode "
+
+    assert batched_recognize(FakeModel(), [np.zeros(16000, dtype=np.float32)]) == ["regular decode"]
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+import model_manager
+from model_manager import ModelBudgetExceeded, ModelManager, ModelUnavailable
+
+MB = 1024 * 1024
+SIZES_MB = {"tiny": 100, "base": 150, "small": 100, "large": 400}
+
+@pytest.fixture(autouse=True)
+def no_rss(monkeypatch):
+    # Fake models allocate nothing; size them by their estimate only
+    monkeypatch.setattr(model_manager, "current_rss_bytes", lambda: None)
+
+def make_manager(budget_mb=250, wait_timeout=1.0):
+    loads = []
+
+    def load(key):
+        loads.append(key)
+        return f"model-{key}"
+
+    manager = ModelManager(load, budget_bytes=budget_mb * MB, estimate_bytes=lambda key: SIZES_MB[key] * MB,
+                           wait_timeout=wait_timeout)
+    return manager, loads
+
+def test_loads_once_and_reuses():
+    manager, loads = make_manager()
+    assert manager.get("tiny") == "model-tiny"
+    with manager.lease("tiny") as model:
+        assert model == "model-tiny"
+    assert loads == ["tiny"]
+
+def test_evicts_least_recently_used_idle_model():
+    manager, _ = make_manager()
+    manager.get("tiny")
+    manager.get("base")
+    manager.get("small")  # 100 MB more than the budget allows: tiny goes, it was used longest ago
+    assert sorted(manager.loaded()) == ["base", "small"]
+    assert manager.stats()["evictions"] == 1
+
+def test_leased_model_is_not_evicted():
+    manager, _ = make_manager()
+    with manager.lease("tiny"):
+        manager.get("base")
+        manager.get("small")  # tiny is older but in use, so base makes room
+        assert sorted(manager.loaded()) == ["small", "tiny"]
+
+def test_load_waits_for_lease_to_end():
+    manager, _ = make_manager(budget_mb=150, wait_timeout=5.0)
+    model = manager.acquire("base")
+    loaded = threading.Event()
+
+    def load_tiny():
+        manager.get("tiny")
+        loaded.set()
+
+    thread = threading.Thread(target=load_tiny)
+    thread.start()
+    time.sleep(0.1)
+    assert not loaded.is_set()
+    assert model == "model-base"
+    manager.release("base")
+    thread.join(2.0)
+    assert loaded.is_set()
+    assert manager.loaded() == ["tiny"]
+
+def test_model_larger_than_budget_fails_fast():
+    manager, loads = make_manager()
+    with pytest.raises(ModelBudgetExceeded):
+        manager.get("large")
+    assert loads == []
+
+def test_budget_exceeded_while_every_model_is_in_use():
+    manager, _ = make_manager(wait_timeout=0.1)
+    with manager.lease("tiny"), manager.lease("base"):
+        with pytest.raises(ModelBudgetExceeded):
+            manager.get("small")
+    # Nothing stays reserved for the failed load
+    manager.get("small")
+    assert "small" in manager.loaded()
+
+def test_failed_load_raises_model_unavailable():
+    manager = ModelManager(lambda key: None)
+    with pytest.raises(ModelUnavailable):
+        manager.get("base")
+    assert manager.loaded() == []
+    assert manager.stats()["load_failures"] == 1
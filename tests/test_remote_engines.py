@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import wait
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from benchmarks.stubs import SpeechStub
+from remote_engines import RemoteEngineError
+
+AUDIO = b"RIFF" + b"\0" * 3196
+
+@pytest.fixture
+def stub_engines():
+    """start(concurrency, hedge_after, **stub options) -> (stub, RemoteEngines)"""
+    opened = []
+
+    def start(concurrency: int = 8, hedge_after: float = 0.0, **options):
+        options.setdefault("latency_ms", 20.0)
+        options.setdefault("jitter_ms", 0.0)
+        stub = SpeechStub(transcript="hello", **options).__enter__()
+        remote = stub.remote_engines(concurrency=concurrency, hedge_after=hedge_after)
+        opened.append((stub, remote))
+        return stub, remote
+
+    yield start
+    for stub, remote in opened:
+        remote.close()
+        stub.__exit__(None, None, None)
+
+def test_transcribes_through_the_mock(stub_engines):
+    stub, remote = stub_engines()
+    assert remote.deepgram_sync(AUDIO) == "hello"
+
+def test_server_errors_are_retried(stub_engines):
+    stub, remote = stub_engines(fail_first=2, error_codes=[503])
+    assert remote.deepgram_sync(AUDIO) == "hello"
+    assert stub.stats()["requests"] == 3
+    assert remote.stats()["deepgram"]["retries"] == 2
+
+def test_client_errors_are_not_retried(stub_engines):
+    stub, remote = stub_engines(fail_first=1, error_codes=[400])
+    with pytest.raises(RemoteEngineError) as error:
+        remote.deepgram_sync(AUDIO)
+    assert error.value.status == 400
+    assert stub.stats()["requests"] == 1
+
+def test_slow_first_response_is_hedged(stub_engines):
+    stub, remote = stub_engines(hedge_after=0.2, slow_first=1, slow_ms=5000)
+    started = time.monotonic()
+    assert remote.deepgram_sync(AUDIO) == "hello"
+    assert time.monotonic() - started < 2.0  # the duplicate answered, not the 5 s original
+    stats = remote.stats()["deepgram"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+def test_concurrency_is_capped_per_engine(stub_engines):
+    stub, remote = stub_engines(concurrency=2, latency_ms=150.0)
+    futures = [remote.submit(remote.deepgram(AUDIO)) for _ in range(6)]
+    done, _ = wait(futures, timeout=10)
+    assert [future.result() for future in done] == ["hello"] * 6
+    assert stub.stats()["peak_in_flight"] == 2
+
+def test_connections_are_reused(stub_engines):
+    stub, remote = stub_engines()
+    for _ in range(5):
+        assert remote.deepgram_sync(AUDIO) == "hello"
+    assert stub.stats()["connections"] == 1
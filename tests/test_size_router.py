@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+import model_manager
+from bangla_model import estimate_model_bytes
+from model_manager import ModelManager
+from size_router import SizeRouter
+
+@pytest.fixture(autouse=True)
+def no_rss(monkeypatch):
+    monkeypatch.setattr(model_manager, "current_rss_bytes", lambda: None)
+
+def test_idle_server_picks_largest_size_within_slo():
+    router = SizeRouter(slo_ms=3000)  # no model manager: every size counts as loaded
+    assert router.choose(1.0).size == "large"  # 1.6 s
+    assert router.choose(3.0).size == "medium"  # 2.4 s
+    assert router.choose(10.0).size == "small"  # 3.0 s
+
+def test_queue_depth_moves_to_smaller_sizes():
+    router = SizeRouter(slo_ms=3000)
+    decision = router.choose(1.0, queue_depth=3)
+    assert decision.size == "small"
+    assert decision.queue_depth == 3
+
+def test_in_flight_requests_count_as_queue_depth():
+    router = SizeRouter(slo_ms=3000)
+    with router.track(), router.track(), router.track():
+        assert router.choose(1.0).size == "small"
+    assert router.stats()["in_flight"] == 0
+    assert router.choose(1.0).size == "large"
+
+def test_more_workers_absorb_the_queue():
+    router = SizeRouter(slo_ms=3000, parallelism=4)
+    assert router.choose(1.0, queue_depth=3).size == "large"  # 1.6 s + 3/4 of it waiting
+    assert router.choose(1.0, queue_depth=4).size == "medium"
+
+def test_unreachable_slo_falls_back_to_fastest_size():
+    router = SizeRouter(slo_ms=3000)
+    decision = router.choose(100.0, queue_depth=10)
+    assert decision.size == "tiny"
+    assert decision.reason.startswith("SLO out of reach")
+
+def test_measured_rtf_replaces_prior():
+    router = SizeRouter(slo_ms=3000)
+    assert router.choose(4.0).size == "small"
+    router.observe("large", 10.0, 5.0)
+    assert router.rtf("large") == pytest.approx(0.5)
+    assert router.choose(4.0).size == "large"
+
+def test_unloaded_sizes_pay_their_load_time():
+    models = ModelManager(lambda key: object())
+    models.get("base")
+    router = SizeRouter(slo_ms=3000, models=models, prefetch=False)
+    assert router.choose(1.0).size == "base"
+
+def test_idle_server_prefetches_biggest_size_that_fits():
+    models = ModelManager(lambda key: object(), budget_bytes=3072 * 1024 * 1024, estimate_bytes=estimate_model_bytes)
+    models.get("base")
+    router = SizeRouter(slo_ms=3000, models=models)
+    assert router.choose(1.5).size == "base"
+    deadline = time.monotonic() + 2.0
+    while "medium" not in models.loaded() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # large would fit the SLO but not the budget next to base
+    assert sorted(models.loaded()) == ["base", "medium"]
+    assert router.choose(1.5).size == "medium"
+
+def test_busy_server_does_not_prefetch():
+    models = ModelManager(lambda key: object())
+    models.get("base")
+    router = SizeRouter(slo_ms=3000, models=models)
+    assert router.choose(1.0, queue_depth=2).escalate_to is None
+    time.sleep(0.05)
+    assert models.loaded() == ["base"]
@@ -0,0 +1,76 @@
+import itertools
+import types
+
+import pytest
+
+import transcript_cache
+from transcript_cache import TranscriptCache
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    # Strictly increasing timestamps, so least-recently-used order never ties
+    ticks = itertools.count(1)
+    monkeypatch.setattr(transcript_cache, "time", types.SimpleNamespace(time=lambda: float(next(ticks))))
+
+def make_cache(tmp_path, **limits):
+    return TranscriptCache(str(tmp_path / "transcripts.sqlite3"), **limits)
+
+def test_round_trip_keyed_on_configuration(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("abc", "Deepgram", "nova-3", "en-US", "hello")
+    assert cache.get("abc", "Deepgram", "nova-3", "en-US") == "hello"
+    assert cache.get("abc", "Deepgram", "nova-2", "en-US") is None
+    assert cache.get("", "Deepgram", "nova-3", "en-US") is None
+
+def test_misses_do_not_write(tmp_path):
+    cache = make_cache(tmp_path)
+    conn = cache._connection()
+    before = conn.total_changes
+    for i in range(10):
+        assert cache.get(f"clip-{i}", "Deepgram", "nova-3", "en-US") is None
+    assert conn.total_changes == before
+    assert cache.misses == 10
+
+def test_counters_reach_the_shared_totals(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_cache, "STATS_FLUSH_EVERY", 3)
+    cache = make_cache(tmp_path)
+    other = make_cache(tmp_path)  # another process sharing the same file
+    cache.put("abc", "Deepgram", "nova-3", "en-US", "hello")
+    cache.get("abc", "Deepgram", "nova-3", "en-US")
+    cache.get("missing", "Deepgram", "nova-3", "en-US")
+    assert other.stats()["hits"] == 0
+    cache.get("missing", "Deepgram", "nova-3", "en-US")  # third lookup flushes
+    stats = other.stats()
+    assert (stats["hits"], stats["misses"], stats["process_hits"]) == (1, 2, 0)
+
+    cache.get("abc", "Deepgram", "nova-3", "en-US")
+    stats = cache.stats()  # stats() flushes whatever is pending
+    assert (stats["hits"], stats["misses"], stats["process_hits"], stats["process_misses"]) == (2, 2, 2, 2)
+    assert stats["hit_rate"] == 0.5
+
+def fill(cache, count, text="x" * 100):
+    for i in range(count):
+        cache.put(f"clip-{i}", "Deepgram", "nova-3", "en-US", text)
+
+def test_zero_limits_mean_unbounded(tmp_path):
+    cache = make_cache(tmp_path, max_entries=0, max_bytes=0)
+    fill(cache, 50)
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (50, 0)
+
+def test_evicts_least_recently_used_under_the_entry_limit(tmp_path):
+    cache = make_cache(tmp_path, max_entries=10)
+    fill(cache, 10)
+    cache.get("clip-0", "Deepgram", "nova-3", "en-US")  # now the most recently used
+    cache.put("clip-10", "Deepgram", "nova-3", "en-US", "new")
+    assert cache.stats()["entries"] == 9  # 10% headroom below the limit
+    assert cache.get("clip-0", "Deepgram", "nova-3", "en-US") is not None
+    assert cache.get("clip-1", "Deepgram", "nova-3", "en-US") is None
+
+def test_evicts_until_under_the_byte_budget(tmp_path):
+    cache = make_cache(tmp_path, max_entries=0, max_bytes=1000)
+    fill(cache, 9)
+    cache.put("big", "Deepgram", "nova-3", "en-US", "y" * 600)
+    stats = cache.stats()
+    assert stats["bytes"] <= 900
+    assert cache.get("big", "Deepgram", "nova-3", "en-US") is not None
@@ -0,0 +1,73 @@
+import re
+import time
+
+from voice_reply import VoiceReplyPipeline, split_sentences
+
+SENTENCES = [
+    "The first sentence is the longest one. ",
+    "Then a second sentence follows it. ",
+    "And a third one closes the reply.",
+]
+REPLY = "".join(SENTENCES)
+
+def tokens(text=REPLY):
+    """Word by word, like a chat model's stream"""
+    yield from re.findall(r"\S+\s*", text)
+
+def run(pipeline):
+    return [event for event in pipeline.events(poll=5.0) if event is not None]
+
+def test_split_sentences_waits_for_sentence_ends():
+    assert list(split_sentences(tokens())) == [sentence.strip() for sentence in SENTENCES]
+
+def test_audio_is_released_in_sentence_order():
+    # The first sentence takes longest to synthesize, so the others finish before it
+    delays = {SENTENCES[0].strip(): 0.3, SENTENCES[1].strip(): 0.1, SENTENCES[2].strip(): 0.0}
+
+    def tts(text):
+        time.sleep(delays[text])
+        return text.encode("utf-8")
+
+    events = run(VoiceReplyPipeline(tokens(), tts, tts_workers=3))
+    audio = [event for event in events if event.kind == "audio"]
+    assert [event.index for event in audio] == [0, 1, 2]
+    assert [event.audio.decode("utf-8") for event in audio] == [sentence.strip() for sentence in SENTENCES]
+
+def test_done_carries_the_full_reply():
+    events = run(VoiceReplyPipeline(tokens(), lambda text: b"mp3"))
+    assert events[-1].kind == "done"
+    assert events[-1].text == REPLY
+    assert "".join(event.text for event in events if event.kind == "token") == REPLY
+
+def test_tts_failure_is_reported_and_later_sentences_still_play():
+    def tts(text):
+        if text.startswith("Then"):
+            raise RuntimeError("quota exceeded")
+        return b"mp3"
+
+    pipeline = VoiceReplyPipeline(tokens(), tts)
+    events = run(pipeline)
+    errors = [event for event in events if event.kind == "error"]
+    assert len(errors) == 1
+    assert "sentence 2" in errors[0].text and "quota exceeded" in errors[0].text
+    assert [event.index for event in events if event.kind == "audio"] == [0, 2]
+    assert events[-1].kind == "done"
+
+def test_every_tts_call_failing_leaves_no_first_audio():
+    def tts(text):
+        raise RuntimeError("offline")
+
+    pipeline = VoiceReplyPipeline(tokens(), tts)
+    events = run(pipeline)
+    assert [event.kind for event in events if event.kind != "token"] == ["error"] * 3 + ["done"]
+    assert pipeline.first_audio_at is None
+
+def test_llm_failure_ends_with_error_and_partial_reply():
+    def failing_tokens():
+        yield "Half a reply "
+        raise RuntimeError("connection reset")
+
+    events = run(VoiceReplyPipeline(failing_tokens(), lambda text: b"mp3"))
+    assert [event.kind for event in events][-2:] == ["error", "done"]
+    assert "connection reset" in events[-2].text
+    assert events[-1].text == "Half a reply "
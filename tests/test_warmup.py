@@ -0,0 +1,33 @@
+import bangla_model
+import clients
+import settings
+import warmup
+
+def fake_model(size):
+    return lambda audio: f"{size}: {len(audio)} samples"
+
+def test_warm_up_records_ready_and_failed_components():
+    readiness = warmup.Readiness()
+
+    def broken():
+        raise RuntimeError("bad key")
+
+    warmup.warm_up(readiness, fake_model, ["base"], {"ok": object, "missing": lambda: None, "broken": broken})
+    snapshot = readiness.snapshot()
+    assert readiness.ready
+    assert snapshot["bangla:base"]["state"] == "ready"
+    assert snapshot["client:ok"]["state"] == "ready"
+    assert snapshot["client:missing"] == {"state": "failed", "seconds": snapshot["client:missing"]["seconds"],
+                                          "error": "not configured"}
+    assert snapshot["client:broken"]["error"] == "bad key"
+
+def test_main_exit_code_gates_traffic(monkeypatch, capsys):
+    monkeypatch.setattr(bangla_model, "create_bangla_model", fake_model)
+    monkeypatch.setattr(clients, "create_deepgram_client", lambda: object())
+    monkeypatch.setattr(settings, "BANGLA_PRELOAD_SIZES", ["base"])
+    monkeypatch.setattr(settings, "WARMUP_CLIENTS", ["deepgram"])
+    assert warmup.main() == 0
+
+    monkeypatch.setattr(clients, "create_deepgram_client", lambda: None)
+    assert warmup.main() == 1
+    assert "not configured" in capsys.readouterr().out
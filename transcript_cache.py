@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import metrics
+
+# Lookups counted in memory before the shared hit/miss totals are written back
+STATS_FLUSH_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    audio_hash TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    model TEXT NOT NULL,
+    language TEXT NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (audio_hash, engine, model, language)
+);
+CREATE INDEX IF NOT EXISTS transcripts_last_access ON transcripts (last_access);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_stats (name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+class TranscriptCache:
+    """Content-addressed transcript cache on SQLite, shared across sessions and processes.
+
+    Entries are keyed on (audio hash, engine, model, language) and evicted in
+    least-recently-used order once either the entry or the byte budget is exceeded.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # Counters for this process; the shared totals live in the cache_stats table and are
+        # updated in batches, so a lookup never needs a write transaction of its own
+        self.hits = 0
+        self.misses = 0
+        self._unflushed = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared between threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute("UPDATE cache_stats SET value = value + ? WHERE name = ?", (amount, name))
+
+    def _count(self, name: str) -> bool:
+        """Count a hit or miss; True once enough lookups are pending to be worth a flush"""
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+            self._unflushed[name] += 1
+            return sum(self._unflushed.values()) >= STATS_FLUSH_EVERY
+
+    def _flush_stats(self, conn: sqlite3.Connection):
+        """Add the hits and misses counted since the last flush to the shared totals"""
+        with self._stats_lock:
+            pending, self._unflushed = self._unflushed, {"hits": 0, "misses": 0}
+        pending = {name: amount for name, amount in pending.items() if amount}
+        if not pending:
+            return
+        with conn:
+            for name, amount in pending.items():
+                self._bump(conn, name, amount)
+
+    def get(self, audio_hash: str, engine: str, model: str, language: str) -> Optional[str]:
+        """Return the cached transcript for this clip and configuration, if any"""
+        if not audio_hash:
+            return None
+        key = (audio_hash, engine, model or "", language or "")
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT text FROM transcripts WHERE audio_hash = ? AND engine = ? AND model = ? AND language = ?",
+            key,
+        ).fetchone()
+
+        metrics.cache_result("transcript", hit=row is not None)
+        flush = self._count("misses" if row is None else "hits")
+        if row is not None:
+            with conn:
+                conn.execute(
+                    "UPDATE transcripts SET last_access = ? WHERE audio_hash = ? AND engine = ? AND model = ? AND language = ?",
+                    (time.time(), *key),
+                )
+        if flush:
+            self._flush_stats(conn)
+        return row[0] if row is not None else None
+
+    def put(self, audio_hash: str, engine: str, model: str, language: str, text: str):
+        """Store a transcript and evict old entries if the cache is over budget"""
+        if not audio_hash or not text:
+            return
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts "
+                "(audio_hash, engine, model, language, text, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (audio_hash, engine, model or "", language or "", text, len(text.encode("utf-8")), now, now),
+            )
+        self._flush_stats(conn)
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        # A limit of 0 (or less) means unbounded
+        max_entries = self.max_entries if self.max_entries > 0 else None
+        max_bytes = self.max_bytes if self.max_bytes > 0 else None
+        if max_entries is None and max_bytes is None:
+            return
+        entries, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+        if (max_entries is None or entries <= max_entries) and (max_bytes is None or total_bytes <= max_bytes):
+            return
+
+        # Drop least recently used rows until both limits hold with 10% headroom,
+        # so a full cache doesn't evict again on every put
+        target_entries = entries if max_entries is None else min(entries, max_entries * 9 // 10)
+        target_bytes = total_bytes if max_bytes is None else min(total_bytes, max_bytes * 9 // 10)
+        doomed = []
+        oldest = conn.execute("SELECT rowid, size FROM transcripts ORDER BY last_access ASC")
+        for rowid, size in oldest:
+            if entries <= target_entries and total_bytes <= target_bytes:
+                break
+            doomed.append((rowid,))
+            entries -= 1
+            total_bytes -= size
+        oldest.close()
+        with conn:
+            removed = conn.executemany("DELETE FROM transcripts WHERE rowid = ?", doomed).rowcount
+            self._bump(conn, "evictions", removed)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process and for the shared cache file"""
+        conn = self._connection()
+        self._flush_stats(conn)
+        shared = dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+        entries, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+        lookups = shared.get("hits", 0) + shared.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "hits": shared.get("hits", 0),
+            "misses": shared.get("misses", 0),
+            "evictions": shared.get("evictions", 0),
+            "hit_rate": shared.get("hits", 0) / lookups if lookups else 0.0,
+            "process_hits": self.hits,
+            "process_misses": self.misses,
+        }
+
+    def clear(self):
+        """Remove every cached transcript"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM transcripts")
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional
+
+import metrics
+
+@dataclass(slots=True)
+class TranscriptEntry:
+    text: str
+    engine: str
+    language: str
+    role: str = "user"   # "user" for transcripts, "assistant" for AI replies
+    created: float = field(default_factory=time.time)
+    latencies_ms: Optional[Dict[str, int]] = None
+    seq: int = 0
+
+    def to_json(self) -> str:
+        record = asdict(self)
+        if record["latencies_ms"] is None:
+            del record["latencies_ms"]
+        return json.dumps(record, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line: str) -> "TranscriptEntry":
+        record = json.loads(line)
+        return cls(**{name: record[name] for name in cls.__dataclass_fields__ if name in record})
+
+class TranscriptStore:
+    """Append-only JSONL transcript history for one chat session.
+
+    Every entry is written to disk as it is added, and only the newest
+    `keep_recent` entries stay in memory; older pages, search and export
+    stream the file instead of holding the whole history.
+    """
+
+    def __init__(self, path: str, keep_recent: int = 200):
+        self.path = path
+        self._lock = threading.Lock()
+        self._recent: Deque[TranscriptEntry] = deque(maxlen=keep_recent)
+        self._count = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        for entry in self.iter_all():
+            self._recent.append(entry)
+            self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, entry: TranscriptEntry) -> TranscriptEntry:
+        with self._lock, metrics.span("history_write"):
+            entry.seq = self._count
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(entry.to_json() + "\n")
+            self._recent.append(entry)
+            self._count += 1
+        return entry
+
+    def recent(self, limit: int) -> List[TranscriptEntry]:
+        """The newest `limit` entries, oldest first"""
+        with self._lock:
+            if limit <= len(self._recent) or self._count <= len(self._recent):
+                return list(self._recent)[-limit:] if limit > 0 else []
+        window = deque(self.iter_all(), maxlen=limit)
+        return list(window)
+
+    def iter_all(self) -> Iterator[TranscriptEntry]:
+        """Stream every stored entry from disk, oldest first"""
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield TranscriptEntry.from_json(line)
+                except (ValueError, TypeError):
+                    continue  # a torn last line after a crash
+
+    def search(self, query: str, limit: int = 50) -> List[TranscriptEntry]:
+        """Case-insensitive substring search over the full history, newest matches first"""
+        needle = query.casefold().strip()
+        if not needle:
+            return []
+        matches = deque(maxlen=limit)
+        for entry in self.iter_all():
+            if needle in entry.text.casefold():
+                matches.append(entry)
+        return list(reversed(matches))
+
+    def export(self, fmt: str = "txt") -> str:
+        """Whole history as plain text (one "[time] role (engine): text" line per entry) or JSONL"""
+        if fmt == "jsonl":
+            return "".join(entry.to_json() + "\n" for entry in self.iter_all())
+        lines = []
+        for entry in self.iter_all():
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.created))
+            lines.append(f"[{stamp}] {entry.role} ({entry.engine}, {entry.language}): {entry.text}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def clear(self):
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._recent.clear()
+            self._count = 0
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, Optional
+
+import metrics
+
+class TTSCache:
+    """Content-addressed MP3 cache for synthesized speech, bounded by total size.
+
+    Clips are keyed on (text, lang, tld) and stored as <sha256>.mp3 in one
+    directory. Writes go through a temp file in the same directory and are
+    renamed into place, so readers never see partial files and no temp files
+    are left behind. When the directory grows past max_bytes the least
+    recently used clips are deleted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 128 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._sweep_temp_files()
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    @staticmethod
+    def key(text: str, lang: str = "en", tld: str = "com") -> str:
+        return hashlib.sha256(f"{lang}\x00{tld}\x00{text}".encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, text: str, lang: str = "en", tld: str = "com") -> Optional[str]:
+        """Path of the cached clip, or None"""
+        path = self.path(self.key(text, lang, tld))
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        return path
+
+    def put(self, text: str, lang: str, tld: str, audio: bytes) -> str:
+        key = self.key(text, lang, tld)
+        path = self.path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._size += len(audio) - previous
+        self._evict(keep=path)
+        return path
+
+    def synthesize(
+        self,
+        text: str,
+        lang: str = "en",
+        tld: str = "com",
+        synthesize: Optional[Callable[[str, str, str], bytes]] = None,
+    ) -> str:
+        """Return the cached clip's path, synthesizing it once on a miss.
+
+        Concurrent requests for the same clip wait for the first synthesis
+        instead of calling the TTS service again.
+        """
+        key = self.key(text, lang, tld)
+        while True:
+            path = self.get(text, lang, tld)
+            if path:
+                self._bump("hits")
+                metrics.cache_result("tts", hit=True)
+                return path
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self._inflight[key] = threading.Event()
+                    break
+            pending.wait()
+
+        self._bump("misses")
+        metrics.cache_result("tts", hit=False)
+        try:
+            if synthesize is None:
+                from voice_reply import synthesize_speech as synthesize
+            with metrics.span("tts_synthesize", lang=lang):
+                audio = synthesize(text, lang, tld)
+            with metrics.span("tts_write"):
+                return self.put(text, lang, tld, audio)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def read(self, text: str, lang: str = "en", tld: str = "com", synthesize=None) -> bytes:
+        with open(self.synthesize(text, lang, tld, synthesize), "rb") as f:
+            return f.read()
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".mp3") and entry.is_file()]
+
+    def _evict(self, keep: Optional[str] = None):
+        with self._lock:
+            if self._size <= self.max_bytes:
+                return
+            entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                if self._size <= self.max_bytes:
+                    break
+                if entry.path == keep:
+                    continue
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                self._size -= size
+                self._stats["evictions"] += 1
+
+    def _sweep_temp_files(self):
+        # Leftovers from a process killed mid-write
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _bump(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries()), "bytes": self._size}
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._size = 0
@@ -1,12 +1,14 @@
 import os
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain.schema import HumanMessage, SystemMessage, AIMessage
-from deepgram import DeepgramClient, PrerecordedOptions, FileSource
-from gtts import gTTS
-import tempfile
+import hashlib
 import base64
 from dotenv import load_dotenv
+from engines import DeepgramEngine, GoogleEngine, create_engine
+from clients import create_deepgram_client, create_groq_client, create_remote_engines
+from conversation import ResponseCache, create_conversation
+from tts_cache import TTSCache
+import metrics
+import settings
 
 # Load environment variables
 load_dotenv()
@@ -14,171 +16,150 @@ load_dotenv()
 # Cache clients for better performance
 @st.cache_resource
 def get_groq_client():
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    if not groq_api_key:
+    client = create_groq_client()
+    if client is None:
         st.error("GROQ_API_KEY not found in environment variables!")
-        return None
-    
-    return ChatGroq(
-        groq_api_key=groq_api_key,
-        model_name="llama-3.3-70b-versatile",
-        temperature=0.3,  # Lower temperature for faster responses
-        max_tokens=512,   # Reduced tokens for faster generation
-        streaming=True    # Enable streaming for faster responses
-    )
+    return client
 
 @st.cache_resource
 def get_deepgram_client():
-    # Replace this with your actual Deepgram API key
-    deepgram_api_key = "0d154512e1c223e00f54840d6a73b9dee1c8cd41"  # Your API key
-    if not deepgram_api_key:
+    client = create_deepgram_client()
+    if client is None:
         st.error("Please add your Deepgram API key!")
-        return None
-    
-    return DeepgramClient(deepgram_api_key)
+    return client
+
+@st.cache_resource
+def get_remote_engines():
+    """Pooled async HTTP layer shared by every session for Deepgram and Google"""
+    return create_remote_engines()
 
-def speech_to_text(audio_file_path, language="en-US", model="nova-3"):
-    """Convert speech to text using Deepgram API - optimized for free tier"""
+@st.cache_resource
+def start_metrics_exporter():
+    """Prometheus endpoint for this process on METRICS_PORT (once per server, 0 disables it)"""
+    if not (metrics.ENABLED and settings.METRICS_PORT):
+        return None
     try:
-        deepgram = get_deepgram_client()
-        if not deepgram:
-            return None
-        
-        with open(audio_file_path, "rb") as audio_file:
-            buffer_data = audio_file.read()
-        
-        payload: FileSource = {
-            "buffer": buffer_data,
-        }
-        
-        # Use the selected language and model
-        options = PrerecordedOptions(
-            model=model,
-            smart_format=True,
-            language=language,
-        )
-        
-        response = deepgram.listen.prerecorded.v("1").transcribe_file(payload, options)
-        
-        # Extract transcript from single alternative (Nova-2 limitation)
-        channels = response.results.channels[0]
-        if channels.alternatives and len(channels.alternatives) > 0:
-            transcript = channels.alternatives[0].transcript.strip()
-            return transcript if transcript else None
-        
+        return metrics.start_exporter(settings.METRICS_PORT)
+    except OSError as e:
+        st.warning(f"Metrics exporter could not listen on port {settings.METRICS_PORT}: {e}")
         return None
-    
-    except Exception as e:
-        st.error(f"Error in speech to text: {e}")
+
+@st.cache_resource
+def get_engine(name):
+    """Registry engine wired to the clients and models shared by every session"""
+    if name == "deepgram":
+        return DeepgramEngine(remote=get_remote_engines(), live_client=get_deepgram_client)
+    if name == "google":
+        return GoogleEngine(remote=get_remote_engines())
+    if name == "bangla":
+        from bangla_stt_fixed import get_bangla_engine
+        return get_bangla_engine()
+    return create_engine(name)
+
+@st.cache_resource
+def get_response_cache():
+    """Assistant replies shared by every session, keyed by the exact prompt"""
+    return ResponseCache(settings.LLM_RESPONSE_CACHE_ENTRIES)
+
+def get_conversation():
+    """This session's conversation context (token-budgeted window plus running summary), or None without a client"""
+    groq_client = get_groq_client()
+    if not groq_client:
         return None
+    if "conversation" not in st.session_state:
+        st.session_state.conversation = create_conversation(groq_client, get_response_cache())
+    return st.session_state.conversation
 
 def get_answer(messages):
     """Get AI response using Groq Llama-3.3-70b-versatile via LangChain - optimized for speed"""
     try:
-        groq_client = get_groq_client()
-        if not groq_client:
+        conversation = get_conversation()
+        if not conversation:
             return "Sorry, I'm having trouble connecting to the AI service."
         
-        # Convert Streamlit messages to LangChain format (limit context for speed)
-        langchain_messages = []
-        
-        # Add system message (shorter for faster processing)
-        system_message = SystemMessage(content="""You are Aaladin AI — the voice-activated, web and mobile app development genie from AaladinAI.com.
-
-        Aaladin specializes in:
-        • Full-stack web & mobile development  
-        • UI/UX design  
-        • Automation tools and AI/ChatGPT integrations  
-        • Cloud & DevOps solutions  
-        • API development & browser extensions  
-        The team works with Next.js, React, Flutter, Node.js, TypeScript, and tailors solutions for startups, enterprises, and innovators :contentReference[oaicite:1]{index=1}.
-
-        Users speak to you via live-transcribed voice commands (Deepgram-backed), which may include informal phrasing. You interpret their intent, plan or build software solutions, and respond clearly and confidently—as if you’re their technical co-founder.
-
-        Your roles:
-        1. Analyze and refine the spoken request.
-        2. Design appropriate architecture, code snippets, UI wireframes, or project outlines.
-        3. Ask follow-up questions **only if needed** to clarify requirements.
-        4. Deliver final outputs in ready-to-use formats (e.g., code with imports, comments, filenames).
-        5. Keep answers concise, natural, and conversational—suitable for voice playback or visual consumption.
-
-        Always:
-        - Include relevant technology choices (e.g., Next.js + Tailwind CSS, Flutter, cloud, AI)
-        - Align answers with Aaladin’s proven development methodology: planning, wireframing, design, coding, testing, deployment :contentReference[oaicite:2]{index=2}.
-        - Reflect Aaladin’s brand identity: empowering, dependable, agile, and digitally transformative.
-
-        Never:
-        - Mention Deepgram, transcription, or the toolchain behind the voice interface.
-        - Be overly formal or robotic.
-
-        You are Aaladin AI — your voice, our power. Build something amazing.
-""")
-        langchain_messages.append(system_message)
-        
-        # Only use last 6 messages for context (3 exchanges) to speed up processing
-        recent_messages = messages[-6:] if len(messages) > 6 else messages
-        
-        # Convert conversation history
-        for message in recent_messages:
-            if message["role"] == "user":
-                langchain_messages.append(HumanMessage(content=message["content"]))
-            elif message["role"] == "assistant":
-                langchain_messages.append(AIMessage(content=message["content"]))
-        
-        # Get response from Groq
-        response = groq_client.invoke(langchain_messages)
-        return response.content
+        # Cached system prompt, summary of older turns and the newest turns within the token budget
+        with metrics.span("llm"):
+            return conversation.invoke(messages)
     
     except Exception as e:
         st.error(f"Error getting AI response: {e}")
         return "Sorry, I encountered an error while processing your request."
 
-def text_to_speech(text):
-    """Convert text to speech using gTTS - optimized for speed"""
+def stream_answer_tokens(messages):
+    """Iterator over Groq reply tokens as they arrive (the client is built with streaming=True)
+
+    The client is resolved here, on the script thread, so the returned iterator
+    can be consumed from a background thread.
+    """
+    conversation = get_conversation()
+    if not conversation:
+        return iter(["Sorry, I'm having trouble connecting to the AI service."])
+    return conversation.stream(messages)
+
+@st.cache_resource
+def get_tts_cache():
+    """Synthesized speech shared by every session, so repeated replies skip gTTS"""
+    return TTSCache(settings.TTS_CACHE_DIR, max_bytes=settings.TTS_CACHE_MAX_MB * 1024 * 1024)
+
+def text_to_speech(text, lang="en", tld="com"):
+    """Convert text to speech using gTTS - optimized for speed
+
+    Returns the path of the cached MP3; the cache owns the file, so callers
+    must not delete it.
+    """
     try:
         # Limit text length for faster generation
         if len(text) > 500:
             text = text[:500] + "..."
         
-        # Create a temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        temp_file_path = temp_file.name
-        temp_file.close()
-        
-        # Generate speech with optimized settings
-        tts = gTTS(
-            text=text, 
-            lang='en', 
-            slow=False,
-            tld='com'  # Use .com for faster processing
-        )
-        tts.save(temp_file_path)
-        
-        return temp_file_path
+        # gTTS only runs on a cache miss; repeated replies reuse the stored clip
+        with metrics.span("tts", lang=lang):
+            return get_tts_cache().synthesize(text, lang, tld)
     
     except Exception as e:
         st.error(f"Error in text to speech: {e}")
         return None
 
-def autoplay_audio(file_path):
-    """Auto-play audio file in Streamlit"""
+def audio_url(audio, mimetype="audio/mpeg"):
+    """Serve MP3 bytes or a file through Streamlit's media endpoint and return its URL
+
+    Media files are stored once per content hash, so the same clip keeps the
+    same URL across reruns and the browser can cache it.
+    """
+    from streamlit import runtime
+
+    if not runtime.exists():
+        return None
+    data = bytes(audio) if isinstance(audio, (bytes, bytearray)) else audio
+    if isinstance(data, bytes):
+        coordinates = f"tts.{hashlib.sha1(data).hexdigest()}"
+    else:
+        coordinates = f"tts.{os.path.basename(data)}"
+    return runtime.get_instance().media_file_mgr.add(data, mimetype, coordinates)
+
+def autoplay_audio(audio, placeholder=None):
+    """Auto-play an MP3 file path or MP3 bytes in Streamlit (optionally inside a placeholder)"""
     try:
-        with open(file_path, "rb") as audio_file:
-            audio_bytes = audio_file.read()
-        
-        # Encode audio to base64
-        audio_base64 = base64.b64encode(audio_bytes).decode()
+        src = audio_url(audio)
+        if src is None:
+            # No Streamlit server (bare script run): fall back to an inline data URI
+            if isinstance(audio, (bytes, bytearray)):
+                audio_bytes = bytes(audio)
+            else:
+                with open(audio, "rb") as audio_file:
+                    audio_bytes = audio_file.read()
+            src = f"data:audio/mp3;base64,{base64.b64encode(audio_bytes).decode()}"
         
         # Create HTML audio element with autoplay
         audio_html = f"""
         <audio autoplay="true" controls style="width: 100%;">
-        <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
+        <source src="{src}" type="audio/mpeg">
         Your browser does not support the audio element.
         </audio>
         """
         
         # Display audio player
-        st.markdown(audio_html, unsafe_allow_html=True)
+        (placeholder or st).markdown(audio_html, unsafe_allow_html=True)
     
     except Exception as e:
         st.error(f"Error playing audio: {e}")
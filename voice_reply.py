@@ -0,0 +1,215 @@
+"""Streaming voice replies: LLM tokens → sentences → TTS, one sentence at a time.
+
+Speech for the first sentence is synthesized while the model is still
+generating the rest, so playback can start after roughly one sentence
+instead of after the full reply plus its full synthesis. Run with fake
+backends to measure time-to-first-audio offline:
+
+    python voice_reply.py --tokens-per-second 40 --tts-ms-per-char 8
+"""
+import argparse
+import io
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+# Sentence ends: Latin punctuation followed by whitespace, the Bengali dari, or a blank line
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|(?<=[।॥])\s*|\n{2,}")
+
+class ReplyEvent(NamedTuple):
+    kind: str                      # "token", "audio", "error" or "done"
+    text: str = ""                 # token text, the spoken sentence, or the full reply for "done"
+    audio: Optional[bytes] = None  # MP3 for "audio" events
+    index: int = 0                 # sentence number for "audio" events
+    elapsed: float = 0.0           # seconds since the pipeline started
+
+def split_sentences(tokens: Iterable[str], min_chars: int = 20, max_chars: int = 250) -> Iterator[str]:
+    """Group a token stream into sentences as soon as each one is complete.
+
+    Very short sentences are merged with the next one so TTS is not called for
+    fragments like "Sure."; runaway sentences are cut at a word boundary.
+    """
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        while True:
+            match = next((m for m in SENTENCE_END.finditer(buffer) if m.end() >= min_chars), None)
+            if match is None:
+                break
+            sentence, buffer = buffer[:match.end()].strip(), buffer[match.end():]
+            if sentence:
+                yield sentence
+        if len(buffer) > max_chars:
+            cut = buffer.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentence, buffer = buffer[:cut].strip(), buffer[cut:]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
+
+# gTTS language and accent for each transcription language (default: the language subtag, .com voice)
+TTS_VOICES = {"en-GB": ("en", "co.uk"), "bn-BD": ("bn", "com"), "zh": ("zh-CN", "com")}
+
+def tts_voice(language: str) -> tuple:
+    """(gTTS lang, tld) for a BCP-47 transcription language"""
+    return TTS_VOICES.get(language, (language.split("-")[0], "com"))
+
+def synthesize_speech(text: str, lang: str = "en", tld: str = "com") -> bytes:
+    """Synthesize one sentence with gTTS and return the MP3 bytes (no temp file)"""
+    from gtts import gTTS
+
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang, slow=False, tld=tld).write_to_fp(buffer)
+    return buffer.getvalue()
+
+def mp3_duration(data: bytes) -> float:
+    """Playback length of an MP3 clip in seconds, used to pace sentence playback"""
+    try:
+        import av
+
+        with av.open(io.BytesIO(data), mode="r") as container:
+            stream = container.streams.audio[0]
+            if stream.duration and stream.time_base:
+                return float(stream.duration * stream.time_base)
+            return sum(frame.samples for frame in container.decode(stream)) / float(stream.rate)
+    except Exception:
+        return len(data) * 8 / 32000.0  # gTTS writes 32 kbps MP3
+
+class VoiceReplyPipeline:
+    """Run an LLM token stream and sentence TTS on background threads.
+
+    events() yields ReplyEvents on the caller's thread: every token as it
+    arrives, each sentence's audio as soon as it (and every sentence before
+    it) is synthesized, and a final "done" event with the full reply.
+    """
+
+    def __init__(self, tokens: Iterable[str], tts: Callable[[str], bytes], tts_workers: int = 2):
+        self._tokens = tokens
+        self._tts = tts
+        self._tts_workers = tts_workers
+        self._events = queue.Queue()
+        self._started = None
+        self.first_token_at = None
+        self.first_audio_at = None
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def _token_stream(self, parts: list) -> Iterator[str]:
+        for token in self._tokens:
+            if self.first_token_at is None:
+                self.first_token_at = self._elapsed()
+            parts.append(token)
+            self._events.put(ReplyEvent("token", token, elapsed=self._elapsed()))
+            yield token
+
+    def _run(self):
+        parts = []
+        synthesized = {}
+        next_index = 0
+        lock = threading.Lock()
+
+        def speak(index: int, sentence: str):
+            nonlocal next_index
+            try:
+                audio = self._tts(sentence)
+            except Exception as e:
+                audio = None
+                self._events.put(ReplyEvent("error", f"TTS failed for sentence {index + 1}: {e}", elapsed=self._elapsed()))
+            # Release audio strictly in sentence order, whichever synthesis finishes first
+            with lock:
+                synthesized[index] = (sentence, audio)
+                while next_index in synthesized:
+                    sentence, audio = synthesized.pop(next_index)
+                    if audio:
+                        if self.first_audio_at is None:
+                            self.first_audio_at = self._elapsed()
+                        self._events.put(ReplyEvent("audio", sentence, audio, next_index, self._elapsed()))
+                    next_index += 1
+
+        try:
+            with ThreadPoolExecutor(max_workers=self._tts_workers, thread_name_prefix="tts") as executor:
+                for index, sentence in enumerate(split_sentences(self._token_stream(parts))):
+                    executor.submit(speak, index, sentence)
+        except Exception as e:
+            self._events.put(ReplyEvent("error", f"Reply generation failed: {e}", elapsed=self._elapsed()))
+        self._events.put(ReplyEvent("done", "".join(parts), elapsed=self._elapsed()))
+
+    def start(self) -> "VoiceReplyPipeline":
+        self._started = time.perf_counter()
+        threading.Thread(target=self._run, name="voice-reply", daemon=True).start()
+        return self
+
+    def events(self, poll: Optional[float] = None) -> Iterator[Optional[ReplyEvent]]:
+        """Yield events until "done"; with poll set, yields None whenever nothing arrived in time"""
+        if self._started is None:
+            self.start()
+        while True:
+            try:
+                event = self._events.get(timeout=poll)
+            except queue.Empty:
+                yield None
+                continue
+            yield event
+            if event.kind == "done":
+                return
+
+# -- local fakes for testing without Groq or gTTS ---------------------------------
+
+FAKE_REPLY = (
+    "Sure, let's plan this together. I'd start with a Next.js front end and a small Node API. "
+    "For the mobile side, Flutter keeps one codebase for iOS and Android. "
+    "We can deploy everything on a managed cloud with CI from day one. "
+    "Want me to sketch the data model next?"
+)
+
+def fake_llm(text: str = FAKE_REPLY, tokens_per_second: float = 40.0) -> Iterator[str]:
+    """Stream text word by word at a fixed rate, like a chat model would"""
+    for word in re.findall(r"\S+\s*", text):
+        time.sleep(1.0 / tokens_per_second)
+        yield word
+
+def fake_tts(ms_per_char: float = 8.0, base_ms: float = 150.0) -> Callable[[str], bytes]:
+    """TTS stand-in whose latency grows with sentence length; returns dummy bytes"""
+    def synthesize(text: str) -> bytes:
+        time.sleep((base_ms + ms_per_char * len(text)) / 1000.0)
+        return text.encode("utf-8")
+    return synthesize
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--tts-ms-per-char", type=float, default=8.0)
+    parser.add_argument("--tts-workers", type=int, default=2)
+    args = parser.parse_args()
+
+    tts = fake_tts(args.tts_ms_per_char)
+    pipeline = VoiceReplyPipeline(fake_llm(tokens_per_second=args.tokens_per_second), tts, args.tts_workers)
+    for event in pipeline.events():
+        if event.kind == "audio":
+            print(f"[{event.elapsed * 1000:7.0f} ms] sentence {event.index + 1} ready: {event.text}")
+        elif event.kind in ("error", "done"):
+            total = event.elapsed
+            if event.kind == "error":
+                print(event.text)
+
+    # Baseline: wait for the whole reply, then synthesize it in one go
+    started = time.perf_counter()
+    reply = "".join(fake_llm(tokens_per_second=args.tokens_per_second))
+    tts(reply)
+    baseline = time.perf_counter() - started
+
+    if pipeline.first_token_at is not None:
+        print(f"time to first token: {pipeline.first_token_at * 1000:.0f} ms")
+    if pipeline.first_audio_at is not None:
+        print(f"time to first audio: {pipeline.first_audio_at * 1000:.0f} ms (full reply + full TTS: {baseline * 1000:.0f} ms)")
+    else:
+        print(f"no audio: every TTS call failed (full reply + full TTS: {baseline * 1000:.0f} ms)")
+    print(f"pipeline finished in {total * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Startup preloading so the first request after a deploy doesn't pay for model loads.
+
+Run it once at deploy time to download and convert the configured models
+into the local cache before the app takes traffic:
+
+    BANGLA_PRELOAD_SIZES=base,small python warmup.py
+
+It exits non-zero when a model or client fails (an unset API key counts;
+leave unused clients out of WARMUP_CLIENTS), so it doubles as a pre-traffic
+check in front of the server:
+
+    python warmup.py && streamlit run sttt.py
+
+The Streamlit app and the API service also call warm_up() when their
+process starts, which loads the models into memory, runs a dummy inference
+to allocate CTranslate2 buffers and builds the API clients.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+import settings
+
+class Readiness:
+    """Thread-safe record of what has been warmed up, for status panels and health checks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components = {}
+
+    def set(self, name: str, state: str, seconds: Optional[float] = None, error: Optional[str] = None):
+        with self._lock:
+            self._components[name] = {"state": state, "seconds": seconds, "error": error}
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: dict(info) for name, info in self._components.items()}
+
+    @property
+    def ready(self) -> bool:
+        """True once every registered component finished warming (failures count as done)"""
+        with self._lock:
+            return all(info["state"] in ("ready", "failed") for info in self._components.values())
+
+def silence(seconds: float = 1.0, sample_rate: int = 16000) -> np.ndarray:
+    return np.zeros(int(seconds * sample_rate), dtype=np.float32)
+
+def _timed(readiness: Readiness, name: str, step: Callable[[], object]):
+    readiness.set(name, "warming")
+    started = time.perf_counter()
+    try:
+        result = step()
+        if result is None:
+            readiness.set(name, "failed", time.perf_counter() - started, "not configured")
+        else:
+            readiness.set(name, "ready", time.perf_counter() - started)
+    except Exception as e:
+        readiness.set(name, "failed", time.perf_counter() - started, str(e))
+
+def warm_up(
+    readiness: Readiness,
+    load_model: Callable[[str], object],
+    model_sizes: Iterable[str] = (),
+    client_factories: Optional[Dict[str, Callable[[], object]]] = None,
+    worker_pool=None,
+):
+    """Open API clients, then load each model size and run a dummy inference.
+
+    With a worker pool the models are warmed inside every worker process
+    instead of in this one.
+    """
+    client_factories = client_factories or {}
+    model_sizes = list(model_sizes)
+    for name in client_factories:
+        readiness.set(f"client:{name}", "pending")
+    if worker_pool is not None:
+        readiness.set("bangla:workers", "pending")
+    else:
+        for size in model_sizes:
+            readiness.set(f"bangla:{size}", "pending")
+
+    # API clients are cheap, so they become ready first
+    for name, factory in client_factories.items():
+        _timed(readiness, f"client:{name}", factory)
+
+    if worker_pool is not None:
+        _timed(readiness, "bangla:workers", lambda: worker_pool.warm_up(model_sizes))
+        return
+
+    def load_and_run(size):
+        model = load_model(size)
+        if model is not None:
+            model(silence())  # allocate buffers and take the one-off first-inference cost
+        return model
+
+    for size in model_sizes:
+        _timed(readiness, f"bangla:{size}", lambda size=size: load_and_run(size))
+
+def start_background_warm_up(**kwargs) -> Readiness:
+    """Run warm_up() on a daemon thread and return its Readiness immediately"""
+    readiness = Readiness()
+    thread = threading.Thread(target=warm_up, args=(readiness,), kwargs=kwargs, name="warm-up", daemon=True)
+    thread.start()
+    return readiness
+
+def main():
+    from bangla_model import create_bangla_model
+    from clients import create_deepgram_client, create_groq_client
+
+    factories = {"deepgram": create_deepgram_client, "groq": create_groq_client}
+    readiness = Readiness()
+    warm_up(
+        readiness,
+        create_bangla_model,
+        settings.BANGLA_PRELOAD_SIZES,
+        {name: factories[name] for name in settings.WARMUP_CLIENTS if name in factories},
+    )
+    for name, info in readiness.snapshot().items():
+        seconds = f"{info['seconds']:.2f}s" if info["seconds"] is not None else "-"
+        print(f"{name:<20} {info['state']:<8} {seconds:>8} {info['error'] or ''}")
+    return 1 if any(info["state"] == "failed" for info in readiness.snapshot().values()) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())